@@ -1,14 +1,18 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QFileDialog, 
                              QVBoxLayout, QWidget, QLabel, QProgressBar, QHBoxLayout, 
                              QMessageBox)
 from PyQt5.QtGui import QIcon, QPixmap, QFont
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from index_generator import generate_index_from_template
-from file_utils import rename_files
-from excel_handler import save_excel_file
+from file_utils import rename_files, DirectorySnapshot
+from batch_processor import process_batch
+from instrumentation import create_profiler, run_log_path
+from progress import CancellationToken, OperationCancelled, format_eta
 import shutil
+import time
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -21,24 +25,103 @@ def resource_path(relative_path):
 
 class IndexGeneratorThread(QThread):
     progress_update = pyqtSignal(int)
+    status_update = pyqtSignal(str)
     finished = pyqtSignal(bool, str)
 
+    # Porción de la barra de progreso de cada etapa: (inicio, fin) y descripción
+    STAGES = {
+        'renombrado': (0, 20, "Renombrando archivos"),
+        'metadatos': (20, 95, "Analizando documentos")
+    }
+
+    # Intervalo mínimo entre dos mensajes de avance, en segundos
+    STATUS_INTERVAL = 0.25
+
     def __init__(self, folder_path):
         QThread.__init__(self)
         self.folder_path = folder_path
+        self.cancel_token = CancellationToken()
+        self._last_progress = None
+        self._last_status = 0
+
+    def cancel(self):
+        """
+        Solicita detener el proceso; se detiene antes del siguiente archivo.
+        """
+        self.cancel_token.cancel()
 
     def run(self):
+        # Registro de tiempos de la ejecución, que se guarda junto al índice
+        profiler = create_profiler()
+        # Archivos renombrados; None mientras el renombrado no ha terminado
+        renamed = None
         try:
-            self.progress_update.emit(25)
-            rename_files(self.folder_path)
-            
+            with profiler.span('renombrado'):
+                snapshot = DirectorySnapshot(self.folder_path)
+                renamed = rename_files(self.folder_path, snapshot=snapshot, progress=self._report,
+                                       cancel=self.cancel_token)
+
             # Generar el índice electrónico a partir de la plantilla
-            self.progress_update.emit(75)
             template_path = resource_path("assets/000IndiceElectronicoC0.xlsm")
-            df = generate_index_from_template(self.folder_path, template_path)
+            with profiler.span('indice'):
+                generate_index_from_template(self.folder_path, template_path, workers=None, snapshot=snapshot,
+                                             profiler=profiler, progress=self._report, cancel=self.cancel_token)
             
             self.progress_update.emit(100)
             self.finished.emit(True, "Índice electrónico generado con éxito.")
+        except OperationCancelled:
+            self.finished.emit(False, self._cancelled_message(renamed))
+        except Exception as e:
+            self.finished.emit(False, str(e))
+        finally:
+            try:
+                profiler.write(run_log_path(self.folder_path))
+            except OSError:
+                pass
+
+    def _cancelled_message(self, renamed):
+        # El renombrado se deshace si se cancela; una vez terminado, sus cambios se conservan.
+        # El índice anterior solo se reemplaza cuando el nuevo está completo.
+        if renamed is None:
+            return "Proceso cancelado. Los archivos conservan sus nombres y el índice anterior no se modificó."
+        if renamed:
+            return (f"Proceso cancelado durante la generación del índice. Los archivos ya fueron renombrados "
+                    f"({len(renamed)}); el índice anterior no se modificó.")
+        return ("Proceso cancelado durante la generación del índice. Ningún archivo necesitaba cambiar de nombre; "
+                "el índice anterior no se modificó.")
+
+    def _report(self, stage, done, total, eta):
+        # Solo se emite cuando cambia el porcentaje o pasa STATUS_INTERVAL, para no saturar la interfaz
+        start, end, label = self.STAGES[stage]
+        value = start + (end - start) * done // max(total, 1)
+        now = time.monotonic()
+        if value == self._last_progress and now - self._last_status < self.STATUS_INTERVAL and done < total:
+            return
+        self._last_progress = value
+        self._last_status = now
+        self.progress_update.emit(value)
+        self.status_update.emit(f"{label}: {done} de {total} · tiempo restante {format_eta(eta)}")
+
+class BatchIndexThread(QThread):
+    progress_update = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, folder_path):
+        QThread.__init__(self)
+        self.folder_path = folder_path
+
+    def run(self):
+        try:
+            template_path = resource_path("assets/000IndiceElectronicoC0.xlsm")
+            report = process_batch(self.folder_path, template_path,
+                                   on_result=lambda result, done, total: self.progress_update.emit(int(done * 100 / total)))
+            if report.empty:
+                self.finished.emit(False, "No se encontraron cuadernos en la carpeta seleccionada.")
+                return
+            errors = int((report['Estado'] == 'Error').sum())
+            self.progress_update.emit(100)
+            self.finished.emit(errors == 0, f"{len(report)} cuadernos procesados, {errors} con error. "
+                                            "Consulte el reporte del lote para más detalles.")
         except Exception as e:
             self.finished.emit(False, str(e))
 
@@ -92,16 +175,23 @@ class MainWindow(QMainWindow):
         buttons_layout = QHBoxLayout()
         self.select_folder_btn = QPushButton("Seleccionar Carpeta")
         self.generate_index_btn = QPushButton("Generar Índice")
+        self.batch_btn = QPushButton("Procesar Lote")
+        self.cancel_btn = QPushButton("Cancelar")
         self.download_template_btn = QPushButton("Descargar Plantilla")
         self.download_guide_btn = QPushButton("Descargar Guía")
         
         buttons_layout.addWidget(self.select_folder_btn)
         buttons_layout.addWidget(self.generate_index_btn)
+        buttons_layout.addWidget(self.batch_btn)
+        buttons_layout.addWidget(self.cancel_btn)
         buttons_layout.addWidget(self.download_template_btn)
         buttons_layout.addWidget(self.download_guide_btn)
         
         self.select_folder_btn.clicked.connect(self.select_folder)
         self.generate_index_btn.clicked.connect(self.generate_index)
+        self.batch_btn.clicked.connect(self.process_batch)
+        self.cancel_btn.clicked.connect(self.cancel_process)
+        self.cancel_btn.setEnabled(False)
         self.download_template_btn.clicked.connect(self.download_template)
         self.download_guide_btn.clicked.connect(self.download_guide)
         
@@ -141,11 +231,33 @@ class MainWindow(QMainWindow):
 
         self.thread = IndexGeneratorThread(self.folder_path)
         self.thread.progress_update.connect(self.update_progress)
+        self.thread.status_update.connect(self.info_label.setText)
+        self.thread.finished.connect(self.process_finished)
+        self.thread.start()
+
+        self.select_folder_btn.setEnabled(False)
+        self.generate_index_btn.setEnabled(False)
+        self.batch_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+
+    def cancel_process(self):
+        self.cancel_btn.setEnabled(False)
+        self.info_label.setText("Cancelando… el proceso se detendrá al terminar el archivo actual.")
+        self.thread.cancel()
+
+    def process_batch(self):
+        if not self.folder_path:
+            QMessageBox.warning(self, "Advertencia", "Por favor, seleccione la carpeta del expediente o de la serie documental.")
+            return
+
+        self.thread = BatchIndexThread(self.folder_path)
+        self.thread.progress_update.connect(self.update_progress)
         self.thread.finished.connect(self.process_finished)
         self.thread.start()
 
         self.select_folder_btn.setEnabled(False)
         self.generate_index_btn.setEnabled(False)
+        self.batch_btn.setEnabled(False)
 
     def update_progress(self, value):
         self.progress_bar.setValue(value)
@@ -153,8 +265,13 @@ class MainWindow(QMainWindow):
     def process_finished(self, success, message):
         self.select_folder_btn.setEnabled(True)
         self.generate_index_btn.setEnabled(True)
+        self.batch_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.info_label.setText(f"Carpeta seleccionada: {self.folder_path}")
         if success:
             QMessageBox.information(self, "Éxito", message)
+        elif getattr(self.thread, 'cancel_token', None) is not None and self.thread.cancel_token.cancelled:
+            QMessageBox.information(self, "Cancelado", message)
         else:            
             QMessageBox.critical(self, "Error", f"Ocurrió un error: {message}")
         self.progress_bar.setValue(0)
@@ -180,6 +297,8 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Error", f"No se pudo descargar la guía: {str(e)}")
 
 if __name__ == "__main__":
+    # Necesario para la extracción en paralelo desde el ejecutable de PyInstaller en Windows
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
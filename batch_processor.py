@@ -0,0 +1,198 @@
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from file_utils import rename_files, DirectorySnapshot
+from index_generator import generate_index_from_template, update_index_incremental
+from instrumentation import create_profiler, run_log_path
+
+# Nombres de carpeta según el protocolo: cuaderno (C01Principal) e instancia (01PrimeraInstancia)
+CUADERNO_RE = re.compile(r'^C\d+', re.IGNORECASE)
+INSTANCIA_RE = re.compile(r'^\d{2}[A-Za-zÁÉÍÓÚáéíóú]')
+
+# Profundidad máxima de búsqueda: carpeta con varias series/SERIE_SUBSERIE/radicado/instancia/cuaderno
+MAX_DEPTH = 4
+
+REPORT_NAME = '000ReporteProcesamientoLote.xlsx'
+
+REPORT_COLUMNS = [
+    'Serie o Subserie', 'Radicado', 'Instancia', 'Cuaderno', 'Ruta', 'Estado',
+    'Archivos Renombrados', 'Índice', 'Segundos', 'Error'
+]
+
+def discover_cuadernos(root_path):
+    """
+    Encuentra las carpetas de cuaderno bajo una carpeta raíz.
+
+    Reconoce las estructuras de procesamiento admitidas:
+    - Subcarpeta: la raíz es el cuaderno (C01Principal)
+    - Expediente: 05088/01PrimeraInstancia/C01Principal
+    - Serie documental: SERIE_SUBSERIE/05088/01PrimeraInstancia/C01Principal
+
+    :param root_path: Carpeta raíz seleccionada por el usuario
+    :return: Lista ordenada de diccionarios con la ruta y los niveles de cada cuaderno
+    """
+    root_path = os.path.abspath(root_path)
+    if CUADERNO_RE.match(os.path.basename(root_path)):
+        return [_describe_cuaderno(root_path, root_path)]
+
+    cuadernos = []
+    for current, dirs, _ in os.walk(root_path):
+        depth = os.path.relpath(current, root_path).count(os.sep) + (current != root_path)
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        if current != root_path and CUADERNO_RE.match(os.path.basename(current)) \
+                and INSTANCIA_RE.match(os.path.basename(os.path.dirname(current))):
+            cuadernos.append(_describe_cuaderno(root_path, current))
+            dirs[:] = []
+        elif depth >= MAX_DEPTH:
+            dirs[:] = []
+    return cuadernos
+
+def _describe_cuaderno(root_path, cuaderno_path):
+    levels = os.path.relpath(cuaderno_path, os.path.dirname(root_path)).split(os.sep)
+    levels = [''] * (4 - len(levels)) + levels[-4:]
+    return {
+        'Serie o Subserie': levels[0],
+        'Radicado': levels[1],
+        'Instancia': levels[2],
+        'Cuaderno': levels[3],
+        'Ruta': cuaderno_path
+    }
+
+def process_cuaderno(cuaderno_path, template_path, rename=True, engine='package', incremental=False, use_cache=True):
+    """
+    Renombra los archivos de un cuaderno y genera su índice electrónico.
+
+    :param cuaderno_path: Ruta de la carpeta del cuaderno
+    :param template_path: Ruta de la plantilla del índice
+    :param rename: False para generar el índice sin renombrar los archivos
+    :param engine: Motor de llenado de la plantilla ('package' o 'xlwings'); con 'xlwings' cada
+                   proceso reutiliza su instancia de Excel entre cuadernos
+    :param incremental: True para actualizar el índice existente procesando solo los documentos
+                        nuevos, modificados o eliminados
+    :param use_cache: False para omitir la caché de metadatos (por ejemplo, en carpetas temporales
+                      que no se volverán a procesar)
+    :return: Diccionario con el resultado del procesamiento
+    """
+    start = time.perf_counter()
+    result = {'Ruta': cuaderno_path, 'Archivos Renombrados': 0, 'Índice': '', 'Error': ''}
+    # Registro de tiempos del cuaderno, que se guarda junto a su índice (ver instrumentation)
+    profiler = create_profiler()
+    try:
+        # Un solo recorrido de la carpeta para el renombrado y el índice
+        with profiler.span('renombrado'):
+            snapshot = DirectorySnapshot(cuaderno_path)
+            if rename:
+                result['Archivos Renombrados'] = len(rename_files(cuaderno_path, snapshot=snapshot))
+        with profiler.span('indice'):
+            if incremental:
+                result['Índice'] = update_index_incremental(cuaderno_path, template_path, use_cache=use_cache,
+                                                            snapshot=snapshot, profiler=profiler)['Índice']
+            else:
+                result['Índice'] = generate_index_from_template(cuaderno_path, template_path, engine=engine,
+                                                                use_cache=use_cache, snapshot=snapshot,
+                                                                profiler=profiler)
+        result['Estado'] = 'Procesado'
+    except Exception as e:
+        result['Estado'] = 'Error'
+        result['Error'] = str(e)
+    result['Segundos'] = round(time.perf_counter() - start, 3)
+    try:
+        profiler.write(run_log_path(cuaderno_path))
+    except OSError:
+        pass
+    return result
+
+def process_batch(root_path, template_path, max_workers=None, rename=True, report_path=None,
+                  on_result=None, engine='package', incremental=False, use_cache=True):
+    """
+    Procesa todos los cuadernos encontrados bajo una carpeta raíz, repartiéndolos entre varios procesos.
+
+    :param root_path: Carpeta raíz (cuaderno, expediente o serie documental)
+    :param template_path: Ruta de la plantilla del índice
+    :param max_workers: Número de procesos; None para usar todos los núcleos, 1 para procesar en secuencia
+    :param rename: False para generar los índices sin renombrar los archivos
+    :param report_path: Ruta del reporte consolidado; por defecto se guarda en la carpeta raíz
+                        (o en su carpeta superior si la raíz es un cuaderno)
+    :param on_result: Función opcional que recibe (resultado, terminados, total) al concluir cada cuaderno
+    :param engine: Motor de llenado de la plantilla ('package' o 'xlwings')
+    :param incremental: True para actualizar los índices existentes en lugar de regenerarlos
+    :param use_cache: False para omitir la caché de metadatos
+    :return: DataFrame con el reporte consolidado
+    """
+    cuadernos = discover_cuadernos(root_path)
+    workers = min(max_workers or os.cpu_count() or 1, len(cuadernos)) or 1
+    results = [None] * len(cuadernos)
+
+    def collect(position, result):
+        results[position] = {**cuadernos[position], **result}
+        if on_result:
+            on_result(results[position], sum(r is not None for r in results), len(cuadernos))
+
+    if workers <= 1:
+        for position, cuaderno in enumerate(cuadernos):
+            collect(position, process_cuaderno(cuaderno['Ruta'], template_path, rename, engine, incremental, use_cache))
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(process_cuaderno, cuaderno['Ruta'], template_path, rename, engine, incremental, use_cache): position
+                           for position, cuaderno in enumerate(cuadernos)}
+                for future in as_completed(futures):
+                    collect(futures[future], future.result())
+        except (OSError, BrokenProcessPool):
+            for position, cuaderno in enumerate(cuadernos):
+                if results[position] is None:
+                    collect(position, process_cuaderno(cuaderno['Ruta'], template_path, rename, engine, incremental, use_cache))
+
+    import pandas as pd
+    report = pd.DataFrame(results, columns=REPORT_COLUMNS)
+    if report_path is None:
+        root_path = os.path.abspath(root_path)
+        if CUADERNO_RE.match(os.path.basename(root_path)):
+            root_path = os.path.dirname(root_path)
+        report_path = os.path.join(root_path, REPORT_NAME)
+    if report_path:
+        write_batch_report(report, report_path)
+    return report
+
+def write_batch_report(report, report_path):
+    """
+    Guarda el reporte consolidado del procesamiento por lote en Excel.
+
+    :param report: DataFrame devuelto por process_batch
+    :param report_path: Ruta del archivo Excel
+    """
+    import pandas as pd
+    with pd.ExcelWriter(report_path, engine='openpyxl') as writer:
+        report.to_excel(writer, index=False, sheet_name='Reporte')
+    return report_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera los índices electrónicos de todos los cuadernos de una carpeta.')
+    parser.add_argument('root_path', help='Carpeta del cuaderno, expediente o serie documental')
+    parser.add_argument('--template', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           'assets', '000IndiceElectronicoC0.xlsm'))
+    parser.add_argument('--workers', type=int, default=None, help='Número de procesos (por defecto, todos los núcleos)')
+    parser.add_argument('--no-rename', action='store_true', help='No renombrar los archivos')
+    parser.add_argument('--report', default=None, help='Ruta del reporte consolidado')
+    parser.add_argument('--engine', choices=('package', 'xlwings'), default='package',
+                        help='Llenar la plantilla sin Excel (package) o con Excel (xlwings)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Actualizar los índices existentes procesando solo los documentos nuevos o modificados')
+    args = parser.parse_args()
+
+    def show(result, done, total):
+        print(f"[{done}/{total}] {result['Estado']}: {result['Ruta']} {result['Error']}")
+
+    report = process_batch(args.root_path, args.template, max_workers=args.workers,
+                           rename=not args.no_rename, report_path=args.report, on_result=show,
+                           engine=args.engine, incremental=args.incremental)
+    errors = (report['Estado'] == 'Error').sum()
+    print(f"{len(report)} cuadernos procesados, {errors} con error.")
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
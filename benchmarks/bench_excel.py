@@ -0,0 +1,107 @@
+"""
+Compara el tiempo de create_new_excel con la versión anterior (estilos por celda y anchos celda a celda).
+
+Uso:
+    python benchmarks/bench_excel.py --rows 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Side, Font, PatternFill
+from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.drawing.image import Image
+from excel_handler import create_new_excel, INDEX_HEADERS, LOGO_PATH
+
+def build_dataframe(rows):
+    """
+    Construye un índice sintético con `rows` documentos.
+    """
+    pages = [(i % 37) + 1 for i in range(rows)]
+    end = pd.Series(pages).cumsum()
+    return pd.DataFrame({
+        "Nombre Documento": [f"{i + 1:03d}MemorialDocumentoNumero{i}" for i in range(rows)],
+        "Fecha Creación Documento": ["15-03-2024"] * rows,
+        "Fecha Incorporación Expediente": ["18-10-2026"] * rows,
+        "Orden Documento": range(1, rows + 1),
+        "Número Páginas": pages,
+        "Página Inicio": end - pd.Series(pages) + 1,
+        "Página Fin": end,
+        "Formato": ["pdf"] * rows,
+        "Tamaño": [f"{i % 900 + 1} KB" for i in range(rows)],
+        "Origen": ["Electrónico"] * rows,
+        "Observaciones": [""] * rows
+    }, columns=INDEX_HEADERS)
+
+def legacy_create_new_excel(df):
+    # Versión anterior: objetos de estilo nuevos por celda, logo leído del disco y anchos celda a celda
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Índice Electrónico"
+    img = Image(LOGO_PATH)
+    img.width = 1.9 * 72
+    img.height = 0.5 * 72
+    ws.add_image(img, 'A1')
+    ws['B2'] = "ÍNDICE ELECTRÓNICO DEL EXPEDIENTE JUDICIAL"
+    ws['B2'].font = Font(bold=True, size=14)
+    ws.merge_cells('B2:K2')
+    for col, header in enumerate(INDEX_HEADERS, start=1):
+        cell = ws.cell(row=11, column=col, value=header)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    for r in dataframe_to_rows(df, index=False, header=False):
+        ws.append(r)
+    for row in ws.iter_rows(min_row=12, max_row=ws.max_row, min_col=1, max_col=11):
+        for cell in row:
+            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                                 top=Side(style='thin'), bottom=Side(style='thin'))
+    for column in ws.columns:
+        max_length = 0
+        column_letter = column[0].column_letter
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(cell.value)
+            except:
+                pass
+        ws.column_dimensions[column_letter].width = max_length + 2
+    return wb
+
+def run(render, df, output_path):
+    start = time.perf_counter()
+    wb = render(df)
+    built = time.perf_counter() - start
+    wb.save(output_path)
+    return built, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000, help='Número de documentos del índice sintético')
+    parser.add_argument('--output', default=None, help='Carpeta donde guardar los libros generados')
+    args = parser.parse_args()
+
+    output_dir = args.output or tempfile.mkdtemp(prefix='bench_excel_')
+    os.makedirs(output_dir, exist_ok=True)
+    df = build_dataframe(args.rows)
+
+    try:
+        print(f'{args.rows} filas')
+        for name, render in (('anterior', legacy_create_new_excel), ('estilos con nombre', create_new_excel)):
+            built, total = run(render, df, os.path.join(output_dir, f'indice_{name.replace(" ", "_")}.xlsx'))
+            print(f'{name:<20} construcción {built:8.3f} s  total con guardado {total:8.3f} s')
+    finally:
+        if not args.output:
+            shutil.rmtree(output_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara la detección del tipo MIME con y sin la ruta rápida por firma de extensión.
+
+Uso:
+    python benchmarks/bench_mime.py --files 10000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import magic
+from metadata_extractor import get_file_type
+
+# Contenido mínimo de cada formato, suficiente para que libmagic y la firma lo reconozcan
+SAMPLES = {
+    '.pdf': b'%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n%%EOF\n',
+    '.docx': b'PK\x03\x04\x14\x00\x06\x00' + b'\x00' * 56,
+    '.xlsx': b'PK\x03\x04\x14\x00\x06\x00' + b'\x00' * 56,
+    '.jpg': b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00' + b'\x00' * 32,
+    '.png': b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + b'\x00' * 32,
+    '.tif': b'II*\x00\x08\x00\x00\x00' + b'\x00' * 32,
+    '.mp4': b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom' + b'\x00' * 32,
+    '.txt': b'Constancia secretarial\n',
+}
+
+def create_tree(base_path, total_files):
+    """
+    Crea un árbol de cuadernos con `total_files` archivos repartidos entre los formatos de SAMPLES.
+    """
+    extensions = list(SAMPLES)
+    paths = []
+    for i in range(total_files):
+        folder = os.path.join(base_path, f'C{i // 500 + 1:02d}Principal')
+        os.makedirs(folder, exist_ok=True)
+        extension = extensions[i % len(extensions)]
+        path = os.path.join(folder, f'{i:05d}Documento{extension}')
+        with open(path, 'wb') as f:
+            f.write(SAMPLES[extension])
+        paths.append(path)
+    return paths
+
+def legacy_get_file_type(file_path):
+    # Comportamiento anterior: un detector de libmagic nuevo por archivo
+    return magic.Magic(mime=True).from_file(file_path)
+
+def run(paths, detector):
+    start = time.perf_counter()
+    for path in paths:
+        detector(path)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=10000, help='Número de archivos del árbol sintético')
+    parser.add_argument('--skip-legacy', action='store_true', help='Omitir la medición con un detector por archivo')
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp(prefix='bench_mime_')
+    try:
+        paths = create_tree(base_path, args.files)
+        cases = [
+            ('firma + libmagic reutilizado', lambda path: get_file_type(path)),
+            ('solo libmagic reutilizado', lambda path: get_file_type(path, trust_extension=False)),
+        ]
+        if not args.skip_legacy:
+            cases.append(('libmagic nuevo por archivo', legacy_get_file_type))
+
+        print(f'{len(paths)} archivos')
+        for name, detector in cases:
+            elapsed = run(paths, detector)
+            print(f'{name:<32} {elapsed:8.3f} s  {len(paths) / elapsed:10.0f} archivos/s')
+    finally:
+        shutil.rmtree(base_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Mide cada etapa del procesamiento de un cuaderno sintético y guarda los resultados en JSON.
+
+Etapas: rename_files, get_file_metadata (todos los archivos), generate_index_from_scratch,
+create_new_excel (con guardado) y el llenado de la plantilla .xlsm. Cada etapa se ejecuta en
+un proceso nuevo, de modo que el pico de memoria (RSS) corresponde solo a esa etapa. La caché
+de metadatos se desactiva durante la medición.
+
+Uso:
+    python benchmarks/run_benchmarks.py --sizes 10 1000 10000 --output resultados.json
+    python benchmarks/run_benchmarks.py --sizes 1000 --compare resultados.json
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from queue import Empty
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import create_cuaderno
+
+STAGES = ['rename_files', 'get_file_metadata', 'generate_index_from_scratch', 'create_new_excel', 'fill_template']
+
+DEFAULT_SIZES = [10, 1000, 10000]
+
+def _peak_rss_mb():
+    # Pico de memoria residente del proceso actual, en MB
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en bytes en macOS y en KB en Linux
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+def _run_stage(stage, folder_path, workers, queue):
+    """
+    Ejecuta una etapa en un proceso nuevo. Las entradas de la etapa (índice, DataFrame) se
+    preparan antes de tomar el tiempo y no se cuentan en la medición.
+    """
+    os.environ['EXPEDIENTE_METADATA_CACHE'] = '0'
+    from file_utils import rename_files, DirectorySnapshot
+    from metadata_extractor import get_file_metadata
+    from index_generator import generate_index_from_scratch
+    from excel_handler import create_new_excel, TEMPLATE_PATH
+    from xlsm_template import fill_template_package
+    # Las bibliotecas que los módulos importan al usarlas se cargan antes de tomar el tiempo
+    import pandas, openpyxl, PyPDF2, PIL.Image, magic
+
+    if stage == 'rename_files':
+        run = lambda: rename_files(folder_path)
+    elif stage == 'get_file_metadata':
+        paths = [os.path.join(folder_path, name) for name in DirectorySnapshot(folder_path).documents()]
+        run = lambda: [get_file_metadata(path, use_cache=False) for path in paths]
+    elif stage == 'generate_index_from_scratch':
+        run = lambda: generate_index_from_scratch(folder_path, use_cache=False, workers=workers)
+    else:
+        df = generate_index_from_scratch(folder_path, use_cache=False, workers=workers)
+        if stage == 'create_new_excel':
+            run = lambda: create_new_excel(df).save(io.BytesIO())
+        else:
+            output_path = os.path.join(folder_path, 'indice_benchmark.xlsm')
+            run = lambda: fill_template_package(TEMPLATE_PATH, output_path, df)
+
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    if stage == 'fill_template':
+        os.remove(output_path)
+    queue.put({'segundos': elapsed, 'rss_pico_mb': _peak_rss_mb()})
+
+def measure(stage, folder_path, files, workers=1):
+    """
+    Mide una etapa sobre el cuaderno y devuelve el registro de resultados.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, folder_path, workers, queue))
+    process.start()
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except Empty:
+            if not process.is_alive():
+                raise RuntimeError(f'La etapa {stage} terminó sin resultados (código {process.exitcode})')
+    process.join()
+    return {
+        'etapa': stage,
+        'archivos': files,
+        'segundos': round(result['segundos'], 4),
+        'archivos_por_segundo': round(files / result['segundos'], 1) if result['segundos'] else None,
+        'rss_pico_mb': round(result['rss_pico_mb'], 1) if result['rss_pico_mb'] is not None else None
+    }
+
+def run_benchmarks(sizes, stages=None, workers=1, seed=0, media_size=0, log=print):
+    """
+    Genera un cuaderno sintético por tamaño y mide cada etapa.
+
+    :param sizes: Números de archivos de los cuadernos
+    :param stages: Etapas a medir; por defecto todas (STAGES)
+    :param workers: Procesos para la extracción de metadatos del índice
+    :param seed: Semilla del generador de cuadernos
+    :param media_size: Bytes de la imagen incrustada en cada DOCX
+    :param log: Función que recibe cada línea de progreso
+    :return: Diccionario con el entorno de la ejecución y la lista de resultados
+    """
+    stages = stages or STAGES
+    results = []
+    for files in sizes:
+        base_path = tempfile.mkdtemp(prefix='bench_cuaderno_')
+        try:
+            start = time.perf_counter()
+            create_cuaderno(base_path, files, seed=seed, media_size=media_size)
+            log(f'{files} archivos generados en {time.perf_counter() - start:.1f} s')
+            # rename_files se mide sobre el cuaderno sin renombrar y las demás etapas sobre el renombrado
+            for stage in stages:
+                result = measure(stage, base_path, files, workers)
+                results.append(result)
+                log(f'  {stage:<28} {result["segundos"]:9.3f} s  {result["archivos_por_segundo"] or 0:10.0f} archivos/s'
+                    f'  RSS pico {result["rss_pico_mb"] or 0:8.1f} MB')
+        finally:
+            shutil.rmtree(base_path)
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'procesadores': os.cpu_count(),
+        'workers': workers,
+        'semilla': seed,
+        'resultados': results
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous, log=print):
+    """
+    Muestra la variación de tiempo de cada etapa respecto a una ejecución anterior.
+    """
+    before = {(r['archivos'], r['etapa']): r for r in previous['resultados']}
+    log(f'Comparación con {previous.get("commit") or "la ejecución"} del {previous.get("fecha")}')
+    for result in current['resultados']:
+        old = before.get((result['archivos'], result['etapa']))
+        if not old or not old['segundos']:
+            continue
+        ratio = result['segundos'] / old['segundos']
+        log(f'  {result["archivos"]:>6} {result["etapa"]:<28} {old["segundos"]:9.3f} s -> '
+            f'{result["segundos"]:9.3f} s  ({ratio:.2f}x)')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Archivos por cuaderno (10 a 50000)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=None, help='Etapas a medir')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos para extraer metadatos del índice')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del generador de cuadernos')
+    parser.add_argument('--media-kb', type=int, default=0, help='KB de la imagen incrustada en cada DOCX')
+    parser.add_argument('--output', default=None, help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--compare', default=None, help='Archivo JSON de una ejecución anterior')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.stages, workers=args.workers, seed=args.seed,
+                            media_size=args.media_kb * 1024)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'Resultados guardados en {args.output}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Generador de cuadernos sintéticos para las mediciones de rendimiento.
+
+Los archivos tienen la estructura real de cada formato (PDF de varias páginas, paquetes DOCX y
+XLSX, TIFF de varias páginas y encabezados MP4), con nombres sin el prefijo del protocolo,
+como llegan de los despachos, y fechas de modificación distintas para que el orden sea estable.
+
+Uso:
+    python benchmarks/synthetic.py CARPETA --files 1000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import zipfile
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Proporción de cada formato en un cuaderno típico
+DEFAULT_MIX = {'.pdf': 60, '.docx': 15, '.xlsx': 5, '.tif': 10, '.jpg': 5, '.mp4': 5}
+
+# Nombres de documentos frecuentes en un cuaderno
+DOCUMENT_NAMES = [
+    'demanda', 'poder especial', 'anexos de la demanda', 'auto admisorio', 'notificacion personal',
+    'contestacion de la demanda', 'memorial de la parte actora', 'constancia secretarial',
+    'liquidacion del credito', 'acta de audiencia', 'sentencia de primera instancia', 'recurso de apelacion'
+]
+
+def build_pdf(pages):
+    """
+    Construye un PDF con tabla de referencias cruzadas clásica y `pages` páginas con texto.
+    """
+    content = b'BT /F1 12 Tf 72 720 Td (Documento del expediente) Tj ET'
+    kids = ' '.join(f'{5 + 2 * i} 0 R' for i in range(pages))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Producer (Escaner del despacho) /Title (Documento) >>',
+    ]
+    for i in range(pages):
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {6 + 2 * i} 0 R >>'.encode())
+        objects.append(f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream')
+
+    body = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(body)
+    body += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        body += f'{offset:010d} 00000 n \n'.encode()
+    body += (f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 4 0 R >>\n'
+             f'startxref\n{xref}\n%%EOF\n').encode()
+    return bytes(body)
+
+def _office_package(kind, main_part, main_xml, app_xml, content_type, media_size=0):
+    rels = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="{main_part}"/>'
+            '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>'
+            '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" Target="docProps/app.xml"/>'
+            '</Relationships>')
+    core = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            f'<dc:title>{kind}</dc:title><dc:creator>Despacho judicial</dc:creator>'
+            '<dcterms:created xsi:type="dcterms:W3CDTF">2024-03-15T10:30:00Z</dcterms:created>'
+            '<dcterms:modified xsi:type="dcterms:W3CDTF">2024-03-16T08:00:00Z</dcterms:modified>'
+            '</cp:coreProperties>')
+    types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+             '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+             '<Default Extension="xml" ContentType="application/xml"/>'
+             f'<Override PartName="/{main_part}" ContentType="{content_type}"/>'
+             '</Types>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', types)
+        package.writestr('_rels/.rels', rels)
+        package.writestr('docProps/core.xml', core)
+        package.writestr('docProps/app.xml', app_xml)
+        package.writestr(main_part, main_xml)
+        if media_size:
+            # Imagen escaneada incrustada, sin comprimir como las fotografías reales
+            package.writestr('word/media/image1.png', os.urandom(media_size), zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+def build_docx(pages, media_size=0):
+    """
+    Construye un paquete DOCX con `pages` páginas registradas en docProps/app.xml.
+    """
+    paragraphs = ''.join('<w:p><w:r><w:t>Texto del memorial</w:t></w:r></w:p>' for _ in range(pages * 20))
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{paragraphs}</w:body></w:document>')
+    app = ('<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+           f'<Application>Microsoft Office Word</Application><Pages>{pages}</Pages></Properties>')
+    return _office_package('Memorial', 'word/document.xml', document, app,
+                           'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml',
+                           media_size)
+
+def build_xlsx(sheets):
+    """
+    Construye un paquete XLSX con `sheets` hojas declaradas en xl/workbook.xml.
+    """
+    names = ''.join(f'<sheet name="Liquidación {i + 1}" sheetId="{i + 1}" r:id="rId{i + 1}"/>' for i in range(sheets))
+    workbook = ('<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets>{names}</sheets></workbook>')
+    app = ('<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+           '<Application>Microsoft Excel</Application></Properties>')
+    return _office_package('Liquidación', 'xl/workbook.xml', workbook, app,
+                           'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml')
+
+def build_tiff(pages, size=(170, 220)):
+    """
+    Construye un TIFF de `pages` páginas a 300 DPI.
+    """
+    from PIL import Image
+    page = Image.new('1', size, 1)
+    buffer = io.BytesIO()
+    page.save(buffer, format='TIFF', save_all=True, append_images=[page] * (pages - 1), dpi=(300, 300))
+    return buffer.getvalue()
+
+def build_jpeg(size=(640, 480)):
+    """
+    Construye una fotografía JPEG a 200 DPI.
+    """
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 200, 200)).save(buffer, format='JPEG', dpi=(200, 200))
+    return buffer.getvalue()
+
+def build_mp4(payload_size=4096):
+    """
+    Construye los encabezados de un MP4 (ftyp y mdat) con `payload_size` bytes de datos.
+    """
+    ftyp = b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom'
+    mdat = (8 + payload_size).to_bytes(4, 'big') + b'mdat' + bytes(payload_size)
+    return ftyp + mdat
+
+class _SampleCache:
+    """
+    Contenido de cada formato por número de páginas, generado una sola vez.
+    """
+
+    def __init__(self, media_size):
+        self.media_size = media_size
+        self._samples = {}
+
+    def get(self, extension, pages):
+        key = (extension, pages)
+        if key not in self._samples:
+            if extension == '.pdf':
+                data = build_pdf(pages)
+            elif extension == '.docx':
+                data = build_docx(pages, self.media_size)
+            elif extension == '.xlsx':
+                data = build_xlsx(pages)
+            elif extension == '.tif':
+                data = build_tiff(pages)
+            elif extension == '.jpg':
+                data = build_jpeg()
+            else:
+                data = build_mp4()
+            self._samples[key] = data
+        return self._samples[key]
+
+def create_cuaderno(folder_path, total_files, seed=0, mix=None, media_size=0):
+    """
+    Crea un cuaderno sintético con `total_files` archivos.
+
+    :param folder_path: Carpeta del cuaderno; se crea si no existe
+    :param total_files: Número de archivos
+    :param seed: Semilla para que dos ejecuciones generen el mismo cuaderno
+    :param mix: Proporción de cada extensión; por defecto DEFAULT_MIX
+    :param media_size: Bytes de la imagen incrustada en cada DOCX (0 para omitirla)
+    :return: Lista de (nombre del archivo, número de páginas esperado)
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    extensions = list(mix)
+    weights = [mix[extension] for extension in extensions]
+    samples = _SampleCache(media_size)
+    os.makedirs(folder_path, exist_ok=True)
+
+    manifest = []
+    base_time = time.time() - total_files - 3600
+    for i in range(total_files):
+        extension = rng.choices(extensions, weights)[0]
+        if extension in ('.pdf', '.docx'):
+            pages = rng.choice((1, 1, 2, 3, 5, 8, 13, 40))
+        elif extension == '.tif':
+            pages = rng.choice((1, 2, 4, 10))
+        elif extension == '.xlsx':
+            pages = rng.choice((1, 3))
+        else:
+            pages = 1
+        name = f'{rng.choice(DOCUMENT_NAMES)} {i + 1}{extension}'
+        path = os.path.join(folder_path, name)
+        with open(path, 'wb') as f:
+            f.write(samples.get(extension, pages))
+        os.utime(path, (base_time + i, base_time + i))
+        # Las hojas de un libro de Excel no son páginas del índice
+        manifest.append((name, 1 if extension == '.xlsx' else pages))
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder_path', help='Carpeta donde crear el cuaderno')
+    parser.add_argument('--files', type=int, default=1000, help='Número de archivos')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del generador')
+    parser.add_argument('--media-kb', type=int, default=0, help='KB de la imagen incrustada en cada DOCX')
+    args = parser.parse_args()
+
+    manifest = create_cuaderno(args.folder_path, args.files, seed=args.seed, media_size=args.media_kb * 1024)
+    print(f'{len(manifest)} archivos, {sum(pages for _, pages in manifest)} páginas en {args.folder_path}')
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,39 @@
-import pandas as pd
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment, Border, Side, Font, PatternFill
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.drawing.image import Image
+# pandas y openpyxl se importan dentro de las funciones que escriben libros, para no demorar
+# el inicio de la aplicación con bibliotecas que solo se necesitan al generar el índice
 import io
-import xlwings as xw
 import os
 import shutil
+from functools import lru_cache
+from excel_pool import get_default_pool
+
+# Campos de metadatos del expediente (filas 3 a 10, columna A)
+METADATA_FIELDS = [
+    "Ciudad", "Despacho Judicial", "Serie o Subserie Documental",
+    "No. Radicación del Proceso", "Partes Procesales (Parte A)",
+    "Partes Procesales (Parte B)", "Terceros Intervinientes", "Cuaderno"
+]
+
+# Encabezados de la tabla del índice (fila 11)
+INDEX_HEADERS = [
+    "Nombre Documento", "Fecha Creación Documento", "Fecha Incorporación Expediente",
+    "Orden Documento", "Número Páginas", "Página Inicio", "Página Fin",
+    "Formato", "Tamaño", "Origen", "Observaciones"
+]
+
+# Logo del índice, resuelto respecto al módulo para no depender del directorio de trabajo
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'logo.png')
+
+# Anchos fijos usados en la escritura por flujo, donde no se conoce el contenido de antemano
+STREAMING_COLUMN_WIDTHS = [40, 22, 16, 10, 10, 10, 10, 9, 11, 14, 30, 50, 12, 12]
+
+# Plantilla del índice con macros
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', '000IndiceElectronicoC0.xlsm')
 
 def save_excel_file(df, file_path, use_template=False, metadata=None):
     """
     Guarda el DataFrame en un archivo Excel, ya sea usando una plantilla o creando uno nuevo.
+
+    La plantilla se llena editando el paquete .xlsm directamente (ver xlsm_template), sin abrir Excel.
     
     :param df: DataFrame con los datos del índice
     :param file_path: Ruta donde se guardará el archivo Excel
@@ -18,7 +41,8 @@ def save_excel_file(df, file_path, use_template=False, metadata=None):
     :param metadata: Diccionario con los metadatos del expediente
     """
     if use_template:
-        fill_template_xlwings(df, file_path, metadata)
+        from xlsm_template import fill_template_package
+        fill_template_package(TEMPLATE_PATH, file_path, df, metadata)
     else:
         wb = create_new_excel(df, metadata)
         wb.save(file_path)
@@ -31,19 +55,17 @@ def create_new_excel(df, metadata=None):
     :param metadata: Diccionario con los metadatos del expediente
     :return: Workbook de openpyxl
     """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+    from openpyxl.utils.dataframe import dataframe_to_rows
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Índice Electrónico"
+    register_index_styles(wb)
 
-    # Agregar logo
-    img = Image('assets/logo.png')
-    
-    # Ajustar tamaño de la imagen W. 1.9" x H. 0.5"
-    img.width = 1.9 * 72
-    img.height = 0.5 * 72   
-
-    # Insertar imagen en la celda A1
-    ws.add_image(img, 'A1')
+    # Insertar logo en la celda A1
+    ws.add_image(load_logo(), 'A1')
 
     # Título
     ws['B2'] = "ÍNDICE ELECTRÓNICO DEL EXPEDIENTE JUDICIAL"
@@ -51,91 +73,198 @@ def create_new_excel(df, metadata=None):
     ws.merge_cells('B2:K2')
 
     # Metadatos del expediente
-    metadata_fields = [
-        "Ciudad", "Despacho Judicial", "Serie o Subserie Documental",
-        "No. Radicación del Proceso", "Partes Procesales (Parte A)",
-        "Partes Procesales (Parte B)", "Terceros Intervinientes", "Cuaderno"
-    ]
-    for i, field in enumerate(metadata_fields, start=3):
-        ws.cell(row=i, column=1, value=field)
-        ws.cell(row=i, column=1).font = Font(bold=True)
+    bold = Font(bold=True)
+    for i, field in enumerate(METADATA_FIELDS, start=3):
+        ws.cell(row=i, column=1, value=field).font = bold
         ws.merge_cells(f'B{i}:K{i}')
         if metadata and field in metadata:
             ws.cell(row=i, column=2, value=metadata[field])
 
-    # Expediente físico
+    # Expediente físico: las respuestas van en la columna M, J3 queda dentro de B3:K3
     ws['L3'] = "EXPEDIENTE FÍSICO"
-    ws['L3'].font = Font(bold=True)
+    ws['L3'].font = bold
     ws.merge_cells('L3:N3')
     ws['L4'] = "El expediente judicial posee documentos físicos:"
     ws['L5'] = "No. de carpetas (cuadernos), legajos o tomos:"
     ws['L6'] = "No. de carpetas (cuadernos), legajos o tomos digitalizados:"
     if metadata:
-        ws['J3'] = metadata.get('Expediente Físico', '')
-        ws['J5'] = metadata.get('No. Carpetas', '')
-        ws['J6'] = metadata.get('No. Carpetas Digitalizadas', '')
+        ws['M4'] = metadata.get('Expediente Físico', '')
+        ws['M5'] = metadata.get('No. Carpetas', '')
+        ws['M6'] = metadata.get('No. Carpetas Digitalizadas', '')
 
     # Encabezados de la tabla
-    headers = [
-        "Nombre Documento", "Fecha Creación Documento", "Fecha Incorporación Expediente",
-        "Orden Documento", "Número Páginas", "Página Inicio", "Página Fin", 
-        "Formato", "Tamaño", "Origen", "Observaciones"
-    ]
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=11, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    for col, header in enumerate(INDEX_HEADERS, start=1):
+        ws.cell(row=11, column=col, value=header).style = HEADER_STYLE
 
     # Agregar datos
     for r in dataframe_to_rows(df, index=False, header=False):
         ws.append(r)
 
-    # Aplicar estilos
+    # Aplicar el estilo compartido
     for row in ws.iter_rows(min_row=12, max_row=ws.max_row, min_col=1, max_col=11):
         for cell in row:
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                                 top=Side(style='thin'), bottom=Side(style='thin'))
+            cell.style = CELL_STYLE
 
     # Ajustar ancho de columnas
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column_letter].width = adjusted_width
+    for column_letter, width in compute_column_widths(ws, df).items():
+        ws.column_dimensions[column_letter].width = width
 
     return wb
 
-def fill_template_xlwings(df, file_path, metadata=None):
+def compute_column_widths(ws, df, header_rows=11):
+    """
+    Calcula el ancho de cada columna a partir del encabezado de la hoja y de los datos del DataFrame.
+
+    El encabezado tiene pocas celdas y se recorre en la hoja; para los datos se usan las longitudes
+    de texto vectorizadas de pandas en lugar de recorrer cada celda.
+
+    :param ws: Hoja con el encabezado ya escrito
+    :param df: DataFrame con los datos del índice (escritos a partir de la fila header_rows + 1)
+    :param header_rows: Número de filas del encabezado
+    :return: Diccionario {letra de columna: ancho}
+    """
+    from openpyxl.utils import get_column_letter
+
+    lengths = [0] * max(ws.max_column, len(df.columns))
+    for row in ws.iter_rows(min_row=1, max_row=header_rows, values_only=True):
+        for col, value in enumerate(row):
+            if isinstance(value, str):
+                lengths[col] = max(lengths[col], len(value))
+    for col, name in enumerate(df.columns):
+        values = df[name].dropna()
+        if len(values):
+            lengths[col] = max(lengths[col], int(values.astype(str).str.len().max()))
+    return {get_column_letter(col): length + 2 for col, length in enumerate(lengths, start=1)}
+
+@lru_cache(maxsize=1)
+def _read_logo(logo_path):
+    with open(logo_path, 'rb') as f:
+        return f.read()
+
+def load_logo(logo_path=LOGO_PATH):
+    """
+    Devuelve el logo del índice con el tamaño del formato (W. 1.9" x H. 0.5").
+
+    Los bytes del archivo se leen una sola vez; cada llamada entrega una imagen nueva,
+    porque openpyxl la lee al guardar el libro.
+    """
+    from openpyxl.drawing.image import Image
+
+    img = Image(io.BytesIO(_read_logo(logo_path)))
+    img.width = 1.9 * 72
+    img.height = 0.5 * 72
+    return img
+
+# Estilos con nombre que se registran una sola vez por libro
+HEADER_STYLE = 'Índice Encabezado'
+CELL_STYLE = 'Índice Celda'
+
+def register_index_styles(wb):
+    """
+    Registra en el libro los estilos con nombre de los encabezados y las celdas del índice.
+
+    Asignar un estilo por nombre evita crear y comparar objetos de estilo en cada celda.
+    """
+    if HEADER_STYLE in wb.named_styles:
+        return
+    from openpyxl.styles import Alignment, Border, Side, Font, PatternFill, NamedStyle
+
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(bold=True)
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    wb.add_named_style(header)
+
+    thin = Side(style='thin')
+    cell = NamedStyle(name=CELL_STYLE)
+    cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    wb.add_named_style(cell)
+
+def write_index_streaming(rows, file_path, metadata=None):
+    """
+    Escribe el índice en un libro de solo escritura a medida que se generan las filas.
+
+    Produce el mismo encabezado que create_new_excel, pero las filas se escriben directamente
+    en el archivo sin conservarse en memoria, por lo que el consumo es constante sin importar
+    el número de documentos. Los anchos de columna son fijos (STREAMING_COLUMN_WIDTHS).
+
+    :param rows: Iterable de diccionarios con las columnas de INDEX_HEADERS
+    :param file_path: Ruta donde se guardará el archivo Excel
+    :param metadata: Diccionario con los metadatos del expediente
+    :return: Número de filas de datos escritas
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Índice Electrónico")
+    register_index_styles(wb)
+
+    for col, width in enumerate(STREAMING_COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    ws.add_image(load_logo(), 'A1')
+
+    def styled(value, style=None, font=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if style:
+            cell.style = style
+        if font:
+            cell.font = font
+        return cell
+
+    bold = Font(bold=True)
+    metadata = metadata or {}
+
+    # Filas 1 a 10: logo, título, metadatos del expediente y expediente físico
+    ws.append([])
+    ws.append([None, styled("ÍNDICE ELECTRÓNICO DEL EXPEDIENTE JUDICIAL", font=Font(bold=True, size=14))])
+    ws.merged_cells.add('B2:K2')
+    # El expediente físico va en las columnas L (pregunta) y M (respuesta), fuera de las celdas combinadas
+    side_rows = {
+        3: [styled("EXPEDIENTE FÍSICO", font=bold)],
+        4: ["El expediente judicial posee documentos físicos:", metadata.get('Expediente Físico')],
+        5: ["No. de carpetas (cuadernos), legajos o tomos:", metadata.get('No. Carpetas')],
+        6: ["No. de carpetas (cuadernos), legajos o tomos digitalizados:", metadata.get('No. Carpetas Digitalizadas')]
+    }
+    for i, field in enumerate(METADATA_FIELDS, start=3):
+        ws.append([styled(field, font=bold), metadata.get(field)] + [None] * 9 + side_rows.get(i, []))
+        ws.merged_cells.add(f'B{i}:K{i}')
+    ws.merged_cells.add('L3:N3')
+
+    # Fila 11: encabezados de la tabla
+    ws.append([styled(header, HEADER_STYLE) for header in INDEX_HEADERS])
+
+    # Filas de datos con el estilo compartido
+    count = 0
+    for row in rows:
+        ws.append([styled(row.get(header), CELL_STYLE) for header in INDEX_HEADERS])
+        count += 1
+
+    wb.save(file_path)
+    return count
+
+def fill_template_xlwings(df, file_path, metadata=None, excel_pool=None):
     """
     Llena la plantilla Excel con los datos del DataFrame usando xlwings.
     
     :param df: DataFrame con los datos del índice
     :param file_path: Ruta donde se guardará el archivo Excel
     :param metadata: Diccionario con los metadatos del expediente
+    :param excel_pool: Grupo de instancias de Excel (ExcelAppPool); por defecto el del proceso
     """
-    template_path = os.path.join('assets', '000IndiceElectronicoC0.xlsm')
-    shutil.copy(template_path, file_path)
+    shutil.copy(TEMPLATE_PATH, file_path)
     
-    with xw.App(visible=False) as app:
-        wb = xw.Book(file_path)
+    with (excel_pool or get_default_pool()).app() as app:
+        wb = app.books.open(file_path)
         ws = wb.sheets[0]
         
         # Llenar metadatos del expediente
-        metadata_fields = [
-            "Ciudad", "Despacho Judicial", "Serie o Subserie Documental",
-            "No. Radicación del Proceso", "Partes Procesales (Parte A)",
-            "Partes Procesales (Parte B)", "Terceros Intervinientes", "Cuaderno"
-        ]
         if metadata:
-            for i, field in enumerate(metadata_fields, start=3):
+            for i, field in enumerate(METADATA_FIELDS, start=3):
                 if field in metadata:
                     ws.range(f'B{i}').value = metadata[field]
             
@@ -149,14 +278,23 @@ def fill_template_xlwings(df, file_path, metadata=None):
         wb.save()
         wb.close()
 
-def dataframe_to_excel(df):
+def dataframe_to_excel(df, metadata=None, index_format=False):
     """
-    Convierte un DataFrame a un archivo Excel en memoria.
+    Convierte un DataFrame a un archivo Excel en memoria, sin pasar por el disco.
     
     :param df: DataFrame a convertir
+    :param metadata: Metadatos del expediente para el encabezado (solo con index_format)
+    :param index_format: True para generar el libro con el formato del índice (ver create_new_excel),
+                         el mismo que guarda save_excel_file sin plantilla
     :return: Bytes del archivo Excel
     """
     output = io.BytesIO()
+    if index_format:
+        create_new_excel(df, metadata).save(output)
+        return output.getvalue()
+
+    import pandas as pd
+
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Índice Electrónico')
     return output.getvalue()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from multiprocessing import util
+
+# Libros que procesa una instancia de Excel antes de reemplazarla por una nueva
+DEFAULT_MAX_BOOKS = 50
+
+def _start_excel():
+    import xlwings as xw
+    return xw.App(visible=False, add_book=False)
+
+class ExcelAppPool:
+    """
+    Grupo de instancias ocultas de Excel que se reutilizan entre índices.
+
+    Iniciar Excel tarda varios segundos; el grupo mantiene las instancias abiertas mientras dura
+    el proceso y las entrega a cada trabajo con `with pool.app() as app:`. Antes de entregar una
+    instancia se comprueba que siga respondiendo, y se reemplaza si el trabajo falló o si ya
+    procesó `max_books` libros.
+    """
+
+    def __init__(self, size=1, max_books=DEFAULT_MAX_BOOKS, app_factory=None):
+        """
+        :param size: Número máximo de instancias de Excel abiertas a la vez
+        :param max_books: Libros que procesa una instancia antes de reciclarla
+        :param app_factory: Función que crea una instancia; por defecto xw.App(visible=False)
+        """
+        self.size = size
+        self.max_books = max_books
+        self.app_factory = app_factory or _start_excel
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.started = 0
+        self.recycled = 0
+
+    @contextmanager
+    def app(self, timeout=None):
+        """
+        Entrega una instancia de Excel sana durante el bloque `with`.
+
+        :param timeout: Segundos de espera si todas las instancias están ocupadas
+        """
+        if self._closed:
+            raise RuntimeError("El grupo de instancias de Excel está cerrado")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No hay instancias de Excel disponibles")
+        entry = None
+        try:
+            entry = self._checkout()
+            yield entry[0]
+        except BaseException:
+            # Un error a mitad de trabajo puede dejar Excel con diálogos o libros abiertos
+            if entry is not None:
+                self._discard(entry)
+            raise
+        else:
+            entry[1] += 1
+            if entry[1] >= self.max_books or self._closed:
+                self._discard(entry)
+            else:
+                self._idle.put(entry)
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                app = self.app_factory()
+                entry = [app, 0]
+                with self._lock:
+                    self.started += 1
+                return entry
+            if _is_alive(entry[0]):
+                return entry
+            self._discard(entry)
+
+    def _discard(self, entry):
+        with self._lock:
+            self.recycled += 1
+        _quit(entry[0])
+
+    def close(self):
+        """
+        Cierra todas las instancias de Excel del grupo.
+        """
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _quit(entry[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _is_alive(app):
+    # Excel responde si se puede consultar la colección de libros
+    try:
+        len(app.books)
+        return True
+    except Exception:
+        return False
+
+def _quit(app):
+    try:
+        for book in list(app.books):
+            book.close()
+        app.quit()
+    except Exception:
+        try:
+            app.kill()
+        except Exception:
+            pass
+
+# Grupo por defecto de cada hilo: las instancias de xlwings (objetos COM) pertenecen al hilo que
+# las creó y no pueden usarse desde otro
+_default_pools = threading.local()
+
+def get_default_pool():
+    """
+    Devuelve el grupo de instancias de Excel del proceso y el hilo actuales.
+
+    Cada proceso (por ejemplo, cada trabajador del procesamiento por lote) y cada hilo (por
+    ejemplo, el QThread de la aplicación de escritorio) tiene su propio grupo, que se cierra al
+    terminar el proceso.
+    """
+    pid = os.getpid()
+    pool = getattr(_default_pools, 'pool', None)
+    # Un proceso creado con fork hereda el grupo del hilo que lo creó; se usa uno nuevo
+    if pool is None or _default_pools.pid != pid:
+        pool = _default_pools.pool = ExcelAppPool()
+        _default_pools.pid = pid
+        # Finalize también se ejecuta al salir de los procesos de multiprocessing, a diferencia de atexit
+        util.Finalize(pool, pool.close, exitpriority=10)
+    return pool
@@ -1,61 +1,335 @@
 import os
 import re
+import json
+import uuid
 from datetime import datetime
 import string
+from progress import ProgressTracker
 
-def rename_files(folder_path):
+# Diario de renombrado: permite completar o deshacer un renombrado interrumpido
+JOURNAL_NAME = '.renombrado_en_curso.json'
+
+# Nombre de documento que ya cumple el protocolo (sin el número de orden ni la extensión)
+PROTOCOL_NAME_RE = re.compile(r'[A-Z0-9][A-Za-z0-9]{0,35}')
+
+# Numeración inicial de "<número de orden>/<nombre sin extensión>", que se quita para obtener el
+# nombre del documento en el índice: si el nombre empieza por su número de orden seguido de un
+# nombre que cumple el protocolo, solo ese número (la misma regla de protocol_name); en otro caso,
+# toda la numeración inicial
+ORDER_PREFIX_RE = re.compile(r'^(\d+)/(?:\1(?=' + PROTOCOL_NAME_RE.pattern + r'$)|\d*)')
+
+def is_index_document(filename):
+    """
+    Indica si un archivo forma parte del índice: no es oculto, tiene extensión y no es un índice.
+    """
+    return (not filename.startswith('.')
+            and os.path.splitext(filename)[1] != ''
+            and not is_index_workbook(filename))
+
+def is_index_workbook(filename):
+    """
+    Indica si el archivo es un índice electrónico en Excel.
+    """
+    return 'indice' in filename.lower() and filename.endswith(('.xlsx', '.xlsm', '.xls'))
+
+class DirectorySnapshot:
+    """
+    Archivos de una carpeta con su información de os.stat, obtenidos en un solo recorrido de os.scandir.
+
+    El renombrado y la generación del índice comparten la misma instantánea, en lugar de listar la
+    carpeta y consultar cada archivo varias veces (en carpetas de red cada consulta es un viaje de ida
+    y vuelta). Los cambios de nombre se aplican también a la instantánea (ver apply_renames).
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.refresh()
+
+    def refresh(self):
+        """
+        Vuelve a recorrer la carpeta.
+        """
+        self.stats = {}
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        self.stats[entry.name] = entry.stat()
+                except OSError:
+                    # El archivo desapareció o no es accesible durante el recorrido
+                    pass
+
+    def path(self, filename):
+        return os.path.join(self.folder_path, filename)
+
+    def stat(self, filename):
+        return self.stats[filename]
+
+    def documents(self):
+        """
+        Documentos del índice ordenados por fecha de modificación (y por nombre si coinciden).
+        """
+        return sorted((f for f in self.stats if is_index_document(f)),
+                      key=lambda f: (self.stats[f].st_mtime, f))
+
+    def index_workbooks(self):
+        """
+        Índices electrónicos en Excel presentes en la carpeta, ordenados por nombre.
+        """
+        return sorted(f for f in self.stats if is_index_workbook(f))
+
+    def apply_renames(self, renames):
+        # Un cambio de nombre conserva el tamaño y la fecha de modificación del archivo
+        stats = {name: stat for name, stat in self.stats.items() if name not in renames}
+        stats.update({renames[name]: stat for name, stat in self.stats.items() if name in renames})
+        self.stats = stats
+
+def rename_files(folder_path, dry_run=False, snapshot=None, progress=None, cancel=None):
     """
     Renombra los archivos en la carpeta según el protocolo, eliminando cualquier numeración existente
     y aplicando una nueva numeración basada en la fecha de modificación.
+
+    Solo se renombran los archivos cuyo nombre cambia (ver plan_renames). Si un renombrado anterior
+    quedó interrumpido, primero se completa (ver recover_renames).
+
+    :param folder_path: Carpeta de los archivos
+    :param dry_run: True para calcular los cambios sin renombrar ningún archivo
+    :param snapshot: DirectorySnapshot de la carpeta, que se actualiza con los nuevos nombres
+    :param progress: Función que recibe el avance (ver apply_renames)
+    :param cancel: CancellationToken; si se cancela, los archivos conservan sus nombres originales
+    :return: Diccionario {nombre actual: nombre nuevo} de los archivos renombrados (o por renombrar)
+    :raises OperationCancelled: Si se solicitó la cancelación
     """
-    files = [f for f in os.listdir(folder_path) 
-             if os.path.isfile(os.path.join(folder_path, f)) 
-             and not f.startswith('.') 
-             and os.path.splitext(f)[1] != ''
-             and not ('indice' in f.lower() and f.endswith(('.xlsx', '.xlsm', '.xls')))]
-    
-    # Crear un diccionario para almacenar los archivos y sus fechas de modificación
-    file_dates = {f: os.path.getmtime(os.path.join(folder_path, f)) for f in files}
-    
-    # Ordenar los archivos por fecha de modificación
-    sorted_files = sorted(file_dates.items(), key=lambda x: x[1])
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    recovered = not dry_run and recover_renames(folder_path) is not None
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    elif recovered:
+        # La instantánea no refleja los nombres recuperados
+        snapshot.refresh()
+
+    new_names = plan_renames(folder_path, snapshot)
+
+    # Aplicar los cambios de nombre
+    if not dry_run:
+        apply_renames(folder_path, new_names, progress=progress, cancel=cancel)
+        snapshot.apply_renames(new_names)
+
+    return new_names
+
+def plan_renames(folder_path, snapshot=None):
+    """
+    Calcula en memoria el nombre que corresponde a cada archivo y lo compara con el actual.
+
+    Volver a ejecutarlo sobre una carpeta ya renombrada produce un plan vacío: los nombres que
+    ya llevan su número de orden y cumplen el protocolo se conservan y los archivos con la misma
+    fecha de modificación se ordenan por nombre, por lo que la numeración no cambia entre ejecuciones.
+
+    :param folder_path: Carpeta de los archivos
+    :param snapshot: DirectorySnapshot de la carpeta; si no se indica, se recorre la carpeta
+    :return: Diccionario {nombre actual: nombre nuevo} solo con los archivos cuyo nombre cambia
+    """
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
     
-    # Renombrar los archivos
+    # Archivos ordenados por fecha de modificación (y por nombre si coinciden)
     new_names = {}
-    for index, (filename, _) in enumerate(sorted_files, start=1):
-        file_path = os.path.join(folder_path, filename)
+    for index, filename in enumerate(snapshot.documents(), start=1):
         name, extension = os.path.splitext(filename)
-        
-        # Eliminar cualquier número al inicio del nombre
-        name = re.sub(r'^\d+', '', name)
-        
-        # Eliminar caracteres no alfanuméricos y espacios
-        name = re.sub(r'[^a-zA-Z0-9 ]+', '', name)
-        
-        # Aplicar mayúscula a la primera letra de cada palabra
-        name = name.title()
-        
-        # Eliminar espacios
-        name = name.replace(" ", "")
-        
-        # Limitar a 36 caracteres
-        name = name[:36]
-        
-        # Si está vacío, asignar "DocumentoElectronico"
-        if not name:
-            name = "DocumentoElectronico"
-        
-        new_name = f"{index:03d}{name}{extension}"
-        new_names[filename] = new_name
-    
-    # Aplicar los cambios de nombre
-    for old_name, new_name in new_names.items():
-        old_path = os.path.join(folder_path, old_name)
-        new_path = os.path.join(folder_path, new_name)
-        os.rename(old_path, new_path)
+        new_name = f"{index:03d}{protocol_name(name, index)}{extension}"
+        if new_name != filename:
+            new_names[filename] = new_name
 
     return new_names
 
+def protocol_name(name, order=None):
+    """
+    Devuelve el nombre del documento según el protocolo, sin prefijo numérico ni extensión.
+
+    :param name: Nombre actual del archivo, sin extensión
+    :param order: Número de orden que se asignará al documento. Si el nombre ya empieza por ese
+                  número seguido de un nombre que cumple el protocolo, se conserva tal cual, de
+                  modo que renombrar de nuevo la carpeta no cambia nada (por ejemplo, 0015Informe
+                  en la posición 1 sigue siendo 5Informe)
+    """
+    if order is not None:
+        prefix = f"{order:03d}"
+        if name.startswith(prefix) and PROTOCOL_NAME_RE.fullmatch(name[len(prefix):]):
+            return name[len(prefix):]
+
+    # Eliminar cualquier número al inicio del nombre
+    name = re.sub(r'^\d+', '', name)
+    
+    # Eliminar caracteres no alfanuméricos y espacios
+    name = re.sub(r'[^a-zA-Z0-9 ]+', '', name)
+    
+    # Aplicar mayúscula a la primera letra de cada palabra
+    name = name.title()
+    
+    # Eliminar espacios
+    name = name.replace(" ", "")
+    
+    # Limitar a 36 caracteres
+    name = name[:36]
+    
+    # Si está vacío, asignar "DocumentoElectronico"
+    if not name:
+        name = "DocumentoElectronico"
+
+    return name
+
+def apply_renames(folder_path, renames, progress=None, cancel=None):
+    """
+    Aplica un conjunto de cambios de nombre en dos fases registradas en un diario.
+
+    Primero todos los archivos pasan a nombres temporales únicos y luego a sus nombres finales,
+    de modo que un nombre nuevo puede coincidir con el nombre anterior de otro archivo. El diario
+    (JOURNAL_NAME) se guarda en la carpeta antes de mover cualquier archivo; si el proceso se
+    interrumpe, recover_renames completa o deshace el renombrado. Ante un error, los cambios ya
+    hechos se revierten y el error se propaga.
+
+    La cancelación se consulta antes de mover cada archivo y se trata como un error: los
+    archivos ya movidos vuelven a su nombre original.
+
+    :param folder_path: Carpeta de los archivos
+    :param renames: Diccionario {nombre actual: nombre nuevo}
+    :param progress: Función que recibe ('renombrado', movimientos hechos, total, segundos restantes);
+                     cada archivo se mueve dos veces, una por fase
+    :param cancel: CancellationToken que se consulta antes de cada movimiento
+    """
+    token = uuid.uuid4().hex[:8]
+    entries = [[old_name, f'.renombrando_{token}_{i}', new_name]
+               for i, (old_name, new_name) in enumerate(renames.items())]
+    if not entries:
+        return
+
+    # Un nombre final no puede estar ocupado por un archivo que no forma parte del renombrado. En los
+    # sistemas de archivos que no distinguen mayúsculas (Windows, macOS), el nombre final puede ser
+    # el mismo archivo que se renombra (001demanda.pdf -> 001Demanda.pdf) u otro archivo del renombrado.
+    sources = None
+    for _, _, new_name in entries:
+        if new_name in renames or not os.path.lexists(os.path.join(folder_path, new_name)):
+            continue
+        if sources is None:
+            sources = _renamed_sources(folder_path, renames)
+        if not _is_renamed_source(folder_path, new_name, sources):
+            raise FileExistsError(f"Ya existe un archivo con el nombre {new_name}")
+
+    tracker = ProgressTracker('renombrado', len(entries) * 2, progress, cancel)
+    journal = {'fase': 1, 'archivos': entries}
+    _write_journal(folder_path, journal)
+    try:
+        _move(folder_path, entries, 0, 1, tracker)
+        journal['fase'] = 2
+        _write_journal(folder_path, journal)
+        _move(folder_path, entries, 1, 2, tracker)
+    except BaseException:
+        _rollback(folder_path, journal)
+        raise
+    _remove_journal(folder_path)
+
+def recover_renames(folder_path, rollback=False):
+    """
+    Completa o deshace un renombrado interrumpido a partir del diario de la carpeta.
+
+    :param folder_path: Carpeta de los archivos
+    :param rollback: True para devolver los archivos a sus nombres originales;
+                     por defecto se completa el renombrado
+    :return: Diccionario {nombre anterior: nombre nuevo} del renombrado recuperado, o None si no
+             había un renombrado pendiente
+    """
+    journal_path = os.path.join(folder_path, JOURNAL_NAME)
+    if not os.path.exists(journal_path):
+        return None
+    with open(journal_path, encoding='utf-8') as f:
+        journal = json.load(f)
+    entries = journal['archivos']
+
+    if rollback:
+        _rollback(folder_path, journal)
+        return {old_name: new_name for old_name, _, new_name in entries}
+
+    if journal['fase'] == 1:
+        # Terminar la primera fase con los archivos que aún conservan su nombre original
+        _move(folder_path, [e for e in entries if not _exists(folder_path, e[1])], 0, 1)
+        journal['fase'] = 2
+        _write_journal(folder_path, journal)
+    _move(folder_path, [e for e in entries if _exists(folder_path, e[1])], 1, 2)
+    _remove_journal(folder_path)
+    return {old_name: new_name for old_name, _, new_name in entries}
+
+def _rollback(folder_path, journal):
+    # En la segunda fase, los archivos que ya tienen su nombre final vuelven primero al temporal
+    entries = journal['archivos']
+    if journal['fase'] == 2:
+        _move(folder_path, [e for e in entries if not _exists(folder_path, e[1])], 2, 1)
+    _move(folder_path, [e for e in entries if _exists(folder_path, e[1])], 1, 0)
+    _remove_journal(folder_path)
+
+def _move(folder_path, entries, source, target, tracker=None):
+    for entry in entries:
+        if tracker is not None:
+            tracker.check()
+        os.rename(os.path.join(folder_path, entry[source]), os.path.join(folder_path, entry[target]))
+        if tracker is not None:
+            tracker.advance()
+
+def _renamed_sources(folder_path, renames):
+    # Nombres (normalizados según el sistema) e identificadores de archivo de los nombres actuales
+    names = {os.path.normcase(old_name) for old_name in renames}
+    files = set()
+    for old_name in renames:
+        try:
+            stat = os.stat(os.path.join(folder_path, old_name))
+        except OSError:
+            continue
+        files.add((stat.st_dev, stat.st_ino))
+    return names, files
+
+def _is_renamed_source(folder_path, name, sources):
+    # Indica si `name` designa uno de los archivos que se renombran
+    names, files = sources
+    if os.path.normcase(name) in names:
+        return True
+    try:
+        stat = os.stat(os.path.join(folder_path, name))
+    except OSError:
+        return False
+    return (stat.st_dev, stat.st_ino) in files
+
+def _exists(folder_path, name):
+    return os.path.lexists(os.path.join(folder_path, name))
+
+def _write_journal(folder_path, journal):
+    # Escritura atómica y sincronizada: el diario siempre describe un estado completo
+    journal_path = os.path.join(folder_path, JOURNAL_NAME)
+    temp_path = journal_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(journal, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, journal_path)
+    _sync_folder(folder_path)
+
+def _remove_journal(folder_path):
+    journal_path = os.path.join(folder_path, JOURNAL_NAME)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    _sync_folder(folder_path)
+
+def _sync_folder(folder_path):
+    # Persistir las entradas del directorio; no disponible en Windows
+    if os.name == 'nt':
+        return
+    fd = os.open(folder_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 def get_file_metadata(file_path):
     """
     Obtiene los metadatos básicos de un archivo.
@@ -0,0 +1,244 @@
+import io
+import struct
+
+# Límite de directorios (IFD) que se recorren en un TIFF, como protección ante cadenas circulares o corruptas
+MAX_TIFF_PAGES = 100000
+
+# Límite de segmentos que se revisan en un JPEG antes de encontrar las dimensiones
+MAX_JPEG_SEGMENTS = 1000
+
+# Etiquetas TIFF que se leen del primer directorio
+TIFF_NEW_SUBFILE_TYPE = 254
+TIFF_IMAGE_WIDTH = 256
+TIFF_IMAGE_LENGTH = 257
+TIFF_X_RESOLUTION = 282
+TIFF_Y_RESOLUTION = 283
+TIFF_RESOLUTION_UNIT = 296
+
+# Tamaño en bytes de cada tipo de dato TIFF (BYTE, ASCII, SHORT, LONG, RATIONAL, ..., LONG8)
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 16: 8, 17: 8, 18: 8}
+TIFF_TYPE_FORMATS = {1: 'B', 3: 'H', 4: 'I', 5: 'II', 6: 'b', 8: 'h', 9: 'i', 10: 'ii', 16: 'Q', 18: 'Q'}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Marcadores SOF de JPEG que contienen las dimensiones (se excluyen DHT, JPG y DAC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+class ImageHeaderError(Exception):
+    """
+    Indica que el encabezado de la imagen no se puede leer con el lector rápido.
+    """
+
+def read_image_header(file_path):
+    """
+    Obtiene el formato, las dimensiones, la resolución y el número de páginas de una imagen
+    TIFF, JPEG o PNG leyendo solo sus encabezados, sin decodificar los píxeles.
+
+    En un TIFF se recorre la cadena de directorios (IFD) para contar las páginas; las miniaturas
+    (directorios de resolución reducida) no se cuentan. El costo no depende del tamaño de la imagen.
+
+    :param file_path: Ruta del archivo, o un objeto tipo archivo abierto en modo binario
+    :return: Diccionario con 'format', 'width', 'height', 'dpi' ((x, y) o None) y 'pages',
+             o None si el formato no es TIFF, JPEG ni PNG
+    :raises ImageHeaderError: Si el encabezado está dañado
+    """
+    if hasattr(file_path, 'read'):
+        return _read_header(file_path)
+    with open(file_path, 'rb') as file:
+        return _read_header(file)
+
+def _read_header(file):
+    start = file.read(8)
+    file.seek(0)
+    try:
+        if start[:4] in (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'):
+            return _read_tiff(file)
+        if start[:3] == b'\xff\xd8\xff':
+            return _read_jpeg(file)
+        if start == PNG_SIGNATURE:
+            return _read_png(file)
+    except (struct.error, ValueError, KeyError) as e:
+        raise ImageHeaderError(str(e)) from e
+    return None
+
+def _read_exact(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ImageHeaderError('Fin de archivo inesperado')
+    return data
+
+class _TiffReader:
+    """
+    Lector de la estructura de un TIFF clásico o BigTIFF, también usado para los datos Exif de un JPEG.
+    """
+
+    def __init__(self, file, base=0):
+        self.file = file
+        self.base = base
+        file.seek(base)
+        header = _read_exact(file, 8)
+        self.order = '<' if header[:2] == b'II' else '>'
+        version = struct.unpack(self.order + 'H', header[2:4])[0]
+        self.big = version == 43
+        if self.big:
+            # BigTIFF: tamaño de los desplazamientos (8) y primer directorio de 8 bytes
+            self.first_ifd = struct.unpack(self.order + 'Q', _read_exact(file, 8))[0]
+            self.count_format, self.offset_format, self.entry_size, self.inline_size = 'Q', 'Q', 20, 8
+        elif version == 42:
+            self.first_ifd = struct.unpack(self.order + 'I', header[4:8])[0]
+            self.count_format, self.offset_format, self.entry_size, self.inline_size = 'H', 'I', 12, 4
+        else:
+            raise ImageHeaderError('Versión de TIFF desconocida')
+
+    def read_ifd(self, offset):
+        """
+        Lee un directorio y devuelve sus entradas {etiqueta: (tipo, cantidad, campo)} y el
+        desplazamiento del siguiente directorio.
+        """
+        file = self.file
+        file.seek(self.base + offset)
+        count_size = struct.calcsize(self.count_format)
+        count = struct.unpack(self.order + self.count_format, _read_exact(file, count_size))[0]
+        data = _read_exact(file, count * self.entry_size + self.inline_size)
+        entry_format = self.order + 'HH' + self.offset_format + f'{self.inline_size}s'
+        entries = {}
+        for i in range(count):
+            tag, kind, values, field = struct.unpack_from(entry_format, data, i * self.entry_size)
+            entries[tag] = (kind, values, field)
+        next_offset = struct.unpack_from(self.order + self.offset_format, data, count * self.entry_size)[0]
+        return entries, next_offset
+
+    def value(self, entries, tag, default=None):
+        """
+        Obtiene el primer valor de una etiqueta; los RATIONAL se devuelven como número decimal.
+        """
+        if tag not in entries:
+            return default
+        kind, values, field = entries[tag]
+        value_format = TIFF_TYPE_FORMATS.get(kind)
+        if value_format is None or values < 1:
+            return default
+        size = TIFF_TYPE_SIZES[kind]
+        if size * values > self.inline_size:
+            # El valor no cabe en la entrada: el campo es el desplazamiento donde está guardado
+            offset = struct.unpack(self.order + self.offset_format, field)[0]
+            self.file.seek(self.base + offset)
+            field = _read_exact(self.file, size)
+        value = struct.unpack_from(self.order + value_format, field)
+        if len(value) == 2:
+            return value[0] / value[1] if value[1] else default
+        return value[0]
+
+    def pages(self):
+        """
+        Cuenta los directorios de la cadena principal que no son miniaturas.
+        """
+        pages = 0
+        visited = set()
+        offset = self.first_ifd
+        while offset and offset not in visited and len(visited) < MAX_TIFF_PAGES:
+            visited.add(offset)
+            entries, next_offset = self.read_ifd(offset)
+            # Bit 0 de NewSubfileType: versión de resolución reducida de otra imagen
+            if not self.value(entries, TIFF_NEW_SUBFILE_TYPE, 0) & 1:
+                pages += 1
+            offset = next_offset
+        return pages
+
+def _resolution(x, y, unit_to_inch):
+    if not x or not y:
+        return None
+    return (round(x * unit_to_inch, 2), round(y * unit_to_inch, 2))
+
+def _tiff_dpi(reader, entries):
+    # ResolutionUnit: 2 = pulgada (por defecto), 3 = centímetro, 1 = sin unidad
+    unit = reader.value(entries, TIFF_RESOLUTION_UNIT, 2)
+    if unit not in (2, 3):
+        return None
+    return _resolution(reader.value(entries, TIFF_X_RESOLUTION), reader.value(entries, TIFF_Y_RESOLUTION),
+                       2.54 if unit == 3 else 1)
+
+def _read_tiff(file):
+    reader = _TiffReader(file)
+    entries, _ = reader.read_ifd(reader.first_ifd)
+    return {
+        'format': 'TIFF',
+        'width': reader.value(entries, TIFF_IMAGE_WIDTH),
+        'height': reader.value(entries, TIFF_IMAGE_LENGTH),
+        'dpi': _tiff_dpi(reader, entries),
+        'pages': max(reader.pages(), 1)
+    }
+
+def _read_jpeg(file):
+    file.seek(2)
+    dpi = None
+    for _ in range(MAX_JPEG_SEGMENTS):
+        marker = _read_exact(file, 2)
+        while marker[1] == 0xFF:
+            # Bytes de relleno entre segmentos
+            marker = marker[1:] + _read_exact(file, 1)
+        if marker[0] != 0xFF:
+            raise ImageHeaderError('Marcador JPEG no válido')
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        if code in (0xD9, 0xDA):
+            break
+        length = struct.unpack('>H', _read_exact(file, 2))[0]
+        if length < 2:
+            raise ImageHeaderError('Segmento JPEG no válido')
+        if code in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>xHH', _read_exact(file, 5))
+            return {'format': 'JPEG', 'width': width, 'height': height, 'dpi': dpi, 'pages': 1}
+        segment_start = file.tell()
+        if code == 0xE0 and dpi is None:
+            dpi = _jfif_dpi(file.read(min(length - 2, 14)))
+        elif code == 0xE1 and dpi is None:
+            dpi = _exif_dpi(file.read(length - 2))
+        file.seek(segment_start + length - 2)
+    raise ImageHeaderError('No se encontraron las dimensiones del JPEG')
+
+def _jfif_dpi(segment):
+    # JFIF: unidades 1 = puntos por pulgada, 2 = puntos por centímetro
+    if len(segment) < 12 or segment[:5] != b'JFIF\x00':
+        return None
+    unit, x, y = struct.unpack('>BHH', segment[7:12])
+    if unit not in (1, 2):
+        return None
+    return _resolution(x, y, 2.54 if unit == 2 else 1)
+
+def _exif_dpi(segment):
+    # Los datos Exif tienen la misma estructura de un TIFF
+    if segment[:6] != b'Exif\x00\x00':
+        return None
+    try:
+        reader = _TiffReader(io.BytesIO(segment), base=6)
+        entries, _ = reader.read_ifd(reader.first_ifd)
+        return _tiff_dpi(reader, entries)
+    except (ImageHeaderError, struct.error, KeyError):
+        return None
+
+def _read_png(file):
+    file.seek(8)
+    length, kind = struct.unpack('>I4s', _read_exact(file, 8))
+    if kind != b'IHDR':
+        raise ImageHeaderError('PNG sin encabezado IHDR')
+    width, height = struct.unpack('>II', _read_exact(file, 8))
+    file.seek(length - 8 + 4, io.SEEK_CUR)
+    dpi = None
+    # El bloque pHYs, si existe, va antes de los datos de la imagen (IDAT)
+    while True:
+        header = file.read(8)
+        if len(header) < 8:
+            break
+        length, kind = struct.unpack('>I4s', header)
+        if kind in (b'IDAT', b'IEND'):
+            break
+        if kind == b'pHYs':
+            x, y, unit = struct.unpack('>IIB', _read_exact(file, 9))
+            # Unidad 1 = metro
+            if unit == 1:
+                dpi = _resolution(x, y, 0.0254)
+            break
+        file.seek(length + 4, io.SEEK_CUR)
+    return {'format': 'PNG', 'width': width, 'height': height, 'dpi': dpi, 'pages': 1}
@@ -1,96 +1,258 @@
 import os
-import pandas as pd
 from datetime import datetime
-from openpyxl import load_workbook
-from metadata_extractor import get_file_metadata, get_pdf_pages
-import xlwings as xw
+from itertools import islice
+from metadata_extractor import iter_files_metadata, format_file_size
+from excel_handler import write_index_streaming, INDEX_HEADERS
+from xlsm_template import fill_template_package
+from excel_pool import get_default_pool
+from file_utils import DirectorySnapshot, ORDER_PREFIX_RE
+from instrumentation import NULL_PROFILER
+from progress import track
 import re
 
-def extract_metadata_from_existing_index(folder_path):
-    for file in os.listdir(folder_path):
-        if 'indice' in file.lower() and file.endswith(('.xlsx', '.xlsm', '.xls')):
-            index_path = os.path.join(folder_path, file)
-            wb = load_workbook(index_path, read_only=True)
-            ws = wb.active
-            
-            metadata = {
-                'Ciudad': ws['B2'].value,  # Cambiado de B3 a B2
-                'Despacho Judicial': ws['B3'].value,
-                'Serie o Subserie documental': ws['B4'].value,
-                'No. Radicación del Proceso': ws['B5'].value,
-                'Partes Procesales (Parte A)': ws['B6'].value,
-                'Partes Procesales (Parte B)': ws['B7'].value,
-                'Terceros Intervinientes': ws['B8'].value,
-                'Cuaderno': ws['B9'].value,
-                'Expediente Físico': ws['J3'].value,
-                'No. Carpetas': ws['J5'].value,
-                'No. Carpetas Digitalizadas': ws['J6'].value
-            }
-            
-            # Extraer las fechas de creación de documento del índice anterior
-            existing_dates = {}
-            for row in ws.iter_rows(min_row=12, values_only=True):
-                if row[0] and row[1]:  # Nombre del documento y fecha de creación
-                    existing_dates[row[0]] = row[1]
-            
-            metadata['existing_dates'] = existing_dates
-            
-            return metadata
-    
-    return None
+# pandas, NumPy y openpyxl se importan en las funciones que los usan, de modo que importar este
+# módulo (por ejemplo, al abrir la aplicación de escritorio) no los cargue
 
-def generate_index_from_scratch(folder_path, existing_metadata=None):
-    files = [f for f in os.listdir(folder_path) 
-             if os.path.isfile(os.path.join(folder_path, f))
-             and not f.startswith('.') 
-             and os.path.splitext(f)[1] != '' 
-             and not ('indice' in f.lower() and f.endswith(('.xlsx', '.xlsm', '.xls')))]
-    
-    files.sort(key=lambda x: os.path.getmtime(os.path.join(folder_path, x)))
+# Nombre del índice generado en cada cuaderno
+INDEX_FILENAME = "000IndiceElectronicoC01.xlsm"
 
-    data = []
-    current_page = 1
-    existing_dates = existing_metadata.get('existing_dates', {}) if existing_metadata else {}
+# Documentos que se ensamblan juntos al generar el índice fila por fila
+ROW_CHUNK_SIZE = 2000
 
-    for i, filename in enumerate(files, start=1):
-        file_path = os.path.join(folder_path, filename)
-        metadata = get_file_metadata(file_path)
+def extract_metadata_from_existing_index(folder_path, snapshot=None):
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    for file in snapshot.index_workbooks():
+        from openpyxl import load_workbook
+        index_path = snapshot.path(file)
+        wb = load_workbook(index_path, read_only=True)
+        ws = wb.active
         
-        num_pages = get_pdf_pages(file_path) if metadata['extension'].lower() == '.pdf' else 1
+        metadata = {
+            'Ciudad': ws['B2'].value,  # Cambiado de B3 a B2
+            'Despacho Judicial': ws['B3'].value,
+            'Serie o Subserie documental': ws['B4'].value,
+            'No. Radicación del Proceso': ws['B5'].value,
+            'Partes Procesales (Parte A)': ws['B6'].value,
+            'Partes Procesales (Parte B)': ws['B7'].value,
+            'Terceros Intervinientes': ws['B8'].value,
+            'Cuaderno': ws['B9'].value,
+            'Expediente Físico': ws['J3'].value,
+            'No. Carpetas': ws['J5'].value,
+            'No. Carpetas Digitalizadas': ws['J6'].value
+        }
         
-        doc_name = re.sub(r'^\d+', '', os.path.splitext(filename)[0])
+        # Extraer las fechas de creación de documento del índice anterior
+        existing_dates = {}
+        for row in ws.iter_rows(min_row=12, values_only=True):
+            if row[0] and row[1]:  # Nombre del documento y fecha de creación
+                existing_dates[row[0]] = row[1]
         
-        # Usar la fecha del índice anterior si está disponible, de lo contrario usar la fecha de modificación
-        creation_date = existing_dates.get(doc_name, metadata['modification_date'])
+        metadata['existing_dates'] = existing_dates
+        wb.close()
         
-        data.append({
-            'Nombre Documento': doc_name,
-            'Fecha Creación Documento': creation_date,
-            'Fecha Incorporación Expediente': datetime.now().strftime('%Y-%m-%d'),
-            'Orden Documento': i,
-            'Número Páginas': num_pages,
-            'Página Inicio': current_page,
-            'Página Fin': current_page + num_pages - 1,
-            'Formato': metadata['extension'][1:],
-            'Tamaño': metadata['size'],
-            'Origen': 'Digitalizado' if metadata['extension'].lower() == '.pdf' else 'Electrónico',
-            'Observaciones': ''
-        })
-        current_page += num_pages
-
-    df = pd.DataFrame(data)
-    return df
-
-def generate_index_from_template(folder_path, template_path):
+        return metadata
+    
+    return None
+
+def generate_index_from_scratch(folder_path, existing_metadata=None, use_cache=True, workers=1, snapshot=None,
+                                profiler=None, progress=None, cancel=None):
+    """
+    Genera el índice electrónico de una carpeta a partir de los metadatos de sus archivos.
+
+    :param folder_path: Ruta de la carpeta del cuaderno
+    :param existing_metadata: Metadatos de un índice anterior, si existe
+    :param use_cache: False para omitir la caché de metadatos
+    :param workers: Número de procesos para extraer metadatos; 1 para extracción secuencial,
+                    None o 0 para usar todos los núcleos. El índice resultante es el mismo.
+    :param snapshot: DirectorySnapshot de la carpeta (por ejemplo, el usado al renombrar)
+    :param profiler: RunProfiler que mide la extracción y el ensamblado (ver instrumentation)
+    :param progress: Función que recibe ('metadatos', archivos terminados, total, segundos restantes)
+                     tras cada archivo (ver progress.ProgressTracker)
+    :param cancel: CancellationToken que se consulta antes de cada archivo
+    :return: DataFrame con el índice
+    :raises OperationCancelled: Si se solicitó la cancelación
+    """
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    if profiler is None:
+        profiler = NULL_PROFILER
+    files = snapshot.documents()
+    existing_dates = existing_metadata.get('existing_dates', {}) if existing_metadata else {}
+
+    file_paths = [snapshot.path(filename) for filename in files]
+    stats = [snapshot.stat(filename) for filename in files]
+    with profiler.span('metadatos'):
+        metadata = list(track(iter_files_metadata(file_paths, use_cache=use_cache, workers=workers, stats=stats,
+                                                  profiler=profiler),
+                              'metadatos', len(files), progress, cancel))
+    with profiler.span('ensamblado'):
+        return build_index_dataframe(files, metadata, existing_dates)
+
+def iter_index_rows(folder_path, existing_metadata=None, use_cache=True, workers=1, snapshot=None, profiler=None,
+                    progress=None, cancel=None):
+    """
+    Genera las filas del índice electrónico una a una, en el orden de los documentos.
+
+    Permite escribir índices de cualquier tamaño sin conservar todas las filas en memoria
+    (ver generate_index_streaming). Los parámetros son los de generate_index_from_scratch.
+    """
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    files = snapshot.documents()
+
+    existing_dates = existing_metadata.get('existing_dates', {}) if existing_metadata else {}
+    incorporation_date = datetime.now().strftime('%Y-%m-%d')
+
+    file_paths = [snapshot.path(filename) for filename in files]
+    stats = [snapshot.stat(filename) for filename in files]
+    metadata_iter = track(iter_files_metadata(file_paths, use_cache=use_cache, workers=workers, stats=stats,
+                                              profiler=profiler),
+                          'metadatos', len(files), progress, cancel)
+    try:
+        # Las filas se ensamblan por bloques para no conservar todo el cuaderno en memoria
+        next_page = 1
+        for start in range(0, len(files), ROW_CHUNK_SIZE):
+            chunk_files = files[start:start + ROW_CHUNK_SIZE]
+            chunk = build_index_dataframe(chunk_files, list(islice(metadata_iter, len(chunk_files))),
+                                          existing_dates, incorporation_date,
+                                          first_order=start + 1, first_page=next_page)
+            if chunk.empty:
+                break
+            next_page = int(chunk['Página Fin'].iat[-1]) + 1
+            yield from chunk.to_dict('records')
+    finally:
+        # Libera el grupo de procesos aunque quien consume las filas se detenga antes de terminar
+        metadata_iter.close()
+
+def build_index_dataframe(files, metadata, existing_dates=None, incorporation_date=None,
+                          first_order=1, first_page=1):
+    """
+    Ensambla el índice columna por columna a partir de los metadatos ya extraídos.
+
+    La paginación sale de la suma acumulada del número de páginas y los nombres de operaciones
+    de texto sobre toda la columna, sin recorrer los documentos uno a uno.
+
+    :param files: Nombres de los archivos, en el orden del índice
+    :param metadata: Metadatos de cada archivo (get_file_metadata), en el mismo orden
+    :param existing_dates: Fechas de creación registradas en un índice anterior, por nombre de documento
+    :param incorporation_date: Fecha de incorporación; por defecto la fecha actual
+    :param first_order: Orden del primer documento
+    :param first_page: Página de inicio del primer documento
+    :return: DataFrame con las columnas de INDEX_HEADERS
+    """
+    import numpy as np
+    import pandas as pd
+
+    if incorporation_date is None:
+        incorporation_date = datetime.now().strftime('%Y-%m-%d')
+    count = len(files)
+    if count == 0:
+        return pd.DataFrame(columns=INDEX_HEADERS)
+
+    meta = pd.DataFrame.from_records(metadata, columns=['extension', 'pages', 'size', 'modification_date'])
+    extensions = meta['extension'].fillna('').astype('str')
+    is_pdf = (extensions.str.lower() == '.pdf').to_numpy()
+
+    # Nombre sin extensión (como os.path.splitext) y sin el número de orden (ver file_utils.ORDER_PREFIX_RE)
+    orders = np.arange(first_order, first_order + count)
+    stems = pd.Series(files, dtype='str').str.replace(r'^(\.*[^.].*)\.[^.]*$', r'\1', regex=True)
+    names = (pd.Series(orders).astype('str').str.zfill(3) + '/' + stems).str.replace(ORDER_PREFIX_RE, '', regex=True)
+
+    # El número de páginas (PDF, Word, PowerPoint) ya viene en los metadatos; los demás formatos cuentan una página
+    pages = pd.to_numeric(meta['pages'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    pages = np.where(np.isnan(pages), 1, pages).astype(np.int64)
+    counts = np.maximum(pages, 1)
+    page_end = first_page - 1 + np.cumsum(counts)
+
+    # Usar la fecha del índice anterior si está disponible, de lo contrario usar la fecha de modificación
+    creation_dates = meta['modification_date']
+    if existing_dates:
+        previous = names.map(existing_dates)
+        creation_dates = previous.where(previous.notna(), creation_dates)
+
+    return pd.DataFrame({
+        'Nombre Documento': names,
+        'Fecha Creación Documento': creation_dates,
+        'Fecha Incorporación Expediente': incorporation_date,
+        'Orden Documento': orders,
+        'Número Páginas': pages,
+        'Página Inicio': page_end - counts + 1,
+        'Página Fin': page_end,
+        'Formato': extensions.str[1:],
+        'Tamaño': meta['size'],
+        'Origen': np.where(is_pdf, 'Digitalizado', 'Electrónico'),
+        'Observaciones': ''
+    }, columns=INDEX_HEADERS)
+
+def generate_index_streaming(folder_path, output_path, metadata=None, use_cache=True, workers=1, profiler=None):
+    """
+    Genera el índice electrónico escribiendo cada fila directamente en un libro Excel de solo
+    escritura, sin construir un DataFrame. La memoria usada no crece con el número de documentos.
+
+    :param folder_path: Ruta de la carpeta del cuaderno
+    :param output_path: Ruta del archivo Excel (.xlsx) a generar
+    :param metadata: Metadatos del expediente para el encabezado; por defecto los del índice anterior
+    :param use_cache: False para omitir la caché de metadatos
+    :param workers: Número de procesos para extraer metadatos
+    :param profiler: RunProfiler que mide las etapas y la extracción de cada archivo
+    :return: Número de documentos escritos en el índice
+    """
+    if profiler is None:
+        profiler = NULL_PROFILER
+    with profiler.span('indice_anterior'):
+        existing_metadata = extract_metadata_from_existing_index(folder_path)
+    if metadata is None:
+        metadata = existing_metadata
+    rows = iter_index_rows(folder_path, existing_metadata, use_cache=use_cache, workers=workers, profiler=profiler)
+    # La extracción de metadatos ocurre mientras se escriben las filas
+    with profiler.span('metadatos_y_escritura'):
+        return write_index_streaming(rows, output_path, metadata)
+
+def generate_index_from_template(folder_path, template_path, workers=1, engine='package', excel_pool=None,
+                                 snapshot=None, profiler=None, progress=None, cancel=None, use_cache=True):
+    """
+    Genera el índice electrónico del cuaderno sobre la plantilla con macros.
+
+    :param folder_path: Ruta de la carpeta del cuaderno
+    :param template_path: Ruta de la plantilla 000IndiceElectronicoC0.xlsm
+    :param workers: Número de procesos para extraer metadatos
+    :param engine: 'package' edita el .xlsm directamente sin Excel (por defecto);
+                   'xlwings' abre la plantilla en Excel
+    :param excel_pool: Grupo de instancias de Excel para el motor 'xlwings'; por defecto el del proceso
+    :param snapshot: DirectorySnapshot de la carpeta (por ejemplo, el usado al renombrar)
+    :param profiler: RunProfiler que mide las etapas y la extracción de cada archivo (ver instrumentation)
+    :param progress: Función que recibe el avance de la extracción (ver generate_index_from_scratch)
+    :param cancel: CancellationToken; si se cancela, el índice anterior queda intacto
+    :param use_cache: False para omitir la caché de metadatos
+    :return: Ruta del índice generado
+    :raises OperationCancelled: Si se solicitó la cancelación
+    """
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    if profiler is None:
+        profiler = NULL_PROFILER
+
     # Extraer metadatos del índice existente si lo hay
-    existing_metadata = extract_metadata_from_existing_index(folder_path)
+    with profiler.span('indice_anterior'):
+        existing_metadata = extract_metadata_from_existing_index(folder_path, snapshot)
+    output_path = os.path.join(folder_path, INDEX_FILENAME)
+
+    if engine == 'package':
+        rows = iter_index_rows(folder_path, existing_metadata, use_cache=use_cache, workers=workers, snapshot=snapshot,
+                               profiler=profiler, progress=progress, cancel=cancel)
+        # La extracción de metadatos ocurre mientras se escriben las filas
+        with profiler.span('metadatos_y_escritura'):
+            fill_template_package(template_path, output_path, rows, existing_metadata)
+        return output_path
 
     # Generar el índice
-    df = generate_index_from_scratch(folder_path, existing_metadata)
+    df = generate_index_from_scratch(folder_path, existing_metadata, use_cache=use_cache, workers=workers,
+                                     snapshot=snapshot, profiler=profiler, progress=progress, cancel=cancel)
 
     try:
-        # Usar xlwings para manejar el archivo con macros
-        with xw.App(visible=False) as app:
+        # Usar xlwings para manejar el archivo con macros, con una instancia de Excel reutilizable
+        with (excel_pool or get_default_pool()).app() as app:
             wb = app.books.open(template_path)
             ws = wb.sheets[0]
             
@@ -123,6 +285,7 @@ def generate_index_from_template(folder_path, template_path):
         print("Intentando con openpyxl (sin macros)...")      
 
         # Si xlwings falla, usar openpyxl como alternativa (sin macros)
+        from openpyxl import load_workbook
         wb = load_workbook(template_path, keep_vba=True)
         ws = wb.active
 
@@ -154,9 +317,175 @@ def generate_index_from_template(folder_path, template_path):
 
         return output_path
 
+def read_index_rows(index_path):
+    """
+    Lee las filas de documentos de un índice generado, desde la fila 12 hasta la primera fila
+    sin documento (filas vacías de la plantilla o pie de página).
+
+    :param index_path: Ruta del índice (.xlsm o .xlsx)
+    :return: Lista de diccionarios con las columnas de INDEX_HEADERS
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(index_path, read_only=True)
+    try:
+        rows = []
+        for values in wb.active.iter_rows(min_row=12, max_col=len(INDEX_HEADERS), values_only=True):
+            if len(values) < len(INDEX_HEADERS) or not values[0] or not isinstance(values[3], (int, float)):
+                break
+            rows.append(dict(zip(INDEX_HEADERS, values)))
+        return rows
+    finally:
+        wb.close()
+
+def _document_key(name, extension):
+    return str(name), str(extension or '').lower().lstrip('.')
+
+def update_index_incremental(folder_path, template_path, workers=1, use_cache=True, snapshot=None, profiler=None,
+                             progress=None, cancel=None):
+    """
+    Actualiza el índice del cuaderno extrayendo metadatos solo de los documentos nuevos o modificados.
+
+    Cada documento se relaciona con su fila del índice actual por nombre (sin el prefijo numérico)
+    y formato. Se considera sin cambios si conserva el tamaño registrado y no se modificó después
+    del índice; de esas filas se toman las páginas y el tamaño registrados. Las filas de documentos
+    eliminados se retiran y el índice se ensambla con build_index_dataframe en el orden de los
+    documentos de la carpeta (el mismo que asigna el renombrado), igual que un índice completo, de
+    modo que el orden de cada fila coincide con el número del archivo aunque un documento nuevo sea
+    anterior a los existentes. Los documentos que ya estaban conservan sus fechas y observaciones.
+    Si el cuaderno no tiene índice, se genera completo.
+
+    :param folder_path: Ruta de la carpeta del cuaderno
+    :param template_path: Ruta de la plantilla 000IndiceElectronicoC0.xlsm
+    :param workers: Número de procesos para extraer metadatos
+    :param use_cache: False para omitir la caché de metadatos
+    :param snapshot: DirectorySnapshot de la carpeta (por ejemplo, el usado al renombrar)
+    :param profiler: RunProfiler que mide las etapas y la extracción de cada archivo
+    :param progress: Función que recibe el avance de la extracción de los documentos nuevos o modificados
+                     (ver generate_index_from_scratch)
+    :param cancel: CancellationToken; si se cancela, el índice anterior queda intacto
+    :return: Diccionario con la ruta del índice, el total de documentos y los nombres de los
+             documentos nuevos, modificados y eliminados
+    :raises OperationCancelled: Si se solicitó la cancelación
+    """
+    import pandas as pd
+
+    if snapshot is None:
+        snapshot = DirectorySnapshot(folder_path)
+    if profiler is None:
+        profiler = NULL_PROFILER
+    index_path = os.path.join(folder_path, INDEX_FILENAME)
+    with profiler.span('indice_anterior'):
+        existing_metadata = extract_metadata_from_existing_index(folder_path, snapshot)
+        existing_dates = existing_metadata.get('existing_dates', {}) if existing_metadata else {}
+        if INDEX_FILENAME in snapshot.stats:
+            existing = read_index_rows(index_path)
+            index_mtime = snapshot.stat(INDEX_FILENAME).st_mtime
+        else:
+            existing, index_mtime = [], 0
+
+    # Cada fila se busca primero por el nombre que le dio el renombrado (número de orden y nombre)
+    # y luego por el nombre del documento, para los archivos que no conservan ese número
+    by_filename = {}
+    by_name = {}
+    for position, row in enumerate(existing):
+        numbered = f"{int(row['Orden Documento']):03d}{row['Nombre Documento']}"
+        by_filename.setdefault(_document_key(numbered, row['Formato']), []).append(position)
+        by_name.setdefault(_document_key(row['Nombre Documento'], row['Formato']), []).append(position)
+
+    # Relacionar cada archivo con su fila y decidir cuáles requieren extraer metadatos
+    documents = snapshot.documents()
+    positions = {}
+    taken = set()
+    for filename in documents:
+        stem, extension = os.path.splitext(filename)
+        _claim_row(positions, taken, filename, by_filename.get(_document_key(stem, extension)))
+    for filename in documents:
+        if filename not in positions:
+            stem, extension = os.path.splitext(filename)
+            _claim_row(positions, taken, filename, by_name.get(_document_key(re.sub(r'^\d+', '', stem), extension)))
+
+    matched = {}
+    new_files = []
+    pending = []
+    for filename in documents:
+        position = positions.get(filename)
+        if position is None:
+            new_files.append(filename)
+            pending.append(filename)
+            continue
+        matched[position] = filename
+        stat = snapshot.stat(filename)
+        if existing[position]['Tamaño'] != format_file_size(stat.st_size) or stat.st_mtime > index_mtime:
+            pending.append(filename)
+
+    file_paths = [snapshot.path(filename) for filename in pending]
+    stats = [snapshot.stat(filename) for filename in pending]
+    with profiler.span('metadatos'):
+        extracted = dict(zip(pending, track(iter_files_metadata(file_paths, use_cache=use_cache, workers=workers,
+                                                                stats=stats, profiler=profiler),
+                                            'metadatos', len(pending), progress, cancel)))
+    profiler.count('documentos_sin_cambios', len(matched) - len(pending) + len(new_files))
+
+    summary = {'Índice': index_path, 'Nuevos': [], 'Modificados': [], 'Eliminados': []}
+    summary['Eliminados'] = [row['Nombre Documento'] for position, row in enumerate(existing)
+                             if position not in matched]
+
+    # Documentos en el orden de la carpeta; los que no cambiaron toman sus metadatos de la fila del índice
+    metadata, rows = [], []
+    for filename in documents:
+        position = positions.get(filename)
+        if position is None:
+            metadata.append(extracted[filename])
+            continue
+        row = existing[position]
+        if filename in extracted:
+            summary['Modificados'].append(row['Nombre Documento'])
+            metadata.append(extracted[filename])
+        else:
+            metadata.append(_row_metadata(filename, row))
+        rows.append(row)
+
+    with profiler.span('ensamblado'):
+        df = build_index_dataframe(documents, metadata, existing_dates)
+        is_new = pd.Series([filename not in positions for filename in documents], index=df.index, dtype=bool)
+        if rows:
+            # Los documentos que ya estaban en el índice conservan las fechas y observaciones registradas
+            previous_index = df.index[~is_new.to_numpy()]
+            previous = pd.DataFrame.from_records(rows, columns=INDEX_HEADERS, index=previous_index)
+            for column in ('Fecha Creación Documento', 'Fecha Incorporación Expediente', 'Observaciones'):
+                values = previous[column].astype(object)
+                current = df[column].astype(object)
+                current[previous_index] = values.where(values.notna() & values.ne(''), current[previous_index])
+                df[column] = current
+    summary['Nuevos'] = df['Nombre Documento'][is_new].tolist()
+
+    with profiler.span('escritura'):
+        summary['Documentos'] = fill_template_package(template_path, index_path, df.to_dict('records'),
+                                                      existing_metadata)
+    return summary
+
+def _claim_row(positions, taken, filename, candidates):
+    # Asigna al archivo la primera fila candidata que no tenga ya un archivo
+    for position in candidates or ():
+        if position not in taken:
+            positions[filename] = position
+            taken.add(position)
+            return
+
+def _row_metadata(filename, row):
+    # Metadatos de un documento sin cambios, tomados de su fila del índice en lugar del archivo
+    return {
+        'extension': os.path.splitext(filename)[1],
+        'pages': row['Número Páginas'],
+        'size': row['Tamaño'],
+        'modification_date': row['Fecha Creación Documento']
+    }
+
 def update_metadata(df, metadata):
     """
     Actualiza los metadatos del expediente en el DataFrame.
     """
+    import pandas as pd
     metadata_row = pd.DataFrame([metadata])
     return pd.concat([metadata_row, df]).reset_index(drop=True)
\ No newline at end of file
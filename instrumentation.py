@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import heapq
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Variable de entorno para desactivar el registro de ejecución ("0", "off", "no", "false")
+RUN_LOG_ENV_VAR = 'EXPEDIENTE_RUN_LOG'
+DISABLED_VALUES = ('0', 'off', 'no', 'false')
+
+# Registro de la última ejecución, junto al índice. Es un archivo oculto, por lo que no se
+# renombra ni se incluye en el índice.
+RUN_LOG_FILENAME = '.000IndiceElectronicoC01.registro.json'
+
+# Archivos más lentos que se conservan en el registro
+DEFAULT_SLOWEST = 10
+
+class RunProfiler:
+    """
+    Mide una ejecución del índice: la duración de cada etapa (renombrado, índice anterior,
+    extracción, escritura) y, por archivo, el tiempo de detección del tipo MIME y de lectura
+    del contenido, con contadores de archivos y de su tamaño por tipo y los archivos más lentos.
+
+    El tamaño registrado es el de los archivos analizados, no los bytes leídos: las lecturas
+    rápidas (final del PDF, docProps de los documentos de Office, encabezados de imágenes) solo
+    leen unos pocos KB de cada archivo.
+
+    Uso:
+        profiler = RunProfiler()
+        with profiler.span('renombrado'):
+            rename_files(folder_path, snapshot=snapshot)
+        generate_index_from_template(folder_path, template_path, profiler=profiler)
+        profiler.write(run_log_path(folder_path))
+    """
+
+    enabled = True
+
+    def __init__(self, slowest=DEFAULT_SLOWEST):
+        """
+        :param slowest: Número de archivos más lentos que se conservan
+        """
+        self.slowest = slowest
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self.types = {}
+        self.phases = {}
+        self.files = 0
+        self.cache_hits = 0
+        self._slowest = []
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name):
+        """
+        Mide la duración del bloque con el nombre indicado. Los bloques pueden anidarse.
+        """
+        entry = {'nombre': name, 'nivel': self._depth, 'inicio': round(time.perf_counter() - self._start, 4)}
+        self.spans.append(entry)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['segundos'] = round(time.perf_counter() - start, 4)
+            self._depth -= 1
+
+    def count(self, name, amount=1):
+        """
+        Suma `amount` al contador indicado.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_file(self, file_path, size, extension, timings):
+        """
+        Registra la extracción de metadatos de un archivo.
+
+        :param file_path: Ruta del archivo
+        :param size: Tamaño del archivo en bytes (no los bytes leídos para extraer sus metadatos)
+        :param extension: Extensión del archivo
+        :param timings: Segundos de cada fase (get_file_metadata); vacío si el registro salió de la caché
+        """
+        self.files += 1
+        extension = (extension or '').lower()
+        by_type = self.types.get(extension)
+        if by_type is None:
+            by_type = self.types[extension] = {'archivos': 0, 'tamaño_bytes': 0, 'segundos': 0.0, 'cache': 0}
+        by_type['archivos'] += 1
+        if not timings:
+            self.cache_hits += 1
+            by_type['cache'] += 1
+        else:
+            seconds = sum(timings.values())
+            by_type['tamaño_bytes'] += size
+            by_type['segundos'] += seconds
+            for phase, value in timings.items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + value
+            # Montículo de mínimos con los archivos más lentos
+            item = (seconds, self.files, file_path, size, timings)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, item)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest_files(self):
+        """
+        Archivos más lentos de la ejecución, del más lento al más rápido.
+        """
+        return [{
+            'archivo': os.path.basename(file_path),
+            'tamaño_bytes': size,
+            'segundos': round(seconds, 4),
+            'fases': {phase: round(value, 4) for phase, value in timings.items()}
+        } for seconds, _, file_path, size, timings in sorted(self._slowest, reverse=True)]
+
+    def to_dict(self):
+        """
+        Resumen de la ejecución en un diccionario serializable en JSON.
+
+        Los segundos de 'archivos' suman el tiempo de extracción de cada archivo; con varios
+        procesos pueden superar la duración de la etapa que los contiene.
+        """
+        types = {extension: dict(values, segundos=round(values['segundos'], 4))
+                 for extension, values in sorted(self.types.items())}
+        return {
+            'inicio': self.started.isoformat(timespec='seconds'),
+            'segundos': round(time.perf_counter() - self._start, 4),
+            'etapas': [dict(entry) for entry in self.spans],
+            'contadores': dict(self.counters),
+            'archivos': {
+                'total': self.files,
+                'desde_cache': self.cache_hits,
+                'tamaño_bytes': sum(values['tamaño_bytes'] for values in self.types.values()),
+                'segundos': round(sum(values['segundos'] for values in self.types.values()), 4),
+                'fases': {phase: round(value, 4) for phase, value in self.phases.items()},
+                'por_tipo': types
+            },
+            'mas_lentos': self.slowest_files()
+        }
+
+    def write(self, path):
+        """
+        Guarda el resumen en un archivo JSON, reemplazando el registro anterior.
+        """
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+class NullProfiler:
+    """
+    Medidor desactivado: conserva la interfaz de RunProfiler sin medir nada.
+    """
+
+    enabled = False
+    _span = nullcontext()
+
+    def span(self, name):
+        return self._span
+
+    def count(self, name, amount=1):
+        pass
+
+    def record_file(self, file_path, size, extension, timings):
+        pass
+
+    def to_dict(self):
+        return None
+
+    def write(self, path):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+def create_profiler(**kwargs):
+    """
+    Crea el medidor de una ejecución, o NULL_PROFILER si la variable de entorno
+    EXPEDIENTE_RUN_LOG vale "0", "off", "no" o "false".
+
+    :param kwargs: Argumentos de RunProfiler
+    """
+    if os.environ.get(RUN_LOG_ENV_VAR, '').strip().lower() in DISABLED_VALUES:
+        return NULL_PROFILER
+    return RunProfiler(**kwargs)
+
+def run_log_path(folder_path):
+    """
+    Ruta del registro de ejecución de un cuaderno.
+    """
+    return os.path.join(folder_path, RUN_LOG_FILENAME)
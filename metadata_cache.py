@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+# Variable de entorno para ubicar la caché o desactivarla ("0", "off", "no", "false")
+CACHE_ENV_VAR = 'EXPEDIENTE_METADATA_CACHE'
+DISABLED_VALUES = ('0', 'off', 'no', 'false')
+
+# Número máximo de registros que conserva la caché antes de expulsar los menos usados
+DEFAULT_MAX_ENTRIES = 50000
+
+# Cada cuántas escrituras se verifica el límite de tamaño de la caché
+EVICTION_INTERVAL = 256
+
+# Versión del contenido de los registros. Se incrementa cuando cambia lo que se extrae de los
+# archivos, para descartar los registros guardados con la extracción anterior.
+RECORD_VERSION = 3
+
+_default_caches = {}
+_default_caches_lock = threading.Lock()
+
+class MetadataCache:
+    """
+    Caché persistente en SQLite de los metadatos extraídos de cada archivo.
+
+    Cada registro se identifica por la ruta absoluta del archivo y solo se considera
+    válido si el inodo, el tamaño y la fecha de modificación (en nanosegundos) coinciden
+    con los del archivo en disco. Así, un archivo sin cambios cuesta una sola llamada a
+    `os.stat`, y cualquier modificación invalida automáticamente su registro.
+    """
+
+    def __init__(self, db_path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param db_path: Ruta del archivo SQLite; por defecto se usa el directorio de caché del usuario
+        :param max_entries: Número máximo de registros antes de expulsar los menos usados
+        """
+        self.db_path = db_path or get_default_cache_path()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadatos (
+                ruta TEXT PRIMARY KEY,
+                inodo INTEGER NOT NULL,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                registro TEXT NOT NULL,
+                ultimo_uso REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_metadatos_uso ON metadatos (ultimo_uso)')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != RECORD_VERSION:
+            self._conn.execute('DELETE FROM metadatos')
+            self._conn.execute(f'PRAGMA user_version = {RECORD_VERSION}')
+        self.evict()
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path, stat):
+        """
+        Obtiene los metadatos almacenados para un archivo si siguen vigentes.
+
+        :param file_path: Ruta del archivo
+        :param stat: Resultado de `os.stat` del archivo
+        :return: Diccionario de metadatos o None si no hay un registro vigente
+        """
+        key = self._key(file_path)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT registro FROM metadatos WHERE ruta = ? AND inodo = ? AND tamano = ? AND mtime_ns = ?',
+                    (key, stat.st_ino, stat.st_size, stat.st_mtime_ns)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute('UPDATE metadatos SET ultimo_uso = ? WHERE ruta = ?', (time.time(), key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def put(self, file_path, stat, metadata):
+        """
+        Almacena los metadatos de un archivo junto con su identidad en disco.
+
+        :param file_path: Ruta del archivo
+        :param stat: Resultado de `os.stat` del archivo
+        :param metadata: Diccionario de metadatos extraídos
+        """
+        try:
+            record = json.dumps(metadata, ensure_ascii=False, default=str)
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO metadatos VALUES (?, ?, ?, ?, ?, ?)',
+                    (self._key(file_path), stat.st_ino, stat.st_size, stat.st_mtime_ns, record, time.time()))
+                self._writes += 1
+                evict = self._writes % EVICTION_INTERVAL == 0
+            if evict:
+                self.evict()
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def evict(self):
+        """
+        Elimina los registros menos usados recientemente que excedan `max_entries`.
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'DELETE FROM metadatos WHERE ruta IN '
+                    '(SELECT ruta FROM metadatos ORDER BY ultimo_uso DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """
+        Elimina todos los registros de la caché.
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM metadatos')
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM metadatos').fetchone()[0]
+
+def get_default_cache_path():
+    """
+    Obtiene la ruta por defecto de la caché en el directorio de caché del usuario.
+    """
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'GestionExpedienteElectronico', 'metadatos.sqlite3')
+
+def get_default_cache():
+    """
+    Obtiene la caché compartida del proceso, o None si está desactivada o no se puede abrir.
+
+    La ubicación se toma de la variable de entorno EXPEDIENTE_METADATA_CACHE; si esta vale
+    "0", "off", "no" o "false", la caché queda desactivada.
+    """
+    setting = os.environ.get(CACHE_ENV_VAR, '').strip()
+    if setting.lower() in DISABLED_VALUES:
+        return None
+    db_path = setting or get_default_cache_path()
+
+    # Las conexiones SQLite no deben compartirse entre procesos creados con fork
+    key = (os.getpid(), db_path)
+    with _default_caches_lock:
+        cache = _default_caches.get(key)
+        if cache is None:
+            try:
+                cache = MetadataCache(db_path)
+            except (sqlite3.Error, OSError):
+                return None
+            _default_caches[key] = cache
+        return cache
@@ -1,116 +1,500 @@
+import io
 import os
-import PyPDF2
-import docx
-import openpyxl
-from PIL import Image
-import magic
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
+# PyPDF2, Pillow y libmagic se importan al analizar el primer archivo que los necesita
+from metadata_cache import get_default_cache
+from pdf_utils import count_pdf_pages, count_pages_in_buffer
+from ooxml_reader import read_ooxml_properties, read_workbook_sheets, OoxmlError
+from image_headers import read_image_header, ImageHeaderError
+from instrumentation import NULL_PROFILER
 
-def get_file_metadata(file_path):
+# Firmas de los formatos habituales en los expedientes. Si los primeros bytes del archivo
+# coinciden con los de su extensión, el tipo MIME se asigna sin consultar libmagic.
+TRUSTED_SIGNATURES = {
+    '.pdf': ('application/pdf', ((0, b'%PDF-'),)),
+    '.docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', ((0, b'PK\x03\x04'),)),
+    '.xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', ((0, b'PK\x03\x04'),)),
+    '.pptx': ('application/vnd.openxmlformats-officedocument.presentationml.presentation', ((0, b'PK\x03\x04'),)),
+    '.jpg': ('image/jpeg', ((0, b'\xff\xd8\xff'),)),
+    '.jpeg': ('image/jpeg', ((0, b'\xff\xd8\xff'),)),
+    '.png': ('image/png', ((0, b'\x89PNG\r\n\x1a\n'),)),
+    '.tif': ('image/tiff', ((0, b'II*\x00'), (0, b'MM\x00*'))),
+    '.tiff': ('image/tiff', ((0, b'II*\x00'), (0, b'MM\x00*'))),
+    '.mp4': ('video/mp4', ((4, b'ftyp'),)),
+}
+
+# Cantidad de bytes que se leen para comparar las firmas
+SIGNATURE_SIZE = 16
+
+# Bytes del contenido en memoria que se entregan a libmagic (el mismo límite que aplica al leer un archivo)
+MAGIC_BUFFER_SIZE = 1024 * 1024
+
+# Tipo MIME de un contenido vacío, igual al que libmagic informa para un archivo vacío en disco
+EMPTY_MIME_TYPE = 'inode/x-empty'
+
+_magic_local = threading.local()
+
+# Por debajo de esta cantidad de archivos pendientes no compensa iniciar procesos adicionales
+MIN_PARALLEL_FILES = 32
+
+# Archivos que procesa cada tarea enviada al grupo de procesos
+PARALLEL_CHUNK_SIZE = 16
+
+def get_file_metadata(file_path, use_cache=True, stat=None, timings=None):
     """
     Obtiene los metadatos de un archivo.
+
+    Si la caché de metadatos está activa y el archivo no ha cambiado (mismo inodo, tamaño
+    y fecha de modificación), se devuelve el registro almacenado sin volver a analizarlo.
+
+    :param file_path: Ruta del archivo
+    :param use_cache: False para omitir la caché y extraer siempre los metadatos
+    :param stat: Resultado de os.stat ya obtenido (por ejemplo, de un DirectorySnapshot)
+    :param timings: Diccionario opcional donde se guardan los segundos de la detección del tipo
+                    ('tipo_mime') y de la lectura del contenido ('contenido'); queda vacío si
+                    el registro sale de la caché
     """
-    stat = os.stat(file_path)
-    file_type = get_file_type(file_path)
+    if stat is None:
+        stat = os.stat(file_path)
+    cache = get_default_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(file_path, stat)
+        if cached is not None:
+            return cached
+
+    metadata = _extract_metadata(file_path, file_path, stat.st_size, stat.st_ctime, stat.st_mtime, timings)
+
+    if cache is not None:
+        cache.put(file_path, stat, metadata)
+
+    return metadata
+
+def get_content_metadata(content, name, modified=None, timings=None):
+    """
+    Obtiene los metadatos de un archivo que está en memoria (por ejemplo, un archivo cargado en
+    la versión web), sin escribirlo en disco. El resultado es el mismo de get_file_metadata.
+
+    :param content: Contenido del archivo: bytes, memoryview o un objeto tipo archivo binario
+    :param name: Nombre del archivo, del que se toma la extensión
+    :param modified: Marca de tiempo de la última modificación; por defecto, la hora actual
+    :param timings: Diccionario opcional con los segundos de cada fase (ver get_file_metadata)
+    """
+    if modified is None:
+        modified = time.time()
+    return _extract_metadata(content, name, _source_size(content), modified, modified, timings)
+
+def _extract_metadata(source, name, size, created, modified, timings):
+    if timings is not None:
+        start = time.perf_counter()
+    file_type = get_file_type(source, name=name)
+    if timings is not None:
+        detected = time.perf_counter()
+        timings['tipo_mime'] = detected - start
     metadata = {
         'file_type': file_type,
-        'size': format_file_size(stat.st_size),
-        'creation_date': format_date(stat.st_ctime),
-        'modification_date': format_date(stat.st_mtime),
-        'extension': os.path.splitext(file_path)[1].lower()
+        'size': format_file_size(size),
+        'creation_date': format_date(created),
+        'modification_date': format_date(modified),
+        'extension': os.path.splitext(name)[1].lower()
     }
 
     if file_type.startswith('application/pdf'):
-        metadata.update(get_pdf_metadata(file_path))
+        metadata.update(inspect_pdf(source))
     elif file_type.startswith('application/vnd.openxmlformats-officedocument.wordprocessingml'):
-        metadata.update(get_word_metadata(file_path))
+        metadata.update(get_word_metadata(source))
+    elif file_type.startswith('application/vnd.openxmlformats-officedocument.presentationml'):
+        metadata.update(get_presentation_metadata(source))
     elif file_type.startswith('application/vnd.openxmlformats-officedocument.spreadsheetml'):
-        metadata.update(get_excel_metadata(file_path))
+        metadata.update(get_excel_metadata(source))
     elif file_type.startswith('image'):
-        metadata.update(get_image_metadata(file_path))
-
+        metadata.update(get_image_metadata(source))
+    if timings is not None:
+        timings['contenido'] = time.perf_counter() - detected
     return metadata
 
-def get_pdf_pages(file_path):
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+@contextmanager
+def _open_source(source):
+    # Objeto tipo archivo binario, al inicio del contenido, para una ruta, bytes o un objeto tipo archivo
+    if _is_path(source):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+def _source_bytes(source):
+    # Contenido completo de una fuente en memoria, como objeto tipo bytes
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    if isinstance(source, memoryview):
+        return source.tobytes()
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+def _source_size(source):
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, memoryview):
+        return source.nbytes
+    return source.seek(0, io.SEEK_END)
+
+def get_files_metadata(file_paths, use_cache=True, workers=1, stats=None, profiler=None):
     """
-    Obtiene el número de páginas de un archivo PDF.
+    Obtiene los metadatos de varios archivos, conservando el orden de `file_paths`.
+
+    :param file_paths: Lista de rutas de archivos
+    :param use_cache: False para omitir la caché de metadatos
+    :param workers: Número de procesos; 1 para extracción secuencial, None o 0 para usar todos los núcleos
+    :param stats: Resultados de os.stat de cada ruta, si ya se conocen
+    :param profiler: RunProfiler que registra la extracción de cada archivo
+    :return: Lista de diccionarios de metadatos en el mismo orden de las rutas
+    """
+    return list(iter_files_metadata(file_paths, use_cache=use_cache, workers=workers, stats=stats,
+                                    profiler=profiler))
+
+def iter_files_metadata(file_paths, use_cache=True, workers=1, stats=None, profiler=None):
+    """
+    Genera los metadatos de varios archivos uno a uno, en el orden de `file_paths`.
+
+    Con más de un proceso, la caché se consulta y actualiza en el proceso principal y solo
+    los archivos sin registro vigente se reparten, por bloques, en un grupo de procesos. El
+    grupo se crea únicamente cuando se acumulan MIN_PARALLEL_FILES archivos sin registro, y
+    solo se mantiene una ventana acotada de bloques en curso, por lo que la memoria no
+    depende del número de archivos. El resultado es idéntico al de la extracción secuencial.
+
+    :param file_paths: Secuencia de rutas de archivos
+    :param use_cache: False para omitir la caché de metadatos
+    :param workers: Número de procesos; 1 para extracción secuencial, None o 0 para usar todos los núcleos
+    :param stats: Resultados de os.stat de cada ruta, si ya se conocen; evitan volver a consultarlos
+    :param profiler: RunProfiler que registra el tiempo, el tamaño y el tipo de cada archivo
+                     (ver instrumentation); sin él no se mide nada
+    """
+    if stats is None:
+        stats = [None] * len(file_paths)
+    if profiler is None:
+        profiler = NULL_PROFILER
+    if not workers:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for path, stat in zip(file_paths, stats):
+            if not profiler.enabled:
+                yield get_file_metadata(path, use_cache=use_cache, stat=stat)
+                continue
+            if stat is None:
+                stat = os.stat(path)
+            timings = {}
+            metadata = get_file_metadata(path, use_cache=use_cache, stat=stat, timings=timings)
+            profiler.record_file(path, stat.st_size, metadata.get('extension'), timings)
+            yield metadata
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    cache = get_default_cache() if use_cache else None
+    executor = None
+    pool_available = True
+    misses = 0
+    window = deque()
+    try:
+        for start in range(0, len(file_paths), PARALLEL_CHUNK_SIZE):
+            chunk = []
+            for path, stat in zip(file_paths[start:start + PARALLEL_CHUNK_SIZE], stats[start:start + PARALLEL_CHUNK_SIZE]):
+                if stat is None:
+                    stat = os.stat(path)
+                chunk.append((path, stat, cache.get(path, stat) if cache is not None else None))
+            pending = [(path, stat) for path, stat, cached in chunk if cached is None]
+            misses += len(pending)
+
+            if pending and executor is None and pool_available and misses >= MIN_PARALLEL_FILES:
+                try:
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                except OSError:
+                    pool_available = False
+            future = None
+            if pending and executor is not None:
+                try:
+                    future = executor.submit(_get_files_metadata_uncached, pending, profiler.enabled)
+                except RuntimeError:
+                    # Grupo de procesos averiado: el bloque se extrae en este proceso
+                    future = None
+            window.append((chunk, pending, future))
+
+            while window and (executor is None or len(window) > workers * 2):
+                yield from _drain_chunk(window.popleft(), cache, profiler)
+        while window:
+            yield from _drain_chunk(window.popleft(), cache, profiler)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def _drain_chunk(entry, cache, profiler):
+    chunk, pending, future = entry
+    extracted = []
+    if future is not None:
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            extracted = future.result()
+        except BrokenProcessPool:
+            extracted = _get_files_metadata_uncached(pending, profiler.enabled)
+    elif pending:
+        extracted = _get_files_metadata_uncached(pending, profiler.enabled)
+
+    extracted = iter(extracted)
+    for path, stat, cached in chunk:
+        timings = None
+        if cached is None:
+            cached, timings = next(extracted)
+            if cache is not None:
+                cache.put(path, stat, cached)
+        if profiler.enabled:
+            profiler.record_file(path, stat.st_size, cached.get('extension'), timings)
+        yield cached
+
+def _get_files_metadata_uncached(items, timed=False):
+    # Devuelve (metadatos, segundos de cada fase o None) de cada archivo
+    results = []
+    for path, stat in items:
+        timings = {} if timed else None
+        results.append((get_file_metadata(path, use_cache=False, stat=stat, timings=timings), timings))
+    return results
+
+def inspect_pdf(file_path):
+    """
+    Analiza un archivo PDF una sola vez y obtiene en un mismo registro el número de páginas,
+    los metadatos del diccionario de información, si está cifrado y si es digitalizado.
+
+    El número de páginas se lee primero con el lector rápido de `pdf_utils`, que evita
+    recorrer el árbol de páginas completo; PyPDF2 solo lo cuenta si aquel no lo logra.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
     """
+    import PyPDF2
+
+    if _is_path(file_path):
+        pages = count_pdf_pages(file_path)
+    else:
+        pages = count_pages_in_buffer(_source_bytes(file_path))
     try:
-        with open(file_path, 'rb') as file:
+        with _open_source(file_path) as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            return len(pdf_reader.pages)
+            encrypted = pdf_reader.is_encrypted
+            if encrypted:
+                try:
+                    pdf_reader.decrypt('')
+                except:
+                    pass
+            try:
+                info = pdf_reader.metadata or {}
+            except:
+                info = {}
+            if pages is None:
+                pages = len(pdf_reader.pages)
     except:
-        return 1  # Si no es un PDF o hay un error, asumimos 1 página
+        return {
+            'pages': pages or 1,
+            'encrypted': False,
+            'digitalized': False,
+            'error': 'No se pudo extraer metadatos del PDF'
+        }
+
+    def info_value(key):
+        value = info.get(key)
+        if hasattr(value, 'get_object'):
+            value = value.get_object()
+        return str(value) if value else 'No disponible'
+
+    producer = info_value('/Producer')
+    return {
+        'pages': pages,
+        'author': info_value('/Author'),
+        'creator': info_value('/Creator'),
+        'producer': producer,
+        'subject': info_value('/Subject'),
+        'title': info_value('/Title'),
+        'encrypted': encrypted,
+        'digitalized': 'scan' in producer.lower()
+    }
+
+def get_pdf_pages(file_path):
+    """
+    Obtiene el número de páginas de un archivo PDF.
+    """
+    pages = count_pdf_pages(file_path)
+    if pages is None:
+        pages = inspect_pdf(file_path)['pages']
+    return pages
 
 def get_pdf_metadata(file_path):
     """
     Obtiene metadatos específicos de archivos PDF.
     """
-    try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            info = pdf_reader.metadata
-            return {
-                'pages': len(pdf_reader.pages),
-                'author': info.author if info.author else 'No disponible',
-                'creator': info.creator if info.creator else 'No disponible',
-                'producer': info.producer if info.producer else 'No disponible',
-                'subject': info.subject if info.subject else 'No disponible',
-                'title': info.title if info.title else 'No disponible'
-            }
-    except:
-        return {'pages': 1, 'error': 'No se pudo extraer metadatos del PDF'}
+    return inspect_pdf(file_path)
 
 def get_word_metadata(file_path):
     """
     Obtiene metadatos específicos de archivos Word.
+
+    Se leen solo las propiedades del paquete (docProps/app.xml y docProps/core.xml); el número
+    de páginas es el que Word registró al guardar el documento.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
     """
     try:
-        doc = docx.Document(file_path)
-        core_properties = doc.core_properties
-        return {
-            'pages': len(doc.sections),
-            'author': core_properties.author if core_properties.author else 'No disponible',
-            'created': format_date(core_properties.created) if core_properties.created else 'No disponible',
-            'modified': format_date(core_properties.modified) if core_properties.modified else 'No disponible',
-            'title': core_properties.title if core_properties.title else 'No disponible'
-        }
-    except:
+        with _open_source(file_path) as file:
+            properties = read_ooxml_properties(file)
+    except (OoxmlError, OSError):
         return {'pages': 1, 'error': 'No se pudo extraer metadatos del documento Word'}
+    return _office_metadata(properties, properties['pages'])
+
+def get_presentation_metadata(file_path):
+    """
+    Obtiene metadatos específicos de presentaciones PowerPoint; cada diapositiva cuenta como una página.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
+    """
+    try:
+        with _open_source(file_path) as file:
+            properties = read_ooxml_properties(file)
+    except (OoxmlError, OSError):
+        return {'pages': 1, 'error': 'No se pudo extraer metadatos de la presentación'}
+    return _office_metadata(properties, properties['slides'])
+
+def _format_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else 'No disponible'
+
+def _office_metadata(properties, pages):
+    return {
+        'pages': pages if pages and pages > 0 else 1,
+        'author': properties['author'] or 'No disponible',
+        'created': _format_datetime(properties['created']),
+        'modified': _format_datetime(properties['modified']),
+        'title': properties['title'] or 'No disponible'
+    }
 
 def get_excel_metadata(file_path):
     """
     Obtiene metadatos específicos de archivos Excel.
+
+    Los nombres de las hojas se leen de xl/workbook.xml, sin cargar el libro con openpyxl.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
     """
     try:
-        workbook = openpyxl.load_workbook(file_path, read_only=True)
-        return {
-            'sheets': len(workbook.sheetnames),
-            'sheet_names': ', '.join(workbook.sheetnames)
-        }
-    except:
+        with _open_source(file_path) as file:
+            sheet_names = read_workbook_sheets(file)
+    except (OoxmlError, OSError):
         return {'sheets': 1, 'error': 'No se pudo extraer metadatos del archivo Excel'}
+    return {
+        'sheets': len(sheet_names),
+        'sheet_names': ', '.join(sheet_names)
+    }
 
 def get_image_metadata(file_path):
     """
     Obtiene metadatos específicos de archivos de imagen.
+
+    TIFF, JPEG y PNG se leen solo desde sus encabezados (ver image_headers); un TIFF de varias
+    páginas reporta el número de páginas. Los demás formatos se abren con Pillow, que tampoco
+    decodifica los píxeles.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
     """
     try:
-        with Image.open(file_path) as img:
-            return {
-                'format': img.format,
-                'mode': img.mode,
-                'size': f"{img.width}x{img.height}"
-            }
-    except:
-        return {'error': 'No se pudo extraer metadatos de la imagen'}
+        with _open_source(file_path) as file:
+            header = read_image_header(file)
+            if header is None:
+                from PIL import Image
+                file.seek(0)
+                with Image.open(file) as img:
+                    header = {
+                        'format': img.format,
+                        'width': img.width,
+                        'height': img.height,
+                        'dpi': img.info.get('dpi'),
+                        'pages': getattr(img, 'n_frames', 1)
+                    }
+    except (ImageHeaderError, OSError, ValueError):
+        return {'pages': 1, 'error': 'No se pudo extraer metadatos de la imagen'}
+
+    metadata = {
+        'format': header['format'],
+        # 'size' ya contiene el tamaño del archivo
+        'dimensions': f"{header['width']}x{header['height']}",
+        'pages': header['pages'] or 1
+    }
+    if header['dpi']:
+        metadata['dpi'] = f"{round(header['dpi'][0])}x{round(header['dpi'][1])}"
+    return metadata
 
-def get_file_type(file_path):
+def get_file_type(file_path, trust_extension=True, name=None):
     """
     Obtiene el tipo MIME del archivo.
+
+    Para las extensiones de TRUSTED_SIGNATURES se comparan primero los bytes iniciales del
+    archivo con la firma del formato; solo si no coinciden se consulta libmagic, cuyo
+    detector se crea una vez por hilo y proceso en lugar de una vez por archivo.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
+    :param trust_extension: False para consultar siempre libmagic
+    :param name: Nombre del archivo cuando el contenido está en memoria, del que se toma la extensión
+    """
+    if trust_extension:
+        mime_type = sniff_file_type(file_path, name)
+        if mime_type:
+            return mime_type
+    if _is_path(file_path):
+        return _get_magic().from_file(file_path)
+    with _open_source(file_path) as file:
+        header = file.read(MAGIC_BUFFER_SIZE)
+    if not header:
+        return EMPTY_MIME_TYPE
+    return _get_magic().from_buffer(header)
+
+def sniff_file_type(file_path, name=None):
+    """
+    Obtiene el tipo MIME comparando los primeros bytes con la firma esperada para la extensión,
+    o None si la extensión no es de confianza o el contenido no coincide.
+
+    :param file_path: Ruta del archivo, su contenido (bytes, memoryview) o un objeto tipo archivo
+    :param name: Nombre del archivo cuando el contenido está en memoria
     """
-    mime = magic.Magic(mime=True)
-    return mime.from_file(file_path)
+    if name is None:
+        name = file_path if _is_path(file_path) else ''
+    signature = TRUSTED_SIGNATURES.get(os.path.splitext(name)[1].lower())
+    if signature is None:
+        return None
+    mime_type, patterns = signature
+    try:
+        with _open_source(file_path) as file:
+            header = file.read(SIGNATURE_SIZE)
+    except OSError:
+        return None
+    for offset, magic_bytes in patterns:
+        if header[offset:offset + len(magic_bytes)] == magic_bytes:
+            return mime_type
+    return None
+
+def _get_magic():
+    """
+    Obtiene el detector de libmagic del hilo actual, creándolo si es necesario.
+    """
+    pid = os.getpid()
+    if getattr(_magic_local, 'pid', None) != pid:
+        import magic
+        _magic_local.detector = magic.Magic(mime=True)
+        _magic_local.pid = pid
+    return _magic_local.detector
 
 def format_file_size(size):
     """
@@ -131,13 +515,6 @@ def is_document_digitalized(file_path):
     """
     Determina si un documento es digitalizado o nativo electrónico.
     """
-    file_type = get_file_type(file_path)
-    if file_type.startswith('application/pdf'):
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                if '/Producer' in pdf_reader.metadata:
-                    return 'scan' in pdf_reader.metadata['/Producer'].lower()
-        except:
-            pass
-    return False  # Si no es un PDF o no se puede determinar, asumimos que es nativo electrónico
\ No newline at end of file
+    if get_file_type(file_path).startswith('application/pdf'):
+        return inspect_pdf(file_path)['digitalized']
+    return False  # Si no es un PDF o no se puede determinar, asumimos que es nativo electrónico
@@ -0,0 +1,132 @@
+import posixpath
+import zipfile
+from datetime import datetime
+from xml.etree import ElementTree
+
+# Tipos de relación del paquete que apuntan a las propiedades del documento
+CORE_PROPERTIES_TYPE = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties'
+EXTENDED_PROPERTIES_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties'
+OFFICE_DOCUMENT_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+# Ubicación habitual de las propiedades cuando el paquete no las declara en _rels/.rels
+DEFAULT_CORE_PATH = 'docProps/core.xml'
+DEFAULT_APP_PATH = 'docProps/app.xml'
+DEFAULT_WORKBOOK_PATH = 'xl/workbook.xml'
+
+# Tamaño máximo que se acepta para una parte XML leída, como protección ante archivos malformados
+MAX_PART_SIZE = 1024 * 1024
+
+RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+EXTENDED_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+DCTERMS_NS = '{http://purl.org/dc/terms/}'
+
+class OoxmlError(Exception):
+    """
+    Indica que el archivo no es un paquete OOXML legible.
+    """
+
+def read_ooxml_properties(file_path):
+    """
+    Obtiene las propiedades de un documento de Office (.docx, .xlsx, .pptx) leyendo solo
+    docProps/app.xml y docProps/core.xml del paquete, sin cargar el cuerpo ni los archivos
+    incrustados.
+
+    El número de páginas (Word) y de diapositivas (PowerPoint) es el que guarda la aplicación
+    al cerrar el documento; si el paquete no lo incluye, el valor es None.
+
+    :param file_path: Ruta del archivo, o un objeto tipo archivo con el contenido
+    :return: Diccionario con 'pages', 'slides', 'author', 'title', 'created' y 'modified';
+             las fechas como datetime o None
+    :raises OoxmlError: Si el archivo no es un paquete OOXML
+    """
+    try:
+        with zipfile.ZipFile(file_path) as package:
+            core_path, app_path = _property_paths(package)
+            core = _read_part(package, core_path)
+            app = _read_part(package, app_path)
+    except (zipfile.BadZipFile, ElementTree.ParseError, OSError) as e:
+        raise OoxmlError(str(e)) from e
+
+    return {
+        'pages': _int_value(app, EXTENDED_NS + 'Pages'),
+        'slides': _int_value(app, EXTENDED_NS + 'Slides'),
+        'author': _text_value(core, DC_NS + 'creator'),
+        'title': _text_value(core, DC_NS + 'title'),
+        'created': _date_value(core, DCTERMS_NS + 'created'),
+        'modified': _date_value(core, DCTERMS_NS + 'modified')
+    }
+
+def read_workbook_sheets(file_path):
+    """
+    Obtiene los nombres de las hojas de un libro de Excel (.xlsx, .xlsm) leyendo solo
+    xl/workbook.xml del paquete, sin cargar las hojas, los estilos ni las imágenes.
+
+    :param file_path: Ruta del archivo, o un objeto tipo archivo con el contenido
+    :return: Lista con los nombres de las hojas en el orden del libro
+    :raises OoxmlError: Si el archivo no es un libro OOXML
+    """
+    try:
+        with zipfile.ZipFile(file_path) as package:
+            workbook_path = _package_targets(package).get(OFFICE_DOCUMENT_TYPE, DEFAULT_WORKBOOK_PATH)
+            workbook = _read_part(package, workbook_path)
+    except (zipfile.BadZipFile, ElementTree.ParseError, OSError) as e:
+        raise OoxmlError(str(e)) from e
+    # Se compara solo el nombre local para admitir también el espacio de nombres de Strict OOXML
+    if workbook is None or _local_name(workbook.tag) != 'workbook':
+        raise OoxmlError('El paquete no contiene un libro de Excel')
+    return [sheet.get('name') for sheet in workbook.iter() if _local_name(sheet.tag) == 'sheet']
+
+def _property_paths(package):
+    # Las relaciones del paquete indican dónde están las propiedades; la mayoría usa docProps/
+    targets = _package_targets(package)
+    return (targets.get(CORE_PROPERTIES_TYPE, DEFAULT_CORE_PATH),
+            targets.get(EXTENDED_PROPERTIES_TYPE, DEFAULT_APP_PATH))
+
+def _package_targets(package):
+    # Partes declaradas en _rels/.rels, por tipo de relación
+    relationships = _read_part(package, '_rels/.rels')
+    if relationships is None:
+        return {}
+    targets = {}
+    for relationship in relationships.iter(RELATIONSHIPS_NS + 'Relationship'):
+        target = posixpath.normpath(relationship.get('Target', '').lstrip('/'))
+        targets.setdefault(relationship.get('Type'), target)
+    return targets
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _read_part(package, name):
+    try:
+        info = package.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > MAX_PART_SIZE:
+        return None
+    return ElementTree.fromstring(package.read(info))
+
+def _text_value(root, tag):
+    if root is None:
+        return None
+    element = root.find(tag)
+    if element is None or not element.text or not element.text.strip():
+        return None
+    return element.text.strip()
+
+def _int_value(root, tag):
+    value = _text_value(root, tag)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _date_value(root, tag):
+    # Las fechas usan el formato W3CDTF, p. ej. 2024-03-15T10:30:00Z
+    value = _text_value(root, tag)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
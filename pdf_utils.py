@@ -0,0 +1,384 @@
+import os
+import re
+import mmap
+import zlib
+
+# Expresiones para los elementos de la estructura de un PDF que se leen sin analizar el documento completo
+LINEARIZED_RE = re.compile(rb'<<[^>]*?/Linearized\s*[\d.]+[^>]*?>>', re.S)
+LINEARIZED_N_RE = re.compile(rb'/N\s+(\d+)')
+LINEARIZED_L_RE = re.compile(rb'/L\s+(\d+)')
+STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+XREF_SUBSECTION_RE = re.compile(rb'\s*(\d+)\s+(\d+)\s*?(?:\r\n|\r|\n)')
+OBJ_HEADER_RE = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj\b')
+
+# Cantidad de bytes al final del archivo donde se busca la palabra clave startxref
+TAIL_SIZE = 4096
+
+# Límite de secciones /Prev que se siguen, como protección ante referencias circulares
+MAX_XREF_SECTIONS = 64
+
+class PdfStructureError(Exception):
+    """
+    Indica que la estructura del PDF no se puede leer con el lector rápido.
+    """
+
+def count_pdf_pages(file_path):
+    """
+    Obtiene el número de páginas de un PDF leyendo solo el trailer, la tabla de referencias
+    cruzadas y la raíz del árbol de páginas (/Pages /Count), sin analizar el documento completo.
+
+    El archivo se mapea en memoria, de modo que el costo es prácticamente constante sin
+    importar el tamaño del PDF. Devuelve None si la estructura no es la esperada, para que
+    quien llama recurra a PyPDF2.
+
+    :param file_path: Ruta del archivo PDF
+    :return: Número de páginas o None si no se pudo determinar
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return count_pages_in_buffer(data)
+    except (OSError, ValueError):
+        return None
+
+def count_pages_in_buffer(data):
+    """
+    Obtiene el número de páginas de un PDF contenido en un objeto tipo bytes o mmap.
+
+    :param data: Contenido del PDF
+    :return: Número de páginas o None si no se pudo determinar
+    """
+    try:
+        pages = _linearized_page_count(data)
+        if pages is None:
+            pages = _PdfStructure(data).page_count()
+        return pages if pages and pages > 0 else None
+    except (PdfStructureError, AttributeError, TypeError, ValueError, IndexError, zlib.error):
+        return None
+
+def _linearized_page_count(data):
+    """
+    Lee /N del diccionario de linealización, válido solo si /L coincide con el tamaño del archivo
+    (una actualización incremental posterior dejaría el valor desactualizado).
+    """
+    match = LINEARIZED_RE.search(data[:1024])
+    if not match:
+        return None
+    dictionary = match.group(0)
+    pages = LINEARIZED_N_RE.search(dictionary)
+    length = LINEARIZED_L_RE.search(dictionary)
+    if pages and length and int(length.group(1)) == len(data):
+        return int(pages.group(1))
+    return None
+
+class _PdfStructure:
+    """
+    Lector mínimo de la estructura de un PDF: tablas de referencias cruzadas clásicas y de tipo
+    stream, cadenas /Prev y objetos almacenados en streams de objetos.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.sections = []
+        self.trailer = None
+        self._object_streams = {}
+        self._load_sections()
+
+    def page_count(self):
+        root = self._get_ref(self.trailer, b'/Root')
+        catalog = self.get_object(*root)
+        pages_root = self.get_object(*self._get_ref(catalog, b'/Pages'))
+        count_ref = self._find_ref(pages_root, b'/Count')
+        if count_ref:
+            return int(self.get_object(*count_ref).strip())
+        return self._get_int(pages_root, b'/Count')
+
+    # Lectura de las secciones de referencias cruzadas
+
+    def _load_sections(self):
+        tail_start = max(0, len(self.data) - TAIL_SIZE)
+        matches = list(STARTXREF_RE.finditer(self.data[tail_start:]))
+        if not matches:
+            raise PdfStructureError('No se encontró startxref')
+        offset = int(matches[-1].group(1))
+
+        visited = set()
+        while offset is not None and offset not in visited and len(visited) < MAX_XREF_SECTIONS:
+            visited.add(offset)
+            section, trailer = self._read_section(offset)
+            self.sections.append(section)
+            if self.trailer is None:
+                self.trailer = trailer
+            # Archivos híbridos: la tabla clásica remite a un stream de referencias adicional
+            xref_stream = self._find_int(trailer, b'/XRefStm')
+            if xref_stream is not None and xref_stream not in visited:
+                visited.add(xref_stream)
+                self.sections.append(self._read_section(xref_stream)[0])
+            offset = self._find_int(trailer, b'/Prev')
+
+    def _read_section(self, offset):
+        # Algunos generadores apuntan startxref a los espacios previos a la sección
+        while self.data[offset:offset + 1] in (b' ', b'\r', b'\n', b'\t'):
+            offset += 1
+        if self.data[offset:offset + 4] == b'xref':
+            return self._read_xref_table(offset + 4)
+        return self._read_xref_stream(offset)
+
+    def _read_xref_table(self, pos):
+        subsections = []
+        while True:
+            match = XREF_SUBSECTION_RE.match(self.data, pos)
+            if not match:
+                break
+            start, count = int(match.group(1)), int(match.group(2))
+            subsections.append((start, count, match.end()))
+            # Cada entrada ocupa exactamente 20 bytes, por lo que se puede saltar la subsección
+            pos = match.end() + 20 * count
+        trailer_pos = self.data.find(b'trailer', pos, pos + 64)
+        if not subsections or trailer_pos < 0:
+            raise PdfStructureError('Tabla de referencias cruzadas inválida')
+        return _XrefTable(self.data, subsections), self._read_dictionary(trailer_pos + 7)
+
+    def _read_xref_stream(self, offset):
+        dictionary, stream = self._read_stream_object(offset)
+        widths = [int(w) for w in re.search(rb'/W\s*\[([^\]]*)\]', dictionary).group(1).split()]
+        index = re.search(rb'/Index\s*\[([^\]]*)\]', dictionary)
+        if index:
+            numbers = [int(n) for n in index.group(1).split()]
+        else:
+            numbers = [0, self._get_int(dictionary, b'/Size')]
+
+        entries = {}
+        row_size = sum(widths)
+        pos = 0
+        for start, count in zip(numbers[0::2], numbers[1::2]):
+            for number in range(start, start + count):
+                row = stream[pos:pos + row_size]
+                pos += row_size
+                fields = []
+                field_pos = 0
+                for width in widths:
+                    fields.append(int.from_bytes(row[field_pos:field_pos + width], 'big') if width else None)
+                    field_pos += width
+                entry_type = 1 if fields[0] is None else fields[0]
+                if entry_type == 1:
+                    entries[number] = ('offset', fields[1])
+                elif entry_type == 2:
+                    entries[number] = ('compressed', fields[1], fields[2])
+                else:
+                    entries[number] = ('free',)
+        return _XrefStreamSection(entries), dictionary
+
+    # Lectura de objetos
+
+    def lookup(self, number):
+        # Las secciones más recientes tienen prioridad; en archivos híbridos la tabla clásica
+        # marca como libres los objetos que están en el stream de referencias adicional
+        for section in self.sections:
+            entry = section.lookup(number)
+            if entry is not None and entry[0] != 'free':
+                return entry
+        raise PdfStructureError(f'El objeto {number} no está en las referencias cruzadas')
+
+    def get_object(self, number, generation=0):
+        entry = self.lookup(number)
+        if entry[0] == 'offset':
+            return self._read_object_at(entry[1], number)
+        if entry[0] == 'compressed':
+            return self._read_compressed_object(entry[1], entry[2], number)
+        raise PdfStructureError(f'El objeto {number} está marcado como libre')
+
+    def _read_object_at(self, offset, number=None):
+        match = OBJ_HEADER_RE.match(self.data, offset)
+        if not match or (number is not None and int(match.group(1)) != number):
+            raise PdfStructureError('El desplazamiento del objeto no es válido')
+        end = self.data.find(b'endobj', match.end())
+        stream_pos = self.data.find(b'stream', match.end(), end if end >= 0 else None)
+        if stream_pos >= 0:
+            end = stream_pos
+        if end < 0:
+            raise PdfStructureError('Objeto sin cierre')
+        return bytes(self.data[match.end():end])
+
+    def _read_stream_object(self, offset):
+        match = OBJ_HEADER_RE.match(self.data, offset)
+        if not match:
+            raise PdfStructureError('El desplazamiento del stream no es válido')
+        stream_keyword = self.data.find(b'stream', match.end())
+        if stream_keyword < 0:
+            raise PdfStructureError('Stream sin contenido')
+        dictionary = bytes(self.data[match.end():stream_keyword])
+        start = stream_keyword + 6
+        if self.data[start:start + 2] == b'\r\n':
+            start += 2
+        elif self.data[start:start + 1] in (b'\n', b'\r'):
+            start += 1
+
+        length = None
+        length_ref = self._find_ref(dictionary, b'/Length')
+        if length_ref:
+            try:
+                length = int(self.get_object(*length_ref).strip())
+            except (PdfStructureError, ValueError):
+                length = None
+        else:
+            length = self._find_int(dictionary, b'/Length')
+        if length is None:
+            end = self.data.find(b'endstream', start)
+            if end < 0:
+                raise PdfStructureError('Stream sin cierre')
+            raw = bytes(self.data[start:end]).rstrip(b'\r\n')
+        else:
+            raw = bytes(self.data[start:start + length])
+        return dictionary, _decode_stream(dictionary, raw)
+
+    def _read_compressed_object(self, stream_number, index, number):
+        if stream_number not in self._object_streams:
+            entry = self.lookup(stream_number)
+            if entry[0] != 'offset':
+                raise PdfStructureError('Stream de objetos no ubicado')
+            dictionary, stream = self._read_stream_object(entry[1])
+            count = self._get_int(dictionary, b'/N')
+            first = self._get_int(dictionary, b'/First')
+            header = [int(n) for n in stream[:first].split()[:2 * count]]
+            offsets = [first + offset for offset in header[1::2]] + [len(stream)]
+            self._object_streams[stream_number] = (header[0::2], offsets, stream)
+
+        numbers, offsets, stream = self._object_streams[stream_number]
+        if index >= len(numbers) or numbers[index] != number:
+            raise PdfStructureError('Índice de objeto comprimido inválido')
+        return stream[offsets[index]:offsets[index + 1]]
+
+    def _read_dictionary(self, pos):
+        start = self.data.find(b'<<', pos)
+        if start < 0:
+            raise PdfStructureError('Diccionario no encontrado')
+        depth = 0
+        i = start
+        end = len(self.data)
+        while i < end - 1:
+            pair = self.data[i:i + 2]
+            if pair == b'<<':
+                depth += 1
+                i += 2
+            elif pair == b'>>':
+                depth -= 1
+                i += 2
+                if depth == 0:
+                    return bytes(self.data[start:i])
+            else:
+                i += 1
+        raise PdfStructureError('Diccionario sin cierre')
+
+    # Utilidades de búsqueda de claves
+
+    @staticmethod
+    def _find_ref(dictionary, key):
+        match = re.search(re.escape(key) + rb'(?![A-Za-z])\s*(\d+)\s+(\d+)\s+R', dictionary)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    def _get_ref(self, dictionary, key):
+        ref = self._find_ref(dictionary, key)
+        if ref is None:
+            raise PdfStructureError(f'No se encontró la referencia {key!r}')
+        return ref
+
+    @staticmethod
+    def _find_int(dictionary, key):
+        match = re.search(re.escape(key) + rb'(?![A-Za-z])\s*(\d+)(?![\d.]|\s+\d+\s+R)', dictionary)
+        return int(match.group(1)) if match else None
+
+    def _get_int(self, dictionary, key):
+        value = self._find_int(dictionary, key)
+        if value is None:
+            raise PdfStructureError(f'No se encontró el valor {key!r}')
+        return value
+
+class _XrefTable:
+    """
+    Sección clásica de referencias cruzadas; las entradas se leen bajo demanda.
+    """
+
+    def __init__(self, data, subsections):
+        self.data = data
+        self.subsections = subsections
+
+    def lookup(self, number):
+        for start, count, pos in self.subsections:
+            if start <= number < start + count:
+                entry = bytes(self.data[pos + 20 * (number - start):pos + 20 * (number - start) + 18]).split()
+                if len(entry) != 3:
+                    raise PdfStructureError('Entrada de referencia cruzada inválida')
+                if entry[2] == b'n':
+                    return ('offset', int(entry[0]))
+                return ('free',)
+        return None
+
+class _XrefStreamSection:
+    """
+    Sección de referencias cruzadas almacenada en un stream (PDF 1.5 o superior).
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def lookup(self, number):
+        return self.entries.get(number)
+
+def _decode_stream(dictionary, raw):
+    """
+    Decodifica un stream con filtro FlateDecode y, si aplica, el predictor PNG.
+    """
+    filters = re.findall(rb'/(\w+Decode)', dictionary)
+    if not filters:
+        return raw
+    if filters != [b'FlateDecode']:
+        raise PdfStructureError('Filtro de stream no soportado')
+    data = zlib.decompress(raw)
+
+    predictor = re.search(rb'/Predictor\s+(\d+)', dictionary)
+    if predictor and int(predictor.group(1)) >= 10:
+        columns = re.search(rb'/Columns\s+(\d+)', dictionary)
+        data = _undo_png_predictor(data, int(columns.group(1)) if columns else 1)
+    return data
+
+def _undo_png_predictor(data, columns):
+    """
+    Revierte el predictor PNG aplicado fila por fila a un stream de referencias cruzadas.
+    """
+    output = bytearray()
+    previous = bytearray(columns)
+    row_size = columns + 1
+    for pos in range(0, len(data) - row_size + 1, row_size):
+        filter_type = data[pos]
+        row = bytearray(data[pos + 1:pos + row_size])
+        if filter_type == 1:
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif filter_type == 2:
+            for i in range(columns):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif filter_type == 3:
+            for i in range(columns):
+                left = row[i - 1] if i else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif filter_type == 4:
+            for i in range(columns):
+                left = row[i - 1] if i else 0
+                up = previous[i]
+                up_left = previous[i - 1] if i else 0
+                estimate = left + up - up_left
+                distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+                if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                    row[i] = (row[i] + left) & 0xFF
+                elif distances[1] <= distances[2]:
+                    row[i] = (row[i] + up) & 0xFF
+                else:
+                    row[i] = (row[i] + up_left) & 0xFF
+        elif filter_type != 0:
+            raise PdfStructureError('Predictor PNG no soportado')
+        output.extend(row)
+        previous = row
+    return bytes(output)
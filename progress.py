@@ -0,0 +1,120 @@
+import time
+import threading
+
+class OperationCancelled(Exception):
+    """
+    Indica que el usuario canceló la operación; se lanza entre un archivo y el siguiente.
+    """
+
+class CancellationToken:
+    """
+    Señal de cancelación compartida entre la interfaz y el proceso que renombra o indexa.
+
+    La interfaz llama a cancel(); las funciones que reciben el token lo consultan antes de
+    cada archivo y se detienen con OperationCancelled sin dejar un archivo a medio procesar.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """
+        Solicita la cancelación de la operación.
+        """
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Lanza OperationCancelled si se solicitó la cancelación.
+        """
+        if self._event.is_set():
+            raise OperationCancelled('Operación cancelada por el usuario')
+
+class ProgressTracker:
+    """
+    Informa el avance de una etapa archivo por archivo, con el tiempo restante estimado a
+    partir de la velocidad observada (archivos por segundo desde el inicio de la etapa).
+
+    La función `callback` recibe (etapa, archivos terminados, total, segundos restantes o None).
+    """
+
+    def __init__(self, stage, total, callback=None, cancel=None):
+        """
+        :param stage: Nombre de la etapa ('renombrado', 'metadatos')
+        :param total: Número de archivos de la etapa
+        :param callback: Función que recibe el avance; None para no informarlo
+        :param cancel: CancellationToken que se consulta en cada archivo
+        """
+        self.stage = stage
+        self.total = total
+        self.callback = callback
+        self.cancel = cancel
+        self.done = 0
+        self._start = time.perf_counter()
+        if callback is not None:
+            callback(stage, 0, total, None)
+
+    def eta(self):
+        """
+        Segundos restantes estimados, o None si todavía no hay archivos terminados.
+        """
+        if not self.done:
+            return None
+        elapsed = time.perf_counter() - self._start
+        return elapsed / self.done * (self.total - self.done)
+
+    def check(self):
+        """
+        Lanza OperationCancelled si se solicitó la cancelación.
+        """
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+
+    def advance(self, count=1):
+        """
+        Registra `count` archivos terminados e informa el avance.
+        """
+        self.done += count
+        if self.callback is not None:
+            self.callback(self.stage, self.done, self.total, self.eta())
+
+def track(iterable, stage, total, callback=None, cancel=None):
+    """
+    Recorre `iterable` informando el avance de cada elemento y consultando la cancelación
+    antes de pedir el siguiente. Si la operación se cancela, el iterable se cierra (por
+    ejemplo, para liberar el grupo de procesos de la extracción de metadatos).
+    """
+    tracker = ProgressTracker(stage, total, callback, cancel)
+    iterator = iter(iterable)
+    try:
+        while True:
+            tracker.check()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            yield item
+            tracker.advance()
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
+def format_eta(seconds):
+    """
+    Formatea el tiempo restante para mostrarlo en la interfaz (por ejemplo, "2 min 05 s").
+    """
+    if seconds is None:
+        return 'calculando…'
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f'{seconds} s'
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f'{minutes} min {seconds:02d} s'
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours} h {minutes:02d} min'
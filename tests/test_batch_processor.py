@@ -0,0 +1,62 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+from unittest import mock
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from batch_processor import discover_cuadernos, process_batch, process_cuaderno, REPORT_NAME
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
+
+class TestBatchProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.serie = os.path.join(self.test_dir, 'EXPEDIENTES_PROCESOS_JUDICIALES')
+        self.cuadernos = [
+            os.path.join(self.serie, '05088400300120240001200', '01PrimeraInstancia', 'C01Principal'),
+            os.path.join(self.serie, '05088400300120240001200', '01PrimeraInstancia', 'C02Medidas'),
+            os.path.join(self.serie, '05088400300120240004500', '02SegundaInstancia', 'C01Principal'),
+        ]
+        for cuaderno in self.cuadernos:
+            os.makedirs(cuaderno)
+            for name in ("demanda.txt", "poder.txt"):
+                with open(os.path.join(cuaderno, name), "w") as f:
+                    f.write(name)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_discover_serie_layout(self):
+        found = discover_cuadernos(self.serie)
+        self.assertEqual([c['Ruta'] for c in found], sorted(self.cuadernos))
+        self.assertEqual(found[0]['Serie o Subserie'], 'EXPEDIENTES_PROCESOS_JUDICIALES')
+        self.assertEqual(found[0]['Radicado'], '05088400300120240001200')
+        self.assertEqual(found[0]['Instancia'], '01PrimeraInstancia')
+
+    def test_discover_expediente_and_subcarpeta_layouts(self):
+        expediente = os.path.join(self.serie, '05088400300120240001200')
+        self.assertEqual(len(discover_cuadernos(expediente)), 2)
+        self.assertEqual([c['Ruta'] for c in discover_cuadernos(self.cuadernos[0])], [self.cuadernos[0]])
+
+    def test_process_batch_generates_one_index_per_cuaderno(self):
+        report = process_batch(self.serie, TEMPLATE_PATH, max_workers=2, use_cache=False)
+        self.assertEqual(len(report), 3)
+        self.assertTrue((report['Estado'] == 'Procesado').all(), report['Error'].tolist())
+        for cuaderno in self.cuadernos:
+            self.assertTrue(os.path.exists(os.path.join(cuaderno, "000IndiceElectronicoC01.xlsm")))
+        self.assertTrue(os.path.exists(os.path.join(self.serie, REPORT_NAME)))
+
+    def test_process_cuaderno_without_cache(self):
+        # Las carpetas temporales (por ejemplo, un ZIP cargado en la versión web) no pasan por la caché
+        with mock.patch('metadata_extractor.get_default_cache', side_effect=AssertionError("No se debió abrir la caché")):
+            result = process_cuaderno(self.cuadernos[0], TEMPLATE_PATH, use_cache=False)
+        self.assertEqual(result['Estado'], 'Procesado', result['Error'])
+        self.assertTrue(os.path.exists(result['Índice']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import threading
+import pandas as pd
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from excel_pool import ExcelAppPool, get_default_pool
+from excel_handler import fill_template_xlwings
+
+class FakeRange:
+    def __init__(self, sheet, address):
+        self.sheet = sheet
+        self.address = address
+
+    def options(self, **kwargs):
+        return self
+
+    @property
+    def value(self):
+        return self.sheet.values.get(self.address)
+
+    @value.setter
+    def value(self, value):
+        self.sheet.values[self.address] = value
+
+class FakeSheet:
+    def __init__(self):
+        self.values = {}
+
+    def range(self, address):
+        return FakeRange(self, address)
+
+class FakeBook:
+    def __init__(self, app, path):
+        self.app = app
+        self.path = path
+        self.sheets = [FakeSheet()]
+        self.saved = False
+
+    def save(self, path=None):
+        self.saved = True
+
+    def close(self):
+        self.app.open_books.remove(self)
+
+class FakeBooks:
+    def __init__(self, app):
+        self.app = app
+
+    def open(self, path):
+        book = FakeBook(self.app, path)
+        self.app.open_books.append(book)
+        self.app.history.append(book)
+        return book
+
+    def __len__(self):
+        if self.app.crashed:
+            raise OSError("Excel no responde")
+        return len(self.app.open_books)
+
+    def __iter__(self):
+        return iter(list(self.app.open_books))
+
+class FakeApp:
+    """
+    Sustituto local de xw.App con la parte de la API que usa el proyecto.
+    """
+
+    def __init__(self):
+        self.open_books = []
+        self.history = []
+        self.books = FakeBooks(self)
+        self.crashed = False
+        self.quit_called = False
+
+    def quit(self):
+        if self.crashed:
+            raise OSError("Excel no responde")
+        self.quit_called = True
+
+    def kill(self):
+        self.quit_called = True
+
+class TestExcelAppPool(unittest.TestCase):
+
+    def setUp(self):
+        self.apps = []
+
+    def factory(self):
+        app = FakeApp()
+        self.apps.append(app)
+        return app
+
+    def test_reuses_instance_between_jobs(self):
+        with ExcelAppPool(app_factory=self.factory) as pool:
+            for _ in range(5):
+                with pool.app() as app:
+                    app.books.open("indice.xlsm").close()
+            self.assertEqual(len(self.apps), 1)
+        self.assertTrue(self.apps[0].quit_called)
+
+    def test_recycles_after_max_books(self):
+        with ExcelAppPool(max_books=2, app_factory=self.factory) as pool:
+            for _ in range(5):
+                with pool.app():
+                    pass
+        self.assertEqual(len(self.apps), 3)
+        self.assertTrue(all(app.quit_called for app in self.apps))
+
+    def test_recycles_after_failed_job_and_crash(self):
+        pool = ExcelAppPool(app_factory=self.factory)
+        with self.assertRaises(ValueError):
+            with pool.app():
+                raise ValueError("macro interrumpida")
+        self.assertTrue(self.apps[0].quit_called)
+
+        with pool.app():
+            pass
+        self.apps[1].crashed = True
+        with pool.app() as app:
+            self.assertIs(app, self.apps[2], "Una instancia que no responde no debe entregarse")
+        pool.close()
+        self.assertEqual(pool.recycled, 2)
+
+    def test_fill_template_xlwings_uses_pool(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            df = pd.DataFrame([{'Nombre Documento': 'Demanda', 'Orden Documento': 1}])
+            with ExcelAppPool(app_factory=self.factory) as pool:
+                for name in ('a.xlsm', 'b.xlsm'):
+                    fill_template_xlwings(df, os.path.join(test_dir, name), {'Ciudad': 'Bello'}, excel_pool=pool)
+            self.assertEqual(len(self.apps), 1)
+            books = self.apps[0].history
+            self.assertEqual([os.path.basename(b.path) for b in books], ['a.xlsm', 'b.xlsm'])
+            self.assertTrue(all(b.saved for b in books))
+            self.assertEqual(self.apps[0].open_books, [])
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_default_pool_per_thread(self):
+        # Las instancias de Excel (COM) no pueden usarse desde un hilo distinto al que las creó
+        pools = []
+        thread = threading.Thread(target=lambda: pools.extend([get_default_pool(), get_default_pool()]))
+        thread.start()
+        thread.join()
+        self.assertIs(pools[0], pools[1])
+        self.assertIs(get_default_pool(), get_default_pool())
+        self.assertIsNot(get_default_pool(), pools[0])
+
+if __name__ == '__main__':
+    unittest.main()
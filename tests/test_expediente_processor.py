@@ -5,14 +5,16 @@ import tempfile
 import sys
 import pandas as pd
 from datetime import datetime
+from unittest import mock
 
 # Añadir el directorio raíz del proyecto al path para poder importar los módulos
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from index_generator import generate_index_from_scratch, generate_index_from_template, update_metadata
+from index_generator import generate_index_from_scratch, generate_index_from_template, update_metadata, generate_index_streaming, build_index_dataframe
 from file_utils import rename_files, get_file_metadata, create_folder_structure, get_folder_structure
-from metadata_extractor import get_pdf_pages
-from excel_handler import save_excel_file, create_new_excel, fill_template_xlwings
+from metadata_extractor import get_pdf_pages, inspect_pdf, get_file_type, get_content_metadata
+from metadata_extractor import get_file_metadata as extract_file_metadata
+from excel_handler import save_excel_file, create_new_excel, fill_template_xlwings, dataframe_to_excel, METADATA_FIELDS
 
 class TestExpedienteProcessor(unittest.TestCase):
 
@@ -70,7 +72,7 @@ class TestExpedienteProcessor(unittest.TestCase):
 
     def test_generate_index_from_scratch(self):
         try:
-            df = generate_index_from_scratch(self.test_dir)
+            df = generate_index_from_scratch(self.test_dir, use_cache=False)
             self.assertEqual(len(df), 4, "El número de filas en el índice no coincide con el número de archivos")
             expected_columns = [
                 'Nombre Documento', 'Fecha Creación Documento', 
@@ -82,10 +84,52 @@ class TestExpedienteProcessor(unittest.TestCase):
         except Exception as e:
             self.fail(f"Error en test_generate_index_from_scratch: {str(e)}")
 
+    def test_generate_index_parallel_matches_sequential(self):
+        for i in range(40):
+            with open(os.path.join(self.test_dir, f"anexo{i}.txt"), "w") as f:
+                f.write("contenido " * i)
+        sequential = generate_index_from_scratch(self.test_dir, use_cache=False, workers=1)
+        parallel = generate_index_from_scratch(self.test_dir, use_cache=False, workers=2)
+        pd.testing.assert_frame_equal(sequential, parallel)
+
+    def test_generate_index_streaming(self):
+        from openpyxl import load_workbook
+        expected = generate_index_from_scratch(self.test_dir, use_cache=False)
+        output_path = os.path.join(self.test_dir, "indice_streaming.xlsx")
+        count = generate_index_streaming(self.test_dir, output_path, metadata={'Ciudad': 'Bello'}, use_cache=False)
+        self.assertEqual(count, len(expected))
+        ws = load_workbook(output_path).active
+        self.assertEqual([c.value for c in ws[11]][:len(expected.columns)], list(expected.columns))
+        self.assertEqual(ws['B3'].value, 'Bello')
+        self.assertEqual([ws.cell(row=12 + i, column=1).value for i in range(count)],
+                         expected['Nombre Documento'].tolist())
+
+    def test_build_index_dataframe_pagination(self):
+        files = ["001Demanda.pdf", "002Poder.docx", "003Anexo.v2.pdf", "004Memorial.pdf"]
+        metadata = [
+            {'extension': '.pdf', 'pages': 3, 'size': '1 KB', 'modification_date': '2024-01-01 10:00:00'},
+            {'extension': '.docx', 'size': '2 KB', 'modification_date': '2024-01-02 10:00:00'},
+            {'extension': '.pdf', 'pages': 0, 'size': '3 KB', 'modification_date': '2024-01-03 10:00:00'},
+            {'extension': '.pdf', 'pages': 2, 'size': '4 KB', 'modification_date': '2024-01-04 10:00:00'}
+        ]
+        df = build_index_dataframe(files, metadata, {'Poder': '2020-05-05'}, '2026-10-18', first_page=10)
+        self.assertEqual(df['Nombre Documento'].tolist(), ["Demanda", "Poder", "Anexo.v2", "Memorial"])
+        self.assertEqual(df['Página Inicio'].tolist(), [10, 13, 14, 15])
+        self.assertEqual(df['Página Fin'].tolist(), [12, 13, 14, 16])
+        self.assertEqual(df['Fecha Creación Documento'].tolist()[:2], ['2024-01-01 10:00:00', '2020-05-05'])
+        self.assertEqual(df['Origen'].tolist(), ['Digitalizado', 'Electrónico', 'Digitalizado', 'Digitalizado'])
+
+    def test_streaming_rows_continue_across_chunks(self):
+        import index_generator
+        expected = generate_index_from_scratch(self.test_dir, use_cache=False)
+        with mock.patch.object(index_generator, 'ROW_CHUNK_SIZE', 2):
+            rows = list(index_generator.iter_index_rows(self.test_dir, use_cache=False))
+        self.assertEqual(rows, expected.to_dict('records'))
+
     def test_generate_index_from_template(self):
         try:
             template_path = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
-            output_path = generate_index_from_template(self.test_dir, template_path)
+            output_path = generate_index_from_template(self.test_dir, template_path, use_cache=False)
             self.assertTrue(os.path.exists(output_path), "No se generó el archivo de índice")
             self.assertTrue(output_path.endswith('.xlsm'), "El archivo generado no tiene la extensión .xlsm")
         except Exception as e:
@@ -93,7 +137,7 @@ class TestExpedienteProcessor(unittest.TestCase):
 
     def test_save_excel_file(self):
         try:
-            df = generate_index_from_scratch(self.test_dir)
+            df = generate_index_from_scratch(self.test_dir, use_cache=False)
             output_path = os.path.join(self.test_dir, "test_index.xlsx")
             save_excel_file(df, output_path, use_template=False)
             self.assertTrue(os.path.exists(output_path), "No se guardó el archivo Excel")
@@ -129,9 +173,70 @@ class TestExpedienteProcessor(unittest.TestCase):
         except Exception as e:
             self.fail(f"Error en test_get_pdf_pages: {str(e)}")
 
+    def test_inspect_pdf(self):
+        from PyPDF2 import PdfWriter
+        file_path = os.path.join(self.test_dir, "escaneado.pdf")
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=612, height=792)
+        writer.add_metadata({'/Producer': 'Canon Scan Utility', '/Title': 'Demanda'})
+        with open(file_path, "wb") as f:
+            writer.write(f)
+
+        record = inspect_pdf(file_path)
+        self.assertEqual(record['pages'], 3, "El número de páginas del PDF no es el esperado")
+        self.assertEqual(record['title'], 'Demanda')
+        self.assertFalse(record['encrypted'])
+        self.assertTrue(record['digitalized'], "El PDF debió reconocerse como digitalizado")
+
+    def test_get_file_type_signature_fast_path(self):
+        file_path = os.path.join(self.test_dir, "documento_multipage.pdf")
+        self.assertEqual(get_file_type(file_path), 'application/pdf')
+        self.assertEqual(get_file_type(file_path, trust_extension=False), 'application/pdf')
+
+        # Un archivo vacío con extensión .pdf no coincide con la firma y lo resuelve libmagic
+        empty_path = os.path.join(self.test_dir, "documento1.pdf")
+        self.assertEqual(get_file_type(empty_path), get_file_type(empty_path, trust_extension=False))
+
+    def test_content_metadata_matches_file_metadata(self):
+        import io
+        from PyPDF2 import PdfWriter
+        from PIL import Image
+        from openpyxl import Workbook
+        writer = PdfWriter()
+        for _ in range(2):
+            writer.add_blank_page(width=612, height=792)
+        with open(os.path.join(self.test_dir, "demanda.pdf"), "wb") as f:
+            writer.write(f)
+        page = Image.new('L', (200, 300), 255)
+        page.save(os.path.join(self.test_dir, "escaneo.tif"), save_all=True, append_images=[page], dpi=(300, 300))
+        book = Workbook()
+        book.create_sheet('Liquidación')
+        book.save(os.path.join(self.test_dir, "liquidacion.xlsx"))
+
+        for name in ("demanda.pdf", "escaneo.tif", "liquidacion.xlsx", "documento_multipage.pdf", "imagen.jpg"):
+            with self.subTest(name=name):
+                path = os.path.join(self.test_dir, name)
+                expected = extract_file_metadata(path, use_cache=False)
+                with open(path, "rb") as f:
+                    content = f.read()
+                for source in (content, memoryview(content), io.BytesIO(content)):
+                    metadata = get_content_metadata(source, name, modified=os.path.getmtime(path))
+                    metadata.pop('creation_date')
+                    self.assertEqual(metadata, {k: v for k, v in expected.items() if k != 'creation_date'})
+
+    def test_dataframe_to_excel_index_format(self):
+        import io
+        from openpyxl import load_workbook
+        df = generate_index_from_scratch(self.test_dir, use_cache=False)
+        data = dataframe_to_excel(df, {'Ciudad': 'Sincelejo'}, index_format=True)
+        ws = load_workbook(io.BytesIO(data)).active
+        self.assertEqual(ws['B3'].value, 'Sincelejo')
+        self.assertEqual(ws.cell(row=12, column=1).value, df['Nombre Documento'].iloc[0])
+
     def test_update_metadata(self):
         try:
-            df = generate_index_from_scratch(self.test_dir)
+            df = generate_index_from_scratch(self.test_dir, use_cache=False)
             metadata = {
                 'Ciudad': 'Bogotá',
                 'Despacho Judicial': 'Juzgado 1 Civil del Circuito',
@@ -145,16 +250,26 @@ class TestExpedienteProcessor(unittest.TestCase):
 
     def test_create_new_excel(self):
         try:
-            df = generate_index_from_scratch(self.test_dir)
+            df = generate_index_from_scratch(self.test_dir, use_cache=False)
             wb = create_new_excel(df)
             self.assertIsNotNone(wb, "No se creó el libro de Excel")
             self.assertIn('Índice Electrónico', wb.sheetnames, "No se creó la hoja 'Índice Electrónico' en el libro de Excel")
         except Exception as e:
             self.fail(f"Error en test_create_new_excel: {str(e)}")
 
+    def test_create_new_excel_metadata_and_styles(self):
+        df = generate_index_from_scratch(self.test_dir, use_cache=False)
+        wb = create_new_excel(df, {'Ciudad': 'Bello', 'Expediente Físico': 'NO', 'No. Carpetas': 2})
+        ws = wb['Índice Electrónico']
+        self.assertEqual(ws['B3'].value, 'Bello')
+        self.assertEqual((ws['M4'].value, ws['M5'].value), ('NO', 2))
+        self.assertEqual(ws['A12'].style, 'Índice Celda')
+        longest = max(len(name) for name in df['Nombre Documento'].tolist() + list(METADATA_FIELDS))
+        self.assertEqual(ws.column_dimensions['A'].width, longest + 2)
+
     def test_fill_template_xlwings(self):
         try:
-            df = generate_index_from_scratch(self.test_dir)
+            df = generate_index_from_scratch(self.test_dir, use_cache=False)
             template_path = os.path.join(os.path.dirname(__file__), '..', 'assets', '00IndiceElectronicoC0.xlsm')
             output_path = os.path.join(self.test_dir, "filled_template.xlsm")
             fill_template_xlwings(df, output_path)
@@ -0,0 +1,83 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+from PIL import Image
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from image_headers import read_image_header, ImageHeaderError
+from metadata_extractor import get_file_metadata, format_file_size
+from index_generator import generate_index_from_scratch
+
+class TestImageHeaders(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.page = Image.new('L', (850, 1100), 255)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def save_tiff(self, name, pages, **kwargs):
+        path = os.path.join(self.test_dir, name)
+        self.page.save(path, save_all=True, append_images=[self.page] * (pages - 1), dpi=(300, 300), **kwargs)
+        return path
+
+    def test_multipage_tiff(self):
+        header = read_image_header(self.save_tiff("escaneo.tif", 4))
+        self.assertEqual((header['format'], header['width'], header['height']), ('TIFF', 850, 1100))
+        self.assertEqual(header['pages'], 4)
+        self.assertEqual(header['dpi'], (300, 300))
+        self.assertEqual(read_image_header(self.save_tiff("escaneo_big.tif", 3, big_tiff=True))['pages'], 3)
+
+    def test_thumbnail_directory_is_not_a_page(self):
+        path = os.path.join(self.test_dir, "con_miniatura.tif")
+        thumbnail = self.page.resize((85, 110))
+        self.page.save(path, save_all=True, append_images=[thumbnail], tiffinfo={254: 0})
+        with Image.open(path) as img:
+            self.assertEqual(img.n_frames, 2)
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Entrada NewSubfileType (254, LONG, 1, valor 0) del segundo directorio; el valor 1 la marca como miniatura
+        second = data.rfind(b'\xfe\x00\x04\x00\x01\x00\x00\x00\x00\x00\x00\x00')
+        self.assertGreater(second, data.find(b'\xfe\x00\x04\x00\x01\x00\x00\x00\x00\x00\x00\x00'))
+        with open(path, 'r+b') as f:
+            f.seek(second + 8)
+            f.write(b'\x01')
+        self.assertEqual(read_image_header(path)['pages'], 1)
+
+    def test_jpeg_and_png_dimensions_and_dpi(self):
+        jpeg = os.path.join(self.test_dir, "foto.jpg")
+        self.page.save(jpeg, dpi=(200, 200))
+        self.assertEqual(read_image_header(jpeg), {'format': 'JPEG', 'width': 850, 'height': 1100,
+                                                   'dpi': (200, 200), 'pages': 1})
+        png = os.path.join(self.test_dir, "firma.png")
+        self.page.save(png, dpi=(96, 96))
+        header = read_image_header(png)
+        self.assertEqual((header['width'], header['height']), (850, 1100))
+        self.assertEqual(round(header['dpi'][0]), 96)
+
+    def test_truncated_tiff(self):
+        path = self.save_tiff("dañado.tif", 2)
+        with open(path, 'r+b') as f:
+            f.truncate(6)
+        with self.assertRaises(ImageHeaderError):
+            read_image_header(path)
+
+    def test_index_counts_tiff_pages(self):
+        path = self.save_tiff("001Escaneo.tif", 5)
+        self.page.save(os.path.join(self.test_dir, "002Foto.jpg"))
+        metadata = get_file_metadata(path, use_cache=False)
+        # Las dimensiones no reemplazan el tamaño del archivo
+        self.assertEqual(metadata['size'], format_file_size(os.path.getsize(path)))
+        self.assertEqual(metadata['dimensions'], '850x1100')
+
+        df = generate_index_from_scratch(self.test_dir, use_cache=False)
+        self.assertEqual(df['Número Páginas'].tolist(), [5, 1])
+        self.assertEqual(df['Página Fin'].tolist(), [5, 6])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+import subprocess
+import importlib.util
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Bibliotecas que solo deben cargarse cuando se extraen metadatos o se escribe un libro
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'PyPDF2', 'PIL', 'magic', 'xlwings', 'docx')
+
+# Presupuesto de importación de los módulos del proyecto, en microsegundos (sin contar PyQt5).
+# La variable de entorno EXPEDIENTE_IMPORT_BUDGET_US permite ajustarlo en equipos lentos.
+IMPORT_BUDGET_US = int(os.environ.get('EXPEDIENTE_IMPORT_BUDGET_US', 300000))
+
+def import_profile(module):
+    """
+    Importa un módulo en un intérprete nuevo con `-X importtime`.
+
+    :return: (tiempo acumulado del módulo en microsegundos, bibliotecas pesadas cargadas)
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+class TestImportTime(unittest.TestCase):
+
+    def test_core_modules_import_without_heavy_dependencies(self):
+        for module in ('index_generator', 'excel_handler', 'batch_processor', 'file_utils'):
+            with self.subTest(module=module):
+                cumulative, loaded = import_profile(module)
+                self.assertEqual(loaded, [], f"{module} carga {loaded} al importarse")
+                self.assertLess(cumulative, IMPORT_BUDGET_US)
+
+    @unittest.skipIf(importlib.util.find_spec('PyQt5') is None, "PyQt5 no está instalado")
+    def test_desktop_app_startup(self):
+        cumulative, loaded = import_profile('app')
+        self.assertEqual(loaded, [])
+        # La aplicación de escritorio suma la importación de PyQt5
+        self.assertLess(cumulative, IMPORT_BUDGET_US * 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+import sys
+from unittest import mock
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import index_generator
+from index_generator import update_index_incremental, read_index_rows, generate_index_from_scratch
+from progress import CancellationToken, OperationCancelled
+from batch_processor import process_cuaderno
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
+
+class TestIncrementalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        base = time.time() - 3600
+        for i, name in enumerate(("001Demanda.txt", "002Poder.txt", "003Anexos.txt", "004Auto.txt")):
+            self.write(name, name * (i + 1), base + i)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def test_update_only_extracts_changed_documents(self):
+        first = update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False)
+        self.assertEqual(first['Documentos'], 4)
+        self.assertEqual(len(first['Nuevos']), 4)
+
+        os.remove(os.path.join(self.test_dir, "002Poder.txt"))
+        future = time.time() + 60
+        self.write("003Anexos.txt", "contenido ampliado del anexo " * 50, future)
+        self.write("005Memorial.txt", "memorial", future + 1)
+
+        extracted = []
+        original = index_generator.iter_files_metadata
+        def tracking(paths, **kwargs):
+            extracted.extend(os.path.basename(p) for p in paths)
+            return original(paths, **kwargs)
+
+        with mock.patch.object(index_generator, 'iter_files_metadata', side_effect=tracking):
+            second = update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False)
+
+        self.assertEqual(sorted(extracted), ["003Anexos.txt", "005Memorial.txt"])
+        self.assertEqual(second['Nuevos'], ["Memorial"])
+        self.assertEqual(second['Modificados'], ["Anexos"])
+        self.assertEqual(second['Eliminados'], ["Poder"])
+
+        # El anexo modificado pasa a la posición de su nueva fecha, como en el renombrado
+        rows = read_index_rows(second['Índice'])
+        self.assertEqual([r['Nombre Documento'] for r in rows], ["Demanda", "Auto", "Anexos", "Memorial"])
+        self.assertEqual([r['Orden Documento'] for r in rows], [1, 2, 3, 4])
+        self.assertEqual([r['Página Fin'] for r in rows], [1, 2, 3, 4])
+
+    def test_update_matches_full_index(self):
+        update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False)
+        self.write("003Anexos.txt", "contenido ampliado del anexo " * 50, time.time() + 60)
+        self.write("005Memorial de parte.txt", "memorial", time.time() + 61)
+        summary = update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False)
+
+        # Las columnas que salen de los archivos coinciden con las de un índice completo
+        expected = generate_index_from_scratch(self.test_dir, use_cache=False)
+        rows = read_index_rows(summary['Índice'])
+        for column in ('Nombre Documento', 'Orden Documento', 'Número Páginas', 'Página Inicio', 'Página Fin',
+                       'Formato', 'Tamaño', 'Origen'):
+            self.assertEqual([r[column] for r in rows], expected[column].tolist(), column)
+
+    def test_cancel_keeps_previous_index(self):
+        summary = update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False)
+        with open(summary['Índice'], 'rb') as f:
+            before = f.read()
+        self.write("005Memorial.txt", "memorial", time.time() + 60)
+
+        updates = []
+        cancel = CancellationToken()
+        cancel.cancel()
+        with self.assertRaises(OperationCancelled):
+            update_index_incremental(self.test_dir, TEMPLATE_PATH, use_cache=False,
+                                     progress=lambda *args: updates.append(args), cancel=cancel)
+        self.assertEqual(updates, [('metadatos', 0, 1, None)])
+        with open(summary['Índice'], 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+    def test_older_new_document_follows_rename_order(self):
+        process_cuaderno(self.test_dir, TEMPLATE_PATH, incremental=True, use_cache=False)
+        # Documento nuevo con fecha anterior a la de los existentes
+        older = os.path.getmtime(os.path.join(self.test_dir, "001Demanda.txt")) + 0.5
+        self.write("memorial.txt", "memorial", older)
+
+        result = process_cuaderno(self.test_dir, TEMPLATE_PATH, incremental=True, use_cache=False)
+        self.assertEqual(result['Estado'], 'Procesado', result['Error'])
+        files = sorted(name for name in os.listdir(self.test_dir) if name.endswith('.txt'))
+        self.assertEqual(files, ["001Demanda.txt", "002Memorial.txt", "003Poder.txt", "004Anexos.txt", "005Auto.txt"])
+        rows = read_index_rows(result['Índice'])
+        self.assertEqual([f"{r['Orden Documento']:03d}{r['Nombre Documento']}.txt" for r in rows], files)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import sys
+from unittest import mock
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metadata_extractor
+from instrumentation import RunProfiler, NULL_PROFILER, create_profiler, run_log_path, RUN_LOG_ENV_VAR
+from index_generator import generate_index_from_scratch
+from batch_processor import process_cuaderno
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for i in range(6):
+            extension = '.pdf' if i % 2 else '.txt'
+            with open(os.path.join(self.test_dir, f"documento {i}{extension}"), "wb") as f:
+                f.write(b'%PDF-1.4\n' if extension == '.pdf' else b'texto ' * (i + 1))
+            os.utime(os.path.join(self.test_dir, f"documento {i}{extension}"), (1000 + i, 1000 + i))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_spans_counters_and_slowest_files(self):
+        profiler = RunProfiler(slowest=2)
+        with profiler.span('indice'):
+            with profiler.span('metadatos'):
+                profiler.record_file('/tmp/a.pdf', 100, '.PDF', {'tipo_mime': 0.1, 'contenido': 0.4})
+                profiler.record_file('/tmp/b.pdf', 50, '.pdf', {'tipo_mime': 0.1, 'contenido': 0.1})
+                profiler.record_file('/tmp/c.docx', 10, '.docx', {'tipo_mime': 0.1, 'contenido': 2.0})
+                profiler.record_file('/tmp/d.docx', 10, '.docx', {})
+        profiler.count('documentos_sin_cambios', 3)
+
+        log = profiler.to_dict()
+        self.assertEqual([(s['nombre'], s['nivel']) for s in log['etapas']], [('indice', 0), ('metadatos', 1)])
+        self.assertEqual(log['contadores'], {'documentos_sin_cambios': 3})
+        self.assertEqual((log['archivos']['total'], log['archivos']['desde_cache']), (4, 1))
+        self.assertEqual(log['archivos']['tamaño_bytes'], 160)
+        self.assertEqual(log['archivos']['por_tipo']['.pdf']['archivos'], 2)
+        self.assertEqual([f['archivo'] for f in log['mas_lentos']], ['c.docx', 'a.pdf'])
+
+    def test_index_records_every_file(self):
+        profiler = RunProfiler()
+        df = generate_index_from_scratch(self.test_dir, use_cache=False, profiler=profiler)
+        log = profiler.to_dict()
+        self.assertEqual(log['archivos']['total'], len(df))
+        self.assertEqual(set(log['archivos']['por_tipo']), {'.pdf', '.txt'})
+        self.assertEqual(set(log['archivos']['fases']), {'tipo_mime', 'contenido'})
+        self.assertEqual([s['nombre'] for s in log['etapas']], ['metadatos', 'ensamblado'])
+
+        # Con varios procesos cada archivo se mide en el proceso que lo analiza
+        profiler = RunProfiler()
+        with mock.patch.object(metadata_extractor, 'MIN_PARALLEL_FILES', 1):
+            parallel = generate_index_from_scratch(self.test_dir, use_cache=False, workers=2, profiler=profiler)
+        self.assertTrue(parallel.equals(df))
+        self.assertEqual(profiler.to_dict()['archivos']['total'], len(df))
+
+    def test_run_log_next_to_index(self):
+        result = process_cuaderno(self.test_dir, TEMPLATE_PATH, use_cache=False)
+        self.assertEqual(result['Estado'], 'Procesado', result['Error'])
+        with open(run_log_path(self.test_dir), encoding='utf-8') as f:
+            log = json.load(f)
+        self.assertEqual([s['nombre'] for s in log['etapas'] if s['nivel'] == 0], ['renombrado', 'indice'])
+        self.assertEqual(log['archivos']['total'], 6)
+
+        # El registro es un archivo oculto: no se renombra ni aparece en el índice
+        self.assertEqual(len(generate_index_from_scratch(self.test_dir, use_cache=False)), 6)
+
+    def test_disabled_profiler(self):
+        with mock.patch.dict(os.environ, {RUN_LOG_ENV_VAR: '0'}):
+            profiler = create_profiler()
+        self.assertIs(profiler, NULL_PROFILER)
+        with profiler.span('indice'):
+            profiler.record_file('/tmp/a.pdf', 100, '.pdf', {'contenido': 1.0})
+        self.assertIsNone(profiler.to_dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metadata_extractor
+from metadata_cache import MetadataCache, get_default_cache, CACHE_ENV_VAR
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = MetadataCache(os.path.join(self.test_dir, 'cache.sqlite3'), max_entries=3)
+        self.file_path = os.path.join(self.test_dir, "documento.txt")
+        with open(self.file_path, "w") as f:
+            f.write("contenido")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_get_returns_stored_record(self):
+        stat = os.stat(self.file_path)
+        self.cache.put(self.file_path, stat, {'extension': '.txt', 'pages': 1})
+        self.assertEqual(self.cache.get(self.file_path, stat), {'extension': '.txt', 'pages': 1})
+
+    def test_modified_file_invalidates_record(self):
+        stat = os.stat(self.file_path)
+        self.cache.put(self.file_path, stat, {'extension': '.txt'})
+        with open(self.file_path, "a") as f:
+            f.write(" modificado")
+        self.assertIsNone(self.cache.get(self.file_path, os.stat(self.file_path)),
+                          "Un archivo modificado no debe devolver el registro anterior")
+
+    def test_evict_respects_max_entries(self):
+        stat = os.stat(self.file_path)
+        for i in range(5):
+            self.cache.put(os.path.join(self.test_dir, f"archivo{i}.txt"), stat, {'orden': i})
+        self.cache.evict()
+        self.assertEqual(len(self.cache), 3)
+        self.assertIsNotNone(self.cache.get(os.path.join(self.test_dir, "archivo4.txt"), stat))
+        self.assertIsNone(self.cache.get(os.path.join(self.test_dir, "archivo0.txt"), stat))
+
+    def test_get_file_metadata_uses_cache(self):
+        previous = os.environ.get(CACHE_ENV_VAR)
+        os.environ[CACHE_ENV_VAR] = os.path.join(self.test_dir, 'default.sqlite3')
+        try:
+            first = metadata_extractor.get_file_metadata(self.file_path)
+            original = metadata_extractor.get_file_type
+            metadata_extractor.get_file_type = lambda path: self.fail("No se debió volver a detectar el tipo")
+            try:
+                second = metadata_extractor.get_file_metadata(self.file_path)
+            finally:
+                metadata_extractor.get_file_type = original
+            self.assertEqual(first, second)
+        finally:
+            if previous is None:
+                os.environ.pop(CACHE_ENV_VAR, None)
+            else:
+                os.environ[CACHE_ENV_VAR] = previous
+
+    def test_cache_can_be_disabled(self):
+        previous = os.environ.get(CACHE_ENV_VAR)
+        os.environ[CACHE_ENV_VAR] = 'off'
+        try:
+            self.assertIsNone(get_default_cache())
+        finally:
+            if previous is None:
+                os.environ.pop(CACHE_ENV_VAR, None)
+            else:
+                os.environ[CACHE_ENV_VAR] = previous
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import zipfile
+from datetime import datetime
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import Workbook
+from ooxml_reader import read_ooxml_properties, read_workbook_sheets, OoxmlError
+from metadata_extractor import get_word_metadata, get_presentation_metadata, get_excel_metadata
+
+RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="{core}"/>'
+        '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" Target="docProps/app.xml"/>'
+        '</Relationships>')
+
+CORE = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        '<dc:title>Demanda ejecutiva</dc:title><dc:creator>Juzgado 1 Civil</dc:creator>'
+        '<dcterms:created xsi:type="dcterms:W3CDTF">2024-03-15T10:30:00Z</dcterms:created>'
+        '<dcterms:modified xsi:type="dcterms:W3CDTF">2024-03-16T08:00:00Z</dcterms:modified>'
+        '</cp:coreProperties>')
+
+APP = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+       '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+       '<Application>Microsoft Office Word</Application>{counts}</Properties>')
+
+def build_package(path, counts='<Pages>12</Pages>', core_path='docProps/core.xml'):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('_rels/.rels', RELS.format(core=core_path))
+        package.writestr(core_path, CORE)
+        package.writestr('docProps/app.xml', APP.format(counts=counts))
+        package.writestr('word/document.xml', '<w:document/>')
+        # Imagen escaneada incrustada que el lector no debe tocar
+        package.writestr('word/media/image1.png', os.urandom(256 * 1024), zipfile.ZIP_STORED)
+
+class TestOoxmlReader(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "demanda.docx")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_read_properties(self):
+        build_package(self.path)
+        properties = read_ooxml_properties(self.path)
+        self.assertEqual(properties['pages'], 12)
+        self.assertIsNone(properties['slides'])
+        self.assertEqual(properties['author'], 'Juzgado 1 Civil')
+        self.assertEqual(properties['title'], 'Demanda ejecutiva')
+        self.assertEqual(properties['created'], datetime(2024, 3, 15, 10, 30))
+
+    def test_core_properties_outside_docprops(self):
+        build_package(self.path, core_path='props/core.xml')
+        self.assertEqual(read_ooxml_properties(self.path)['author'], 'Juzgado 1 Civil')
+
+    def test_word_and_presentation_metadata(self):
+        build_package(self.path)
+        metadata = get_word_metadata(self.path)
+        self.assertEqual(metadata['pages'], 12)
+        self.assertEqual(metadata['modified'], '2024-03-16 08:00:00')
+
+        presentation = os.path.join(self.test_dir, "audiencia.pptx")
+        build_package(presentation, counts='<Slides>7</Slides>')
+        self.assertEqual(get_presentation_metadata(presentation)['pages'], 7)
+
+    def test_missing_page_count_and_invalid_file(self):
+        build_package(self.path, counts='')
+        self.assertEqual(get_word_metadata(self.path)['pages'], 1)
+
+        with open(self.path, 'wb') as f:
+            f.write(b'no es un paquete')
+        with self.assertRaises(OoxmlError):
+            read_ooxml_properties(self.path)
+        self.assertIn('error', get_word_metadata(self.path))
+
+    def test_workbook_sheets(self):
+        path = os.path.join(self.test_dir, "liquidacion.xlsx")
+        workbook = Workbook()
+        workbook.active.title = 'Liquidación'
+        workbook.create_sheet('Resumen')
+        workbook.save(path)
+        self.assertEqual(read_workbook_sheets(path), ['Liquidación', 'Resumen'])
+        self.assertEqual(get_excel_metadata(path), {'sheets': 2, 'sheet_names': 'Liquidación, Resumen'})
+
+        template = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
+        self.assertIn('Indice Electrónico', read_workbook_sheets(template))
+
+        # Un documento de Word no es un libro de Excel
+        build_package(self.path)
+        with self.assertRaises(OoxmlError):
+            read_workbook_sheets(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
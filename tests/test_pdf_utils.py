@@ -0,0 +1,117 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import zlib
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyPDF2 import PdfWriter
+from pdf_utils import count_pdf_pages, count_pages_in_buffer
+
+def build_classic_pdf(page_count):
+    """
+    Construye un PDF con tabla de referencias cruzadas clásica y un árbol de páginas de dos niveles.
+    """
+    kids = ' '.join(f'{4 + i} 0 R' for i in range(page_count))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R /PageLayout /OneColumn >>',
+        f'<< /Type /Pages /Kids [3 0 R] /Count {page_count} >>'.encode(),
+        f'<< /Type /Pages /Parent 2 0 R /Kids [{kids}] /Count {page_count} >>'.encode(),
+    ] + [b'<< /Type /Page /Parent 3 0 R /MediaBox [0 0 612 792] >>'] * page_count
+
+    body = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, content in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f'{number} 0 obj\n'.encode() + content + b'\nendobj\n'
+    xref = len(body)
+    body += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        body += f'{offset:010d} 00000 n \n'.encode()
+    body += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(body)
+
+def build_object_stream_pdf(page_count):
+    """
+    Construye un PDF 1.5 con el catálogo y la raíz de páginas dentro de un stream de objetos
+    y una tabla de referencias cruzadas en forma de stream con predictor PNG.
+    """
+    catalog = b'<</Type/Catalog/Pages 2 0 R>>'
+    pages = f'<</Type/Pages/Kids[]/Count {page_count}>>'.encode()
+    header = f'1 0 2 {len(catalog) + 1} '.encode()
+    stream = zlib.compress(header + catalog + b' ' + pages)
+
+    body = bytearray(b'%PDF-1.5\n')
+    objstm_offset = len(body)
+    body += (f'3 0 obj\n<</Type/ObjStm/N 2/First {len(header)}/Filter/FlateDecode/Length {len(stream)}>>\nstream\n'
+             .encode() + stream + b'\nendstream\nendobj\n')
+    xref_offset = len(body)
+
+    rows = [(0, 0, 0), (2, 3, 0), (2, 3, 1), (1, objstm_offset, 0), (1, xref_offset, 0)]
+    raw = bytearray()
+    previous = bytes(4)
+    for row in rows:
+        current = bytes([row[0]]) + row[1].to_bytes(2, 'big') + bytes([row[2]])
+        raw += b'\x02' + bytes((c - p) & 0xFF for c, p in zip(current, previous))
+        previous = current
+    xref_stream = zlib.compress(bytes(raw))
+    body += (f'4 0 obj\n<</Type/XRef/Size 5/W[1 2 1]/Root 1 0 R/Filter/FlateDecode'
+             f'/DecodeParms<</Columns 4/Predictor 12>>/Length {len(xref_stream)}>>\nstream\n'
+             .encode() + xref_stream + b'\nendstream\nendobj\n')
+    body += f'startxref\n{xref_offset}\n%%EOF\n'.encode()
+    return bytes(body)
+
+class TestPdfUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_count_pages_pypdf2_output(self):
+        file_path = os.path.join(self.test_dir, "generado.pdf")
+        writer = PdfWriter()
+        for _ in range(7):
+            writer.add_blank_page(width=612, height=792)
+        with open(file_path, "wb") as f:
+            writer.write(f)
+        self.assertEqual(count_pdf_pages(file_path), 7)
+
+    def test_count_pages_classic_xref(self):
+        self.assertEqual(count_pages_in_buffer(build_classic_pdf(12)), 12)
+
+    def test_count_pages_incremental_update(self):
+        original = build_classic_pdf(2)
+        previous_xref = int(original.rsplit(b'startxref\n', 1)[1].split()[0])
+        updated = bytearray(original)
+        offset = len(updated)
+        updated += b'2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 9 >>\nendobj\n'
+        xref = len(updated)
+        updated += (f'xref\n2 1\n{offset:010d} 00000 n \n'
+                    f'trailer\n<< /Size 6 /Root 1 0 R /Prev {previous_xref} >>\n'
+                    f'startxref\n{xref}\n%%EOF\n').encode()
+        self.assertEqual(count_pages_in_buffer(bytes(updated)), 9,
+                         "Debe prevalecer el objeto de la actualización incremental")
+
+    def test_count_pages_object_stream(self):
+        self.assertEqual(count_pages_in_buffer(build_object_stream_pdf(31)), 31)
+
+    def test_count_pages_linearized(self):
+        data = bytearray(b'%PDF-1.6\n1 0 obj\n<< /Linearized 1 /L 0000 /N 42 /T 100 >>\nendobj\n')
+        data += b' ' * 64
+        data[data.index(b'0000'):data.index(b'0000') + 4] = str(len(data)).encode().rjust(4, b'0')
+        self.assertEqual(count_pages_in_buffer(bytes(data)), 42)
+
+    def test_invalid_pdf_returns_none(self):
+        file_path = os.path.join(self.test_dir, "roto.pdf")
+        with open(file_path, "wb") as f:
+            f.write(b"%PDF-1.5\n%EOF\n")
+        self.assertIsNone(count_pdf_pages(file_path))
+        self.assertIsNone(count_pdf_pages(os.path.join(self.test_dir, "no_existe.pdf")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from progress import CancellationToken, OperationCancelled, ProgressTracker, format_eta
+from file_utils import rename_files, JOURNAL_NAME
+from index_generator import generate_index_from_scratch
+
+class TestProgress(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.names = [f"documento {i}.txt" for i in range(5)]
+        for i, name in enumerate(self.names):
+            path = os.path.join(self.test_dir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            os.utime(path, (1000 + i, 1000 + i))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_tracker_reports_eta(self):
+        updates = []
+        tracker = ProgressTracker('metadatos', 4, lambda *args: updates.append(args))
+        tracker.advance()
+        tracker.advance(3)
+        self.assertEqual([(stage, done, total) for stage, done, total, _ in updates],
+                         [('metadatos', 0, 4), ('metadatos', 1, 4), ('metadatos', 4, 4)])
+        self.assertIsNone(updates[0][3])
+        self.assertGreaterEqual(updates[1][3], 0)
+        self.assertEqual(updates[2][3], 0)
+        self.assertEqual(format_eta(125), '2 min 05 s')
+
+    def test_progress_per_file(self):
+        updates = []
+        renamed = rename_files(self.test_dir, progress=lambda *args: updates.append(args))
+        self.assertEqual(len(renamed), 5)
+        # Cada archivo se mueve dos veces: a un nombre temporal y a su nombre final
+        self.assertEqual(updates[-1][:3], ('renombrado', 10, 10))
+
+        updates.clear()
+        df = generate_index_from_scratch(self.test_dir, use_cache=False, progress=lambda *args: updates.append(args))
+        self.assertEqual(len(df), 5)
+        self.assertEqual([done for _, done, _, _ in updates], list(range(6)))
+
+    def test_cancel_rename_keeps_original_names(self):
+        cancel = CancellationToken()
+
+        def progress(stage, done, total, eta):
+            if done == 3:
+                cancel.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            rename_files(self.test_dir, progress=progress, cancel=cancel)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), sorted(self.names))
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, JOURNAL_NAME)))
+
+    def test_cancel_index_at_file_boundary(self):
+        cancel = CancellationToken()
+        seen = []
+
+        def progress(stage, done, total, eta):
+            seen.append(done)
+            if done == 2:
+                cancel.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            generate_index_from_scratch(self.test_dir, use_cache=False, progress=progress, cancel=cancel)
+        self.assertEqual(seen, [0, 1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import time
+import sys
+from unittest import mock
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from file_utils import rename_files, plan_renames, apply_renames, recover_renames, JOURNAL_NAME, DirectorySnapshot
+from index_generator import generate_index_from_scratch
+
+class TestRenameJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def read(self, name):
+        with open(os.path.join(self.test_dir, name)) as f:
+            return f.read()
+
+    def test_new_name_equal_to_old_name_of_other_file(self):
+        base = time.time() - 100
+        self.write("Demanda.txt", "demanda nueva", base)
+        self.write("001Demanda.txt", "demanda anterior", base + 10)
+        renames = rename_files(self.test_dir)
+        self.assertEqual(renames, {"Demanda.txt": "001Demanda.txt", "001Demanda.txt": "002Demanda.txt"})
+        self.assertEqual(self.read("001Demanda.txt"), "demanda nueva")
+        self.assertEqual(self.read("002Demanda.txt"), "demanda anterior")
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, JOURNAL_NAME)))
+
+    def test_failure_rolls_back(self):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            self.write(name, name)
+        real_rename = os.rename
+        calls = []
+        def failing_rename(src, dst):
+            calls.append(src)
+            if len(calls) == 5:
+                raise OSError("recurso compartido no disponible")
+            real_rename(src, dst)
+
+        with mock.patch('os.rename', side_effect=failing_rename):
+            with self.assertRaises(OSError):
+                apply_renames(self.test_dir, {"a.txt": "001A.txt", "b.txt": "002B.txt", "c.txt": "003C.txt"})
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["a.txt", "b.txt", "c.txt"])
+
+    def journal_state(self):
+        # Estado de un proceso interrumpido en la segunda fase: un archivo ya tiene su nombre final
+        entries = [["a.txt", ".renombrando_x_0", "001A.txt"], ["b.txt", ".renombrando_x_1", "002B.txt"]]
+        self.write("001A.txt", "a")
+        self.write(".renombrando_x_1", "b")
+        with open(os.path.join(self.test_dir, JOURNAL_NAME), "w") as f:
+            json.dump({'fase': 2, 'archivos': entries}, f)
+
+    def test_recover_completes_interrupted_rename(self):
+        self.journal_state()
+        self.assertEqual(recover_renames(self.test_dir), {"a.txt": "001A.txt", "b.txt": "002B.txt"})
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["001A.txt", "002B.txt"])
+        self.assertIsNone(recover_renames(self.test_dir))
+
+    def test_recover_rollback(self):
+        self.journal_state()
+        recover_renames(self.test_dir, rollback=True)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["a.txt", "b.txt"])
+        self.assertEqual(self.read("b.txt"), "b")
+
+    def test_case_only_rename_on_case_insensitive_filesystem(self):
+        self.write("001demanda.pdf", "demanda")
+        self.write("002poder.pdf", "poder")
+        self.write("000IndiceElectronicoC01.xlsm", "indice")
+
+        def lexists(path):
+            # Sistema de archivos que no distingue mayúsculas, como en Windows
+            folder, name = os.path.split(path)
+            return name.lower() in (entry.lower() for entry in os.listdir(folder))
+
+        with mock.patch('os.path.lexists', side_effect=lexists), \
+                mock.patch('os.path.normcase', side_effect=str.lower):
+            apply_renames(self.test_dir, {"001demanda.pdf": "001Demanda.pdf", "002poder.pdf": "002Poder.pdf"})
+            self.assertEqual(sorted(os.listdir(self.test_dir)),
+                             ["000IndiceElectronicoC01.xlsm", "001Demanda.pdf", "002Poder.pdf"])
+
+            # Un archivo que no forma parte del renombrado sigue bloqueando el nombre final
+            with self.assertRaises(FileExistsError):
+                apply_renames(self.test_dir, {"002Poder.pdf": "000indiceelectronicoc01.xlsm"})
+        self.assertEqual(self.read("002Poder.pdf"), "poder")
+
+class TestRenamePlan(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        base = time.time() - 100
+        for i, name in enumerate(("auto admisorio.pdf", "InformeSecretarial.docx", "memorial-2024.pdf")):
+            path = os.path.join(self.test_dir, name)
+            open(path, "w").close()
+            os.utime(path, (base + i, base + i))
+        # Dos archivos con la misma fecha de modificación
+        for name in ("zeta.txt", "alfa.txt"):
+            path = os.path.join(self.test_dir, name)
+            open(path, "w").close()
+            os.utime(path, (base + 10, base + 10))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_dry_run_returns_plan_without_renaming(self):
+        before = sorted(os.listdir(self.test_dir))
+        plan = rename_files(self.test_dir, dry_run=True)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), before)
+        self.assertEqual(plan, {
+            "auto admisorio.pdf": "001AutoAdmisorio.pdf",
+            "InformeSecretarial.docx": "002Informesecretarial.docx",
+            "memorial-2024.pdf": "003Memorial2024.pdf",
+            "alfa.txt": "004Alfa.txt",
+            "zeta.txt": "005Zeta.txt"
+        })
+
+    def test_second_run_renames_nothing(self):
+        rename_files(self.test_dir)
+        self.assertEqual(plan_renames(self.test_dir), {})
+        with mock.patch('os.rename') as rename:
+            self.assertEqual(rename_files(self.test_dir), {})
+        rename.assert_not_called()
+
+    def test_digit_led_name_is_stable(self):
+        for name, mtime in (("_5Informe.pdf", 1), ("ACTA.txt", 2)):
+            path = os.path.join(self.test_dir, name)
+            open(path, "w").close()
+            os.utime(path, (mtime, mtime))
+        first = rename_files(self.test_dir)
+        self.assertEqual(first["_5Informe.pdf"], "0015Informe.pdf")
+        self.assertEqual(first["ACTA.txt"], "002Acta.txt")
+        self.assertEqual(rename_files(self.test_dir), {})
+
+        df = generate_index_from_scratch(self.test_dir, use_cache=False)
+        self.assertEqual(df['Nombre Documento'].tolist()[:2], ["5Informe", "Acta"])
+
+    def test_snapshot_follows_renames(self):
+        snapshot = DirectorySnapshot(self.test_dir)
+        with mock.patch('os.scandir') as scandir:
+            renames = rename_files(self.test_dir, snapshot=snapshot)
+        scandir.assert_not_called()
+        self.assertEqual(sorted(snapshot.stats), sorted(renames.values()))
+        self.assertEqual(snapshot.documents(), DirectorySnapshot(self.test_dir).documents())
+
+if __name__ == '__main__':
+    unittest.main()
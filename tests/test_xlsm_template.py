@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import zipfile
+from datetime import datetime
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import load_workbook
+from xlsm_template import fill_template_package, FIRST_DATA_ROW
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', '000IndiceElectronicoC0.xlsm')
+
+def build_rows(count):
+    return [{
+        'Nombre Documento': f'Memorial & anexo {i}',
+        'Fecha Creación Documento': '2024-03-15 10:30:00',
+        'Fecha Incorporación Expediente': '2026-10-18',
+        'Orden Documento': i + 1,
+        'Número Páginas': 2,
+        'Página Inicio': 2 * i + 1,
+        'Página Fin': 2 * i + 2,
+        'Formato': 'pdf',
+        'Tamaño': '1.2 KB',
+        'Origen': 'Digitalizado',
+        'Observaciones': ''
+    } for i in range(count)]
+
+class TestXlsmTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.test_dir, "000IndiceElectronicoC01.xlsm")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_fill_rows_and_metadata(self):
+        metadata = {'Ciudad': 'Bello', 'Serie o Subserie documental': 'Procesos', 'No. Carpetas': 2}
+        count = fill_template_package(TEMPLATE_PATH, self.output_path, iter(build_rows(3)), metadata)
+        self.assertEqual(count, 3)
+
+        ws = load_workbook(self.output_path, keep_vba=True).active
+        self.assertEqual((ws['B2'].value, ws['B4'].value, ws['J5'].value), ('Bello', 'Procesos', 2))
+        self.assertEqual(ws['A12'].value, 'Memorial & anexo 0')
+        self.assertEqual(ws['B12'].value, datetime(2024, 3, 15, 10, 30))
+        self.assertEqual(ws['G14'].value, 6)
+        # Las filas de ejemplo de la plantilla se reemplazan por filas vacías con las fórmulas de páginas
+        self.assertIsNone(ws['A15'].value)
+        self.assertEqual(ws['F15'].value, '=+IF(E15=0,"0",(1+G14))')
+
+    def test_package_keeps_macros_and_drops_calc_chain(self):
+        fill_template_package(TEMPLATE_PATH, self.output_path, build_rows(1))
+        with zipfile.ZipFile(TEMPLATE_PATH) as template, zipfile.ZipFile(self.output_path) as output:
+            self.assertEqual(output.read('xl/vbaProject.bin'), template.read('xl/vbaProject.bin'))
+            self.assertEqual(output.read('xl/styles.xml'), template.read('xl/styles.xml'))
+            self.assertNotIn('xl/calcChain.xml', output.namelist())
+            self.assertNotIn(b'calcChain', output.read('[Content_Types].xml'))
+
+    def test_footer_moves_when_rows_exceed_template(self):
+        count = 150
+        fill_template_package(TEMPLATE_PATH, self.output_path, build_rows(count))
+        wb = load_workbook(self.output_path, keep_vba=True)
+        ws = wb.active
+        footer = FIRST_DATA_ROW + count
+        self.assertEqual(ws.cell(row=footer - 1, column=1).value, f'Memorial & anexo {count - 1}')
+        self.assertTrue(str(ws.cell(row=footer, column=1).value).startswith('FECHA DE CIERRE'))
+        self.assertIn(f'C{footer}:K{footer}', [str(r) for r in ws.merged_cells.ranges])
+        self.assertEqual(wb.defined_names['CierreExp'].attr_text, f"'Indice Electrónico'!$A${footer}")
+
+if __name__ == '__main__':
+    unittest.main()
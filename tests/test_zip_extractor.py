@@ -0,0 +1,87 @@
+import unittest
+import os
+import io
+import shutil
+import stat
+import tempfile
+import zipfile
+import sys
+from datetime import datetime
+from unittest import mock
+
+# Añadir el directorio raíz del proyecto al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import zip_extractor
+from zip_extractor import extract_zip, UnsafeArchiveError
+from batch_processor import discover_cuadernos
+from index_generator import generate_index_from_scratch
+
+CUADERNO = '05088400300120240001200/01PrimeraInstancia/C01Principal'
+
+class TestZipExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.target = os.path.join(self.test_dir, 'expediente')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def build_zip(self, entries):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, data, date_time in entries:
+                archive.writestr(zipfile.ZipInfo(name, date_time), data)
+        buffer.seek(0)
+        return buffer
+
+    def test_keeps_layout_and_modification_dates(self):
+        archive = self.build_zip([
+            (f'{CUADERNO}/poder.txt', b'poder', (2024, 3, 2, 9, 0, 0)),
+            (f'{CUADERNO}/demanda.txt', b'demanda' * 1000, (2024, 3, 1, 9, 0, 0)),
+            ('__MACOSX/._demanda.txt', b'', (2024, 3, 1, 9, 0, 0)),
+        ])
+        extracted = extract_zip(archive, self.target)
+        self.assertEqual(sorted(extracted), sorted(os.path.join(*CUADERNO.split('/'), name)
+                                                   for name in ('demanda.txt', 'poder.txt')))
+        cuadernos = discover_cuadernos(self.target)
+        self.assertEqual([c['Cuaderno'] for c in cuadernos], ['C01Principal'])
+
+        demanda = os.path.join(cuadernos[0]['Ruta'], 'demanda.txt')
+        self.assertEqual(datetime.fromtimestamp(os.path.getmtime(demanda)), datetime(2024, 3, 1, 9, 0, 0))
+        # El orden del índice sale de las fechas registradas en el ZIP, no del orden de extracción
+        df = generate_index_from_scratch(cuadernos[0]['Ruta'], use_cache=False)
+        self.assertEqual(df['Nombre Documento'].tolist(), ['demanda', 'poder'])
+
+    def test_streams_members_in_chunks(self):
+        archive = self.build_zip([('C01Principal/escaneo.pdf', os.urandom(300000), (2024, 1, 1, 0, 0, 0))])
+        with mock.patch.object(zip_extractor, 'CHUNK_SIZE', 65536), \
+                mock.patch('shutil.copyfileobj', wraps=shutil.copyfileobj) as copy:
+            extract_zip(archive, self.target)
+        self.assertEqual(copy.call_args[0][2], 65536)
+        self.assertEqual(os.path.getsize(os.path.join(self.target, 'C01Principal', 'escaneo.pdf')), 300000)
+
+    def test_rejects_unsafe_entries(self):
+        for name in ('../fuera.txt', 'C01/../../fuera.txt', '/etc/fuera.txt', 'C:/fuera.txt', '..\\fuera.txt'):
+            with self.subTest(name=name):
+                with self.assertRaises(UnsafeArchiveError):
+                    extract_zip(self.build_zip([(name, b'x', (2024, 1, 1, 0, 0, 0))]), self.target)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, 'fuera.txt')))
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            link = zipfile.ZipInfo('C01Principal/enlace')
+            link.external_attr = (stat.S_IFLNK | 0o777) << 16
+            archive.writestr(link, '/etc/passwd')
+        with self.assertRaises(UnsafeArchiveError):
+            extract_zip(buffer, self.target)
+
+    def test_rejects_oversized_content(self):
+        archive = self.build_zip([('C01Principal/grande.pdf', bytes(10000), (2024, 1, 1, 0, 0, 0))])
+        with self.assertRaises(UnsafeArchiveError):
+            extract_zip(archive, self.target, max_total_size=5000)
+        self.assertEqual(os.listdir(self.target), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+import os
+import re
+import numbers
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, date
+from functools import lru_cache
+from excel_handler import INDEX_HEADERS
+
+# Partes del paquete .xlsm que se modifican; el resto (vbaProject.bin, estilos, dibujos) se copia intacto
+SHEET_PATH = 'xl/worksheets/sheet1.xml'
+WORKBOOK_PATH = 'xl/workbook.xml'
+WORKBOOK_RELS_PATH = 'xl/_rels/workbook.xml.rels'
+CONTENT_TYPES_PATH = '[Content_Types].xml'
+CALC_CHAIN_PATH = 'xl/calcChain.xml'
+
+# Estructura de la plantilla 000IndiceElectronicoC0.xlsm
+FIRST_DATA_ROW = 12
+PROTOTYPE_ROW = 19   # Fila vacía con los estilos y las fórmulas de Página Inicio / Página Fin
+FOOTER_ROW = 111     # Fecha de cierre del expediente
+DATE_COLUMNS = ('B', 'C')
+
+# Celdas de los metadatos del expediente en la plantilla
+METADATA_CELLS = {
+    'ciudad': 'B2',
+    'despacho judicial': 'B3',
+    'serie o subserie documental': 'B4',
+    'no. radicación del proceso': 'B5',
+    'partes procesales (parte a)': 'B6',
+    'partes procesales (parte b)': 'B7',
+    'terceros intervinientes': 'B8',
+    'cuaderno': 'B9',
+    'expediente físico': 'J3',
+    'no. carpetas': 'J5',
+    'no. carpetas digitalizadas': 'J6'
+}
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+ROW_RE = re.compile(r'<row r="(\d+)"([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+CELL_RE = re.compile(r'<c r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+REF_RE = re.compile(r'(\$?[A-Z]{1,3}\$?)(\d+)')
+INVALID_XML_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def escape(text):
+    # Equivalente a xml.sax.saxutils.escape, cuya importación carga urllib y demora el inicio
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def unescape(text):
+    return text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+
+def fill_template_package(template_path, output_path, rows, metadata=None):
+    """
+    Llena la plantilla del índice editando directamente el paquete .xlsm, sin Excel.
+
+    Reemplaza las filas de ejemplo por los documentos del índice a partir de la fila 12, escribe
+    los metadatos del expediente (B2 a B9, J3, J5 y J6) y conserva las macros, los estilos y los
+    nombres definidos. Si los documentos no caben en las filas de la plantilla, el pie de página
+    se desplaza hacia abajo junto con las celdas combinadas y los nombres que lo referencian.
+
+    :param template_path: Ruta de la plantilla 000IndiceElectronicoC0.xlsm
+    :param output_path: Ruta del archivo .xlsm a generar
+    :param rows: Iterable de filas (diccionarios con las columnas de INDEX_HEADERS o secuencias
+                 en ese orden) o un DataFrame
+    :param metadata: Diccionario con los metadatos del expediente
+    :return: Número de documentos escritos
+    """
+    if hasattr(rows, 'itertuples'):
+        rows = rows.itertuples(index=False, name=None)
+
+    with zipfile.ZipFile(template_path) as zin:
+        sheet = _TemplateSheet(zin.read(SHEET_PATH).decode('utf-8'))
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as data:
+            count = sheet.write_data_rows(data, rows)
+            delta = max(0, count - (FOOTER_ROW - FIRST_DATA_ROW))
+
+            temp_path = output_path + '.tmp'
+            try:
+                with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+                    for info in zin.infolist():
+                        if info.filename == CALC_CHAIN_PATH:
+                            # La cadena de cálculo de la plantilla ya no corresponde; Excel la reconstruye
+                            continue
+                        if info.filename == SHEET_PATH:
+                            with zout.open(info.filename, 'w') as f:
+                                sheet.write(f, data, count, delta, metadata)
+                        elif info.filename == WORKBOOK_PATH:
+                            zout.writestr(info, _patch_workbook(zin.read(info.filename).decode('utf-8'), delta))
+                        elif info.filename in (WORKBOOK_RELS_PATH, CONTENT_TYPES_PATH):
+                            zout.writestr(info, _remove_calc_chain(zin.read(info.filename).decode('utf-8')))
+                        else:
+                            zout.writestr(info, zin.read(info.filename))
+                os.replace(temp_path, output_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+    return count
+
+def _translate(formula, origin, ref):
+    # Traslada las referencias relativas de la fórmula escrita en `origin` a la celda `ref`
+    from openpyxl.formula.translate import Translator
+    return Translator('=' + formula, origin=origin).translate_formula(ref)[1:]
+
+class _TemplateSheet:
+    """
+    Hoja del índice dividida en encabezado, filas y cierre, a partir del XML de la plantilla.
+    """
+
+    def __init__(self, xml):
+        start = xml.index('<sheetData>') + len('<sheetData>')
+        end = xml.index('</sheetData>')
+        self.head = xml[:start]
+        self.tail = xml[end:]
+        self.rows = {int(m.group(1)): m.group(0) for m in ROW_RE.finditer(xml, start, end)}
+        self.shared = _shared_formulas(xml[start:end])
+
+        prototype = ROW_RE.search(self.rows[PROTOTYPE_ROW])
+        self.row_attrs = prototype.group(2)
+        self.columns = []
+        for m in CELL_RE.finditer(prototype.group(3) or ''):
+            column, attrs, inner = m.group(1), m.group(3), m.group(4) or ''
+            style = re.search(r' s="(\d+)"', attrs)
+            self.columns.append((column, style.group(1) if style else None, attrs,
+                                 self._formula(column + str(PROTOTYPE_ROW), inner)))
+
+        # Índices de fórmulas compartidas que siguen en uso fuera de la zona de datos
+        used = [int(si) for r, row in self.rows.items() if not FIRST_DATA_ROW <= r < FOOTER_ROW
+                for si in re.findall(r'<f [^>]*si="(\d+)"', row)]
+        self.next_si = max(used, default=-1) + 1
+
+    def _formula(self, ref, inner):
+        # Texto de la fórmula de una celda, resolviendo las fórmulas compartidas
+        m = re.search(r'<f([^>]*?)(?:/>|>(.*?)</f>)', inner, re.S)
+        if not m:
+            return None
+        if m.group(2):
+            return unescape(m.group(2))
+        si = re.search(r'si="(\d+)"', m.group(1))
+        if si and si.group(1) in self.shared:
+            text, origin = self.shared[si.group(1)]
+            return _translate(text, origin, ref)
+        return None
+
+    def write_data_rows(self, stream, rows):
+        """
+        Escribe en `stream` las filas de datos en XML y devuelve cuántas se escribieron.
+        """
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            if isinstance(row, dict):
+                row = [row.get(header) for header in INDEX_HEADERS]
+            r = FIRST_DATA_ROW + count - 1
+            cells = ''.join(_cell_xml(f'{column}{r}', style, value, column in DATE_COLUMNS)
+                            for (column, style, _, _), value in zip(self.columns, row))
+            stream.write(f'<row r="{r}"{self.row_attrs}>{cells}</row>'.encode('utf-8'))
+        return count
+
+    def _blank_rows(self, first, last):
+        # Filas vacías con las fórmulas de la plantilla, como fórmulas compartidas desde la primera
+        formulas = {}
+        for column, _, _, formula in self.columns:
+            if formula:
+                text = _translate(formula, f'{column}{PROTOTYPE_ROW}', f'{column}{first}')
+                formulas[column] = (self.next_si + len(formulas), escape(text))
+        for r in range(first, last + 1):
+            cells = []
+            for column, _, attrs, _ in self.columns:
+                if column in formulas:
+                    si, text = formulas[column]
+                    if r == first:
+                        f = f'<f t="shared" ref="{column}{first}:{column}{last}" si="{si}">{text}</f>'
+                    else:
+                        f = f'<f t="shared" si="{si}"/>'
+                    cells.append(f'<c r="{column}{r}"{attrs}>{f}</c>')
+                else:
+                    cells.append(f'<c r="{column}{r}"{attrs}/>')
+            yield f'<row r="{r}"{self.row_attrs}>{"".join(cells)}</row>'
+
+    def write(self, f, data, count, delta, metadata):
+        """
+        Escribe la hoja completa: encabezado con metadatos, filas de datos, filas vacías y pie de página.
+        """
+        cells = {}
+        for key, value in (metadata or {}).items():
+            ref = METADATA_CELLS.get(str(key).lower())
+            if ref and value is not None:
+                cells[ref] = value
+
+        f.write(_shift_refs(self.head, delta, FOOTER_ROW).encode('utf-8'))
+        for r in sorted(self.rows):
+            if r < FIRST_DATA_ROW:
+                f.write(_set_cells(self.rows[r], r, cells).encode('utf-8'))
+        data.seek(0)
+        shutil.copyfileobj(data, f)
+        for row in self._blank_rows(FIRST_DATA_ROW + count, FOOTER_ROW - 1):
+            f.write(row.encode('utf-8'))
+        for r in sorted(self.rows):
+            if r >= FOOTER_ROW:
+                f.write(_shift_refs(self.rows[r], delta, FOOTER_ROW).encode('utf-8'))
+        tail = self.tail
+        merges = re.search(r'<mergeCells.*?</mergeCells>', tail, re.S)
+        if merges:
+            tail = tail[:merges.start()] + _shift_refs(merges.group(0), delta, FOOTER_ROW) + tail[merges.end():]
+        f.write(tail.encode('utf-8'))
+
+def _shared_formulas(xml):
+    # Fórmulas maestras de cada índice compartido: {si: (texto, celda de origen)}
+    shared = {}
+    for m in CELL_RE.finditer(xml):
+        f = re.search(r'<f t="shared" ref="[^"]+" si="(\d+)">(.*?)</f>', m.group(4) or '', re.S)
+        if f:
+            shared[f.group(1)] = (unescape(f.group(2)), m.group(1) + m.group(2))
+    return shared
+
+def _set_cells(row_xml, r, values):
+    # Reemplaza el valor de las celdas indicadas conservando su estilo
+    def replace(m):
+        ref = m.group(1) + m.group(2)
+        if ref not in values:
+            return m.group(0)
+        style = re.search(r' s="(\d+)"', m.group(3))
+        return _cell_xml(ref, style.group(1) if style else None, values[ref])
+    return CELL_RE.sub(replace, row_xml)
+
+def _shift_refs(xml, delta, from_row):
+    # Desplaza `delta` filas las referencias a filas iguales o posteriores a `from_row`
+    if not delta:
+        return xml
+    def shift(m):
+        row = int(m.group(2))
+        return m.group(1) + str(row + delta if row >= from_row else row)
+    xml = re.sub(r'(<row r=")(\d+)', shift, xml)
+    return re.sub(r'(?<![\w:])((?:r|ref|sqref)="[^"]*")',
+                  lambda m: REF_RE.sub(shift, m.group(1)), xml)
+
+def _patch_workbook(xml, delta):
+    # Ajusta los nombres definidos al desplazamiento del pie y pide a Excel recalcular al abrir
+    if delta:
+        xml = re.sub(r'(<definedName [^>]*>)(.*?)(</definedName>)',
+                     lambda m: m.group(1) + REF_RE.sub(
+                         lambda r: r.group(1) + str(int(r.group(2)) + delta if int(r.group(2)) >= FOOTER_ROW
+                                                    else int(r.group(2))), m.group(2)) + m.group(3),
+                     xml)
+    if 'fullCalcOnLoad' not in xml:
+        xml = xml.replace('<calcPr ', '<calcPr fullCalcOnLoad="1" ', 1)
+    return xml
+
+def _remove_calc_chain(xml):
+    return re.sub(r'<(?:Relationship|Override)[^>]*calcChain[^>]*/>', '', xml)
+
+def _cell_xml(ref, style, value, is_date=False):
+    s = f' s="{style}"' if style else ''
+    if value is None or (isinstance(value, float) and value != value):
+        return f'<c r="{ref}"{s}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (datetime, date)):
+        value = _excel_serial(value)
+    elif isinstance(value, str) and is_date:
+        value = _parse_date(value) or value
+    if isinstance(value, numbers.Integral):
+        return f'<c r="{ref}"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Real):
+        return f'<c r="{ref}"{s}><v>{float(value)!r}</v></c>'
+    text = INVALID_XML_RE.sub('', str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+def _excel_serial(value):
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    serial = (value.replace(tzinfo=None) - EXCEL_EPOCH).total_seconds() / 86400
+    return int(serial) if serial == int(serial) else serial
+
+@lru_cache(maxsize=4096)
+def _parse_date(text):
+    # Fecha en formato de número de serie de Excel, o None si el texto no es una fecha conocida
+    for fmt in DATE_FORMATS:
+        try:
+            return _excel_serial(datetime.strptime(text.strip(), fmt))
+        except ValueError:
+            pass
+    return None
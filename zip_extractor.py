@@ -0,0 +1,108 @@
+import os
+import stat
+import time
+import shutil
+import zipfile
+from progress import ProgressTracker
+
+# Tamaño de cada bloque que se copia del ZIP al disco: la memoria usada no depende del tamaño de los archivos
+CHUNK_SIZE = 1024 * 1024
+
+# Límites de un expediente comprimido, como protección ante archivos ZIP maliciosos o dañados
+MAX_MEMBERS = 200000
+MAX_TOTAL_SIZE = 20 * 1024 ** 3
+
+# Espacio libre que se conserva en el disco después de extraer el expediente
+MIN_FREE_SPACE = 256 * 1024 * 1024
+
+# Entradas que agregan los compresores y no forman parte del expediente
+IGNORED_PREFIXES = ('__MACOSX/',)
+IGNORED_NAMES = ('.DS_Store', 'Thumbs.db', 'desktop.ini')
+
+class UnsafeArchiveError(Exception):
+    """
+    Indica que el ZIP no se puede extraer de forma segura (rutas fuera de la carpeta destino,
+    enlaces simbólicos, demasiadas entradas o un tamaño descomprimido excesivo).
+    """
+
+def extract_zip(source, target_path, progress=None, cancel=None, max_members=MAX_MEMBERS,
+                max_total_size=MAX_TOTAL_SIZE):
+    """
+    Extrae un expediente comprimido en ZIP conservando su estructura de carpetas.
+
+    Cada archivo se copia al disco por bloques de CHUNK_SIZE, sin cargarlo completo en memoria,
+    y recupera la fecha de modificación registrada en el ZIP, de la que depende el orden de los
+    documentos en el índice. Antes de escribir se validan todas las entradas: ninguna ruta puede
+    salir de `target_path` (rutas absolutas o con ".."), no se admiten enlaces simbólicos y el
+    tamaño descomprimido total no puede superar `max_total_size` ni el espacio libre del disco.
+
+    :param source: Ruta del ZIP o un objeto tipo archivo con acceso aleatorio (por ejemplo, el
+                   archivo cargado en la versión web)
+    :param target_path: Carpeta donde se extrae el expediente; se crea si no existe
+    :param progress: Función que recibe ('extraccion', archivos extraídos, total, segundos restantes)
+    :param cancel: CancellationToken que se consulta antes de cada archivo
+    :param max_members: Número máximo de entradas del ZIP
+    :param max_total_size: Tamaño descomprimido máximo, en bytes
+    :return: Lista de rutas relativas de los archivos extraídos
+    :raises UnsafeArchiveError: Si el ZIP no supera las validaciones
+    :raises zipfile.BadZipFile: Si el archivo no es un ZIP válido
+    """
+    os.makedirs(target_path, exist_ok=True)
+    root = os.path.realpath(target_path)
+
+    with zipfile.ZipFile(source) as archive:
+        infos = archive.infolist()
+        if len(infos) > max_members:
+            raise UnsafeArchiveError(f"El ZIP tiene {len(infos)} entradas; el máximo es {max_members}")
+
+        members = []
+        total_size = 0
+        for info in infos:
+            name = info.filename.replace('\\', '/')
+            if name.startswith(IGNORED_PREFIXES) or os.path.basename(name.rstrip('/')) in IGNORED_NAMES:
+                continue
+            if info.is_dir() and not name.strip('./'):
+                # Entrada de la carpeta raíz del ZIP ("./")
+                continue
+            if _is_symlink(info):
+                raise UnsafeArchiveError(f"El ZIP contiene un enlace simbólico: {name}")
+            members.append((info, _safe_path(root, name)))
+            total_size += info.file_size
+        if total_size > max_total_size:
+            raise UnsafeArchiveError(f"El contenido descomprimido ({total_size} bytes) supera el máximo permitido")
+        if total_size > shutil.disk_usage(root).free - MIN_FREE_SPACE:
+            raise UnsafeArchiveError("No hay espacio suficiente en el disco para extraer el expediente")
+
+        files = [(info, path) for info, path in members if not info.is_dir()]
+        for info, path in members:
+            if info.is_dir():
+                os.makedirs(path, exist_ok=True)
+
+        tracker = ProgressTracker('extraccion', len(files), progress, cancel)
+        extracted = []
+        for info, path in files:
+            tracker.check()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with archive.open(info) as member, open(path, 'wb') as output:
+                shutil.copyfileobj(member, output, CHUNK_SIZE)
+            modified = time.mktime(info.date_time + (0, 0, -1))
+            os.utime(path, (modified, modified))
+            extracted.append(os.path.relpath(path, root))
+            tracker.advance()
+    return extracted
+
+def _safe_path(root, name):
+    # Ruta de destino de una entrada; se rechaza si es absoluta o si queda fuera de la carpeta
+    if not name or name.startswith('/') or (len(name) > 1 and name[1] == ':'):
+        raise UnsafeArchiveError(f"Ruta absoluta en el ZIP: {name}")
+    parts = [part for part in name.split('/') if part not in ('', '.')]
+    if not parts or '..' in parts:
+        raise UnsafeArchiveError(f"Ruta fuera de la carpeta del expediente: {name}")
+    path = os.path.realpath(os.path.join(root, *parts))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise UnsafeArchiveError(f"Ruta fuera de la carpeta del expediente: {name}")
+    return path
+
+def _is_symlink(info):
+    # Los ZIP creados en Unix guardan el modo del archivo en los 16 bits altos de external_attr
+    return stat.S_ISLNK(info.external_attr >> 16)
@@ -1,10 +1,17 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import os
-import pandas as pd
-from index_generator import generate_index_from_scratch
-from file_utils import rename_files
-from excel_handler import save_excel_file
+import io
+import time
+import hashlib
+import zipfile
+from index_generator import build_index_dataframe
+from file_utils import is_index_document, protocol_name
+from metadata_extractor import get_content_metadata, format_date
+from excel_handler import dataframe_to_excel, TEMPLATE_PATH
+from batch_processor import discover_cuadernos, process_cuaderno
+from zip_extractor import extract_zip
+from progress import ProgressTracker, format_eta
 import base64
 import tempfile
 
@@ -143,6 +150,153 @@ def get_binary_file_downloader_html(url, file_label="File"):
     return href
 
 
+# Archivos cuyos metadatos se conservan entre ejecuciones de la página (versión web)
+MAX_ARCHIVOS_CACHE = 5000
+
+
+def huella_archivo(archivo):
+    """
+    Obtiene el hash SHA-256 del contenido de un archivo cargado. Se calcula una sola vez por
+    archivo y sesión, de modo que recargar la página no vuelve a leer el contenido.
+    """
+    huellas = st.session_state.setdefault("huellas_archivos", {})
+    if archivo.file_id not in huellas:
+        huellas[archivo.file_id] = hashlib.sha256(archivo.getbuffer()).hexdigest()
+    return huellas[archivo.file_id]
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_ARCHIVOS_CACHE)
+def extraer_metadatos_web(huella, extension, _contenido):
+    """
+    Extrae los metadatos de un archivo cargado, guardándolos por hash del contenido y extensión.
+
+    El contenido se analiza directamente en memoria, sin escribirlo en disco. Un archivo ya
+    analizado no se vuelve a analizar aunque se cargue de nuevo, se pulse otra vez el botón o
+    cambie cualquier otro control de la página. `_contenido` no forma parte de la clave de la caché.
+    """
+    return get_content_metadata(_contenido, "documento" + extension)
+
+
+def generar_indice_web(archivos, progreso=None):
+    """
+    Genera el índice de los archivos cargados, en el orden de carga y con los nombres del
+    protocolo (los mismos de rename_files), sin escribir los archivos en una carpeta.
+
+    :param archivos: Archivos cargados con st.file_uploader
+    :param progreso: Función que recibe el avance (ver progress.ProgressTracker)
+    :return: DataFrame con el índice
+    """
+    documentos = [archivo for archivo in archivos if is_index_document(archivo.name)]
+    # Los archivos cargados no conservan su fecha original: se registra la de la carga
+    fecha_carga = format_date(time.time())
+    nombres, metadatos = [], []
+    avance = ProgressTracker("metadatos", len(documentos), progreso)
+    for posicion, archivo in enumerate(documentos, start=1):
+        nombre, extension = os.path.splitext(archivo.name)
+        nombres.append(f"{posicion:03d}{protocol_name(nombre)}{extension}")
+        metadata = extraer_metadatos_web(huella_archivo(archivo), extension.lower(), archivo.getbuffer())
+        metadatos.append(dict(metadata, creation_date=fecha_carga, modification_date=fecha_carga))
+        avance.advance()
+    return build_index_dataframe(nombres, metadatos)
+
+
+def es_expediente_zip(archivos):
+    """
+    Indica si se cargó un expediente comprimido (un único archivo .zip).
+    """
+    return len(archivos) == 1 and archivos[0].name.lower().endswith(".zip")
+
+
+def procesar_expediente_zip(archivo, progreso=None):
+    """
+    Extrae un expediente comprimido en una carpeta temporal, conservando su estructura, y
+    genera el índice de cada cuaderno (ver batch_processor.discover_cuadernos).
+
+    El ZIP se lee directamente del archivo cargado y cada documento se copia al disco por
+    bloques (ver zip_extractor), sin otra copia completa en memoria. La carpeta temporal se
+    descarta al terminar, por lo que sus archivos no se guardan en la caché de metadatos.
+
+    :param archivo: Archivo .zip cargado con st.file_uploader
+    :param progreso: Función que recibe el avance de la extracción y de los cuadernos
+    :return: (resultados por cuaderno, bytes de un ZIP con los índices en la estructura del expediente)
+    """
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo.seek(0)
+        extract_zip(archivo, carpeta, progress=progreso)
+
+        cuadernos = [cuaderno["Ruta"] for cuaderno in discover_cuadernos(carpeta)]
+        if not cuadernos:
+            # ZIP de un solo cuaderno: su carpeta, o los documentos sueltos en la raíz
+            contenido = [nombre for nombre in os.listdir(carpeta) if not nombre.startswith(".")]
+            unica = os.path.join(carpeta, contenido[0]) if len(contenido) == 1 else carpeta
+            cuadernos = [unica if os.path.isdir(unica) else carpeta]
+
+        resultados = []
+        salida = io.BytesIO()
+        avance = ProgressTracker("cuadernos", len(cuadernos), progreso)
+        with zipfile.ZipFile(salida, "w", zipfile.ZIP_DEFLATED) as indices:
+            for cuaderno in cuadernos:
+                resultado = process_cuaderno(cuaderno, TEMPLATE_PATH, use_cache=False)
+                # Los documentos sueltos en la raíz del ZIP se agrupan con el nombre del ZIP
+                ruta = os.path.relpath(cuaderno, carpeta)
+                resultado["Ruta"] = os.path.splitext(archivo.name)[0] if ruta == "." else ruta
+                if resultado["Índice"]:
+                    indices.write(resultado["Índice"],
+                                  os.path.join(resultado["Ruta"], os.path.basename(resultado["Índice"])))
+                    resultado["Índice"] = os.path.basename(resultado["Índice"])
+                resultados.append(resultado)
+                avance.advance()
+    return resultados, salida.getvalue()
+
+
+def mostrar_expediente_zip(archivo):
+    """
+    Procesa en la versión web un expediente comprimido y ofrece la descarga de sus índices.
+    """
+    if st.button("Generar Índices del Expediente"):
+        progress_bar = st.progress(0)
+
+        # Porción de la barra de cada etapa y descripción
+        etapas = {
+            "extraccion": (0, 40, "Extrayendo documentos"),
+            "cuadernos": (40, 100, "Generando índices de los cuadernos"),
+        }
+
+        def mostrar_avance(etapa, hechos, total, restante):
+            inicio, fin, descripcion = etapas[etapa]
+            progress_bar.progress(
+                inicio + (fin - inicio) * hechos // max(total, 1),
+                text=f"{descripcion}: {hechos} de {total} · tiempo restante {format_eta(restante)}",
+            )
+
+        try:
+            resultados, indices = procesar_expediente_zip(archivo, mostrar_avance)
+            st.session_state["indices_zip"] = (archivo.file_id, resultados, indices)
+        except Exception as e:
+            st.error(f"Ocurrió un error: {str(e)}")
+
+    # Los índices generados siguen disponibles tras las recargas mientras no cambie el archivo
+    generado = st.session_state.get("indices_zip")
+    if generado and generado[0] == archivo.file_id:
+        _, resultados, indices = generado
+        errores = [resultado for resultado in resultados if resultado["Estado"] == "Error"]
+        if errores:
+            st.warning(f"{len(errores)} de {len(resultados)} cuadernos no se pudieron procesar.")
+        else:
+            st.success(f"Se generaron los índices de {len(resultados)} cuadernos.")
+        st.dataframe(
+            [{columna: resultado[columna] for columna in ("Ruta", "Estado", "Archivos Renombrados", "Segundos", "Error")}
+             for resultado in resultados],
+            use_container_width=True,
+        )
+        st.download_button(
+            label="Descargar Índices del Expediente",
+            data=indices,
+            file_name=f"{os.path.splitext(archivo.name)[0]}_indices.zip",
+            mime="application/zip",
+        )
+
+
 def main():
     # Sidebar
     st.sidebar.title("Recursos Adicionales")
@@ -371,49 +525,55 @@ def main():
         )
 
         uploaded_files = st.file_uploader(
-            "Seleccione los archivos que contienen los documentos del expediente:",
+            "Seleccione los archivos que contienen los documentos del expediente, o un único ZIP con el expediente completo:",
             type=None,
             accept_multiple_files=True,
         )
 
-        if uploaded_files:
-            with tempfile.TemporaryDirectory() as temp_folder:
-                for uploaded_file in uploaded_files:
-                    with open(os.path.join(temp_folder, uploaded_file.name), "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+        if uploaded_files and es_expediente_zip(uploaded_files):
+            st.success("Expediente comprimido seleccionado correctamente.")
+            mostrar_expediente_zip(uploaded_files[0])
+
+        elif uploaded_files:
+            st.success("Archivos seleccionados correctamente.")
 
-                st.success("Archivos seleccionados correctamente.")
+            # Los archivos y sus metadatos se identifican por el hash del contenido: las recargas
+            # de la página y los clics repetidos reutilizan lo ya analizado
+            clave = tuple((archivo.name, huella_archivo(archivo)) for archivo in uploaded_files)
 
-                if st.button("Generar Índice Electrónico"):
-                    progress_bar = st.progress(0)
-                    try:
-                        rename_files(temp_folder)
-                        progress_bar.progress(33)
+            if st.button("Generar Índice Electrónico"):
+                progress_bar = st.progress(0)
 
-                        df = generate_index_from_scratch(temp_folder)
-                        if df is None:
-                            raise ValueError("La generación del índice falló.")
+                def mostrar_avance(etapa, hechos, total, restante):
+                    progress_bar.progress(
+                        90 * hechos // max(total, 1),
+                        text=f"Analizando documentos: {hechos} de {total} · tiempo restante {format_eta(restante)}",
+                    )
 
-                        progress_bar.progress(66)
+                try:
+                    df = generar_indice_web(uploaded_files, mostrar_avance)
+                    if df is None:
+                        raise ValueError("La generación del índice falló.")
 
-                        index_file_path = os.path.join(
-                            temp_folder, "000IndiceElectronicoC0.xlsx"
-                        )
-                        save_excel_file(df, index_file_path, use_template=False)
+                    # El libro se genera en memoria, sin archivos temporales
+                    progress_bar.progress(90, text="Guardando el índice")
+                    st.session_state["indice_web"] = (clave, dataframe_to_excel(df, index_format=True))
 
-                        progress_bar.progress(100)
-                        st.success("Índice electrónico generado con éxito.")
+                    progress_bar.progress(100, text="Índice generado")
+                    st.success("Índice electrónico generado con éxito.")
 
-                        with open(index_file_path, "rb") as f:
-                            st.download_button(
-                                label="Descargar Índice Electrónico",
-                                data=f,
-                                file_name=os.path.basename(index_file_path),
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            )
+                except Exception as e:
+                    st.error(f"Ocurrió un error: {str(e)}")
 
-                    except Exception as e:
-                        st.error(f"Ocurrió un error: {str(e)}")
+            # El índice generado sigue disponible tras las recargas mientras no cambien los archivos
+            indice = st.session_state.get("indice_web")
+            if indice and indice[0] == clave:
+                st.download_button(
+                    label="Descargar Índice Electrónico",
+                    data=indice[1],
+                    file_name="000IndiceElectronicoC0.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
 
         # Instrucciones de uso
         with st.expander("Instrucciones de Uso - Versión Web"):
@@ -424,8 +584,16 @@ def main():
             3. Espere a que el proceso termine.
             4. Descargue el índice generado.
             5. Utilice el índice como guía para renombrar manualmente los archivos dentro de la carpeta del expediente en su computadora local.
+
+            Para procesar un expediente completo, cargue un único archivo ZIP con sus carpetas
+            (`05088/01PrimeraInstancia/C01Principal/Archivos`, o la serie documental o un solo cuaderno).
+            Se genera el índice de cada cuaderno y se descarga un ZIP con los índices en la misma estructura.
             """
             )
+            st.caption(
+                f"Tamaño máximo de carga: {st.get_option('server.maxUploadSize')} MB. Para expedientes "
+                "más grandes, utilice la versión de escritorio."
+            )
 
     with tab4:
         st.header("Video Tutoriales")